@@ -1,134 +1,164 @@
+import codecs
 import re
 import json
-import math
+import sys
+import time
+from pathlib import Path
+
+# Converters and binary columns are shared with color_analysis.py
+sys.path.insert(0, str(Path(__file__).parent / "src" / "scripts"))
+
+from color_convert import lab_to_srgb, srgb_to_lab  # noqa: E402
+from pantone_store import write_columns  # noqa: E402
 
 def lab_to_rgb(L, a, b):
-    # Simple Lab to RGB conversion (D50)
-    # This is an approximation. For better results use colormath, but this avoids dependencies for this script.
-    
-    # Reference White D50
-    Xn = 96.4212
-    Yn = 100.0
-    Zn = 82.5188
-
-    fy = (L + 16) / 116
-    fx = fy + (a / 500)
-    fz = fy - (b / 200)
-
-    def decode_f(t):
-        if t > 6/29:
-            return t * t * t
+    # Pantone Lab (D50) to 0-255 sRGB, same conversion as color_analysis.py
+    r, g, b = lab_to_srgb([L, a, b])
+    return int(r), int(g), int(b)
+
+def rgb_to_lab(r, g, b):
+    # RGB swatches (0-255) are stored as D50 Lab, same conversion as color_analysis.py
+    return srgb_to_lab([r, g, b])
+
+# Swatch blocks are the innermost <rdf:li> elements; fields are flat <xmpG:x>v</xmpG:x>
+_LI_TAG = re.compile(r'<rdf:li\b|</rdf:li>')
+_FIELD = re.compile(r'<xmpG:(\w+)>([^<]*)</xmpG:\1>')
+
+# Blocks larger than this are not swatches (keeps memory bounded on broken input)
+MAX_BLOCK_CHARS = 64 * 1024
+
+READ_CHUNK_BYTES = 1 << 20
+
+
+def iter_li_blocks(stream, chunk_size=READ_CHUNK_BYTES):
+    # Yields the innermost <rdf:li>...</rdf:li> blocks of a binary stream in order.
+    # The file is read in chunks; only the open block and one chunk stay in memory.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    buf = ""
+    start = None
+    # Keep enough of the tail to complete a tag split across chunks
+    keep = len("</rdf:li>") - 1
+
+    while True:
+        chunk = stream.read(chunk_size)
+        final = not chunk
+        buf += decoder.decode(chunk, final)
+
+        for m in _LI_TAG.finditer(buf, 0 if start is None else start):
+            if m.group().startswith("</"):
+                if start is not None:
+                    yield buf[start:m.end()]
+                    start = None
+            else:
+                # A nested <rdf:li> means the enclosing one was not a leaf
+                start = m.start()
+
+        if final:
+            return
+
+        if start is not None and len(buf) - start <= MAX_BLOCK_CHARS:
+            buf, start = buf[start:], 0
         else:
-            return (t - 4/29) * (108/841)
-
-    X = Xn * decode_f(fx)
-    Y = Yn * decode_f(fy)
-    Z = Zn * decode_f(fz)
-
-    # XYZ to RGB (sRGB)
-    # Transformation matrix for D50 to sRGB (Bradford adapted)
-    # Actually, standard sRGB uses D65. We need XYZ(D50) -> XYZ(D65) -> RGB.
-    # Or simplified matrix.
-    
-    # Let's use a standard D50 -> sRGB matrix directly if possible, or assume D65 if the PDF implies it.
-    # Pantone usually uses D50.
-    
-    # Using a common D50 to sRGB matrix:
-    # r_l =  3.2404542 * (X/100) - 1.5371385 * (Y/100) - 0.4985314 * (Z/100)
-    # g_l = -0.9692660 * (X/100) + 1.8760108 * (Y/100) + 0.0415560 * (Z/100)
-    # b_l =  0.0556434 * (X/100) - 0.2040259 * (Y/100) + 1.0572252 * (Z/100)
-    
-    # Wait, that matrix is for D65.
-    # Let's use colormath if available in the environment (it is used in color_analysis.py).
-    # But I want this script to be standalone if possible.
-    # I'll try to import colormath.
-    
-    try:
-        from colormath.color_objects import LabColor, sRGBColor
-        from colormath.color_conversions import convert_color
-        import numpy as np
-        
-        # Patch numpy
-        if not hasattr(np, 'asscalar'):
-            np.asscalar = lambda x: x.item()
-            
-        lab = LabColor(L, a, b, illuminant='d50')
-        rgb = convert_color(lab, sRGBColor)
-        
-        r = int(max(0, min(255, round(rgb.clamped_rgb_r * 255))))
-        g = int(max(0, min(255, round(rgb.clamped_rgb_g * 255))))
-        b = int(max(0, min(255, round(rgb.clamped_rgb_b * 255))))
-        return r, g, b
-    except ImportError:
-        # Fallback to simple approximation (D65 assumption or simple matrix)
-        # This is risky for Pantone.
-        print("Warning: colormath not found, using rough approximation")
-        return 0, 0, 0 # Should not happen in this env
-
-def parse_pantone_strings(filename):
-    with open(filename, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-
-    # Regex to find blocks
-    # <rdf:li rdf:parseType="Resource">
-    #    <xmpG:swatchName>PANTONE 7582 C</xmpG:swatchName>
-    #    ...
-    #    <xmpG:mode>LAB</xmpG:mode>
-    #    <xmpG:L>33.725491</xmpG:L>
-    #    <xmpG:A>13</xmpG:A>
-    #    <xmpG:B>25</xmpG:B>
-    # </rdf:li>
-
-    # We can regex for swatchName and then look ahead for L, A, B
-    
-    pattern = re.compile(r'<xmpG:swatchName>(.*?)</xmpG:swatchName>.*?<xmpG:mode>LAB</xmpG:mode>.*?<xmpG:L>(.*?)</xmpG:L>.*?<xmpG:A>(.*?)</xmpG:A>.*?<xmpG:B>(.*?)</xmpG:B>', re.DOTALL)
-    
-    matches = pattern.findall(content)
-    
+            buf, start = buf[-keep:], None
+
+
+def swatch_from_block(block):
+    # (name, mode, values) for a swatch block, None for any other <rdf:li>.
+    # values: LAB (L, a, b), RGB (r, g, b) 0-255, CMYK (c, m, y, k) 0-100
+    fields = dict(_FIELD.findall(block))
+    name = fields.get("swatchName")
+    if name is None:
+        return None
+
+    mode = fields.get("mode", "").strip().upper()
+    keys = {
+        "LAB": ("L", "A", "B"),
+        "RGB": ("red", "green", "blue"),
+        "CMYK": ("cyan", "magenta", "yellow", "black"),
+    }.get(mode)
+
+    values = None
+    if keys is not None:
+        try:
+            values = tuple(float(fields[k]) for k in keys)
+        except (KeyError, ValueError):
+            values = None
+    return name, mode, values
+
+
+def parse_pantone_strings(filename, stats=None):
+    # Streams the swatch dump and returns the Lab database list.
+    # LAB swatches are taken as is, RGB swatches are converted to Lab (D50).
+    # CMYK cannot be converted without an output profile, so those are skipped
+    # and reported instead of being paired with another block's values.
+    started = time.perf_counter()
+
     database = []
     seen = set()
-    
-    print(f"Found {len(matches)} matches")
-    
-    for name, l_str, a_str, b_str in matches:
-        if name in seen:
-            continue
-        seen.add(name)
-        
-        try:
-            L = float(l_str)
-            a = float(a_str)
-            b = float(b_str)
-            
-            # Convert to RGB? Or keep Lab?
-            # color_analysis.py uses Lab for matching, so keeping Lab is best!
-            # But it also needs RGB for display?
-            # Actually, color_analysis.py converts RGB input to Lab to match against Lab DB.
-            # So Lab in DB is perfect.
-            
-            # But we might want RGB for frontend display if we export it.
-            # Let's store both.
-            
-            # r, g, b_val = lab_to_rgb(L, a, b)
-            
-            entry = {
+    counts = {}
+    skipped = {}
+
+    with open(filename, 'rb') as f:
+        for block in iter_li_blocks(f):
+            swatch = swatch_from_block(block)
+            if swatch is None:
+                continue
+
+            name, mode, values = swatch
+            counts[mode] = counts.get(mode, 0) + 1
+
+            if name in seen:
+                continue
+
+            if mode == "LAB" and values is not None:
+                L, a, b = values
+            elif mode == "RGB" and values is not None:
+                L, a, b = (float(v) for v in rgb_to_lab(*values))
+            else:
+                reason = mode if values is not None or mode == "CMYK" else f"{mode or '?'} (missing values)"
+                skipped[reason] = skipped.get(reason, 0) + 1
+                continue
+
+            seen.add(name)
+            database.append({
                 "name": name,
                 "code": name.replace("PANTONE ", ""),
                 "L": L,
                 "a": a,
                 "b": b
-            }
-            database.append(entry)
-        except ValueError:
-            continue
-            
+            })
+
+        size = f.tell()
+
+    elapsed = time.perf_counter() - started
+    mb_per_s = size / (1024 * 1024) / elapsed if elapsed > 0 else float("inf")
+
+    modes = ", ".join(f"{m or '?'}: {n}" for m, n in sorted(counts.items()))
+    print(f"Found {sum(counts.values())} swatches ({modes or '-'})")
+    for reason, n in sorted(skipped.items()):
+        print(f"Skipped {n} {reason} swatches")
+    print(f"Parsed {size / (1024 * 1024):.1f} MB in {elapsed:.2f} s ({mb_per_s:.1f} MB/s)")
+
+    if stats is not None:
+        stats.update(modes=counts, skipped=skipped, bytes=size, seconds=elapsed, mb_per_s=mb_per_s)
+
     return database
 
 if __name__ == "__main__":
-    db = parse_pantone_strings("pantone_strings.txt")
-    
+    # python extract_pantone.py [swatch_dump.txt] [output.json]
+    # Extra libraries go to src/scripts/libraries/<name>.json (see pantone_catalog.py)
+    source = sys.argv[1] if len(sys.argv) > 1 else "pantone_strings.txt"
+    output = sys.argv[2] if len(sys.argv) > 2 else "src/scripts/pantone_database.json"
+
+    db = parse_pantone_strings(source)
+
     # Save to JSON
-    with open("src/scripts/pantone_database.json", "w") as f:
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
         json.dump(db, f, indent=2)
         
-    print(f"Saved {len(db)} colors to src/scripts/pantone_database.json")
+    print(f"Saved {len(db)} colors to {output}")
+
+    # Binary columns next to the JSON (loaded memory-mapped by color_analysis.py)
+    paths = write_columns(db, output)
+    print(f"Saved binary columns: {', '.join(p.name for p in paths.values())}")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Toplu Renk Analizi
+- Kaynak: dizin, glob deseni veya JSONL manifest
+- Manifest satırları kendi parametrelerini taşıyabilir:
+  {"image": "a.png", "genislik": 210, "yukseklik": 297, "k-max": 8}
+- Dosyalar süreç havuzunda işlenir, her sonuç biter bitmez tek satır JSON
+- Dosya bazlı hatalar satır içinde raporlanır, toplu iş durmaz
+
+Kullanım: python color_analysis.py batch <dizin|glob|manifest.jsonl> [--workers N] [analiz argümanları]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from color_analysis import NumpyEncoder, parse_analysis_args, run_analysis
+
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff", ".webp", ".svg", ".svgz")
+
+# ============================================================================
+# KAYNAKLAR
+# ============================================================================
+
+def iter_entries(source):
+    """
+    Kaynaktaki girişleri (resim yolu, parametreler, hata, konum) olarak
+    sırayla üret
+
+    konum manifest girişlerinde "manifest.jsonl:satır", diğerlerinde None;
+    okunamayan manifest satırları hata mesajıyla birlikte üretilir.
+    """
+    path = Path(source)
+
+    if path.is_dir():
+        for f in sorted(path.iterdir()):
+            if f.is_file() and f.suffix.lower() in IMAGE_SUFFIXES:
+                yield str(f), {}, None, None
+        return
+
+    if path.is_file() and path.suffix.lower() in (".jsonl", ".ndjson"):
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                origin = f"{path.name}:{line_no}"
+                try:
+                    params = json.loads(line)
+                    if not isinstance(params, dict):
+                        raise ValueError("satır bir JSON nesnesi olmalı")
+                    image = params.pop("image", None)
+                    if not isinstance(image, str) or not image:
+                        raise ValueError("image bir dosya yolu (metin) olmalı")
+                except ValueError as e:
+                    yield None, {}, str(e), origin
+                    continue
+                # Relative paths in a manifest are relative to the manifest itself
+                yield str(path.parent / image), params, None, origin
+        return
+
+    if path.is_file():
+        yield str(path), {}, None, None
+        return
+
+    for f in sorted(glob.glob(source, recursive=True)):
+        if os.path.isfile(f):
+            yield f, {}, None, None
+
+
+# ============================================================================
+# İŞÇİLER
+# ============================================================================
+
+def _analyze_entry(args):
+    """
+    Tek bir dosyayı analiz et (işçi sürecinde)
+
+    Kütüphane eşleştiricileri ve LUT'lar süreç başına bir kez kurulur.
+    """
+    try:
+        result, ok = run_analysis(args)
+        if not ok or "error" in result:
+            return None, result["error"]
+        return result, None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _record(index, image, result=None, error=None):
+    record = {"index": index, "image": image}
+    if error is not None:
+        record["error"] = error
+    else:
+        record["result"] = result
+    return json.dumps(record, ensure_ascii=False, cls=NumpyEncoder)
+
+
+def run_batch(source, analysis_argv, workers=1, out=sys.stdout):
+    """
+    Kaynaktaki tüm dosyaları analiz et, her sonucu bitişte bir satır yaz
+
+    analysis_argv: tüm girişlere uygulanan analiz argümanları (resim hariç);
+    manifest satırındaki parametreler bunların üzerine yazılır. Tüm girişlerin
+    argümanları analizden önce denetlenir; hatalı manifest satırları satır
+    numarasıyla raporlanır.
+    (başarılı, hatalı) sayılarını döndürür.
+    """
+    jobs = []
+    n_ok = n_failed = 0
+
+    def emit(index, image, result, error):
+        nonlocal n_ok, n_failed
+        if error is None:
+            n_ok += 1
+        else:
+            n_failed += 1
+        print(_record(index, image, result, error), file=out, flush=True)
+
+    for index, (image, params, error, origin) in enumerate(iter_entries(source)):
+        if error is None:
+            try:
+                jobs.append((index, image, parse_analysis_args([image] + analysis_argv, params)))
+                continue
+            except ValueError as e:
+                error = str(e)
+        emit(index, image, None, f"{origin}: {error}" if origin else error)
+
+    if workers <= 1 or len(jobs) <= 1:
+        for index, image, args in jobs:
+            emit(index, image, *_analyze_entry(args))
+        return n_ok, n_failed
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = {pool.submit(_analyze_entry, args): (index, image) for index, image, args in jobs}
+        for future in as_completed(futures):
+            index, image = futures[future]
+            try:
+                result, error = future.result()
+            except Exception as e:
+                # A crashed worker (e.g. killed for memory) fails only its own entries
+                result, error = None, f"{type(e).__name__}: {e}"
+            emit(index, image, result, error)
+
+    return n_ok, n_failed
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Toplu renk analizi",
+        epilog="Diğer tüm argümanlar (--genislik, --k-max, ...) her dosyaya uygulanır.")
+    parser.add_argument("source", help="Dizin, glob deseni veya JSONL manifest")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Paralel işçi süreç sayısı (varsayılan: CPU sayısı)")
+    args, analysis_argv = parser.parse_known_args(argv)
+
+    n_ok, n_failed = run_batch(args.source, analysis_argv, workers=args.workers)
+    print(f"{n_ok} başarılı, {n_failed} hatalı", file=sys.stderr)
+    return 1 if n_failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Renk Analiz Sunucusu İstemcisi
+- color_analysis.py ile aynı argümanlar, aynı JSON çıktısı ve çıkış kodu
+- Yalnızca standart kütüphane: ağır kütüphaneler yüklenmez, başlangıç anlıktır
+- Sunucuya ulaşılamazsa ya da zaman aşımında yanıt gelmezse analiz bu
+  süreçte çalıştırılır (eski davranış)
+
+Kullanım: python analysis_client.py resim.png [--genislik 100 ...]
+Sunucu adresi: COLOR_ANALYSIS_URL (varsayılan: http://127.0.0.1:8765)
+"""
+
+import json
+import os
+import socket
+import sys
+import urllib.error
+import urllib.request
+
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+# Seconds to wait for the server; analyses of large images can take a while
+TIMEOUT = float(os.environ.get("COLOR_ANALYSIS_TIMEOUT", "600"))
+
+
+def server_url():
+    return os.environ.get("COLOR_ANALYSIS_URL", DEFAULT_URL).rstrip("/")
+
+
+def analyze(argv, url=None, timeout=TIMEOUT):
+    """
+    Argümanları sunucuya gönder, (HTTP durum kodu, JSON metni) döndür
+
+    Sunucuya bağlanılamazsa, bağlantı koparsa ya da yanıt timeout saniye
+    içinde gelmezse ConnectionError yükseltir.
+    """
+    body = json.dumps({"argv": list(argv), "cwd": os.getcwd()}).encode("utf-8")
+    request = urllib.request.Request(
+        (url or server_url()) + "/analyze",
+        data=body,
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8")
+    except urllib.error.URLError as e:
+        raise ConnectionError(e.reason)
+    except (TimeoutError, socket.timeout) as e:
+        # A hung server: the read timeout is not wrapped in URLError
+        raise ConnectionError(f"Sunucu yanıt vermedi: {e}")
+
+
+def main():
+    argv = sys.argv[1:]
+
+    # Help and usage errors come from the real parser
+    if not argv or argv[0] in ("-h", "--help"):
+        import color_analysis
+        color_analysis.main()
+        return
+
+    try:
+        status, text = analyze(argv)
+    except ConnectionError:
+        import color_analysis
+        color_analysis.main()
+        return
+
+    if status == 400:
+        print(text, file=sys.stderr)
+        sys.exit(2)
+
+    print(text)
+    if status != 200:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asenkron Analiz İş Kuyruğu
+- asyncio tabanlı; CPU işi sınırlı bir süreç havuzunda (ProcessPoolExecutor;
+  işçiler fork yerine forkserver / spawn ile başlatılır)
+- Her iş için kimlik (job_id), durum ve aşama bazlı ilerleme olayları
+  (decode, background, histogram, sampler, kmeans, pantone, ...)
+- İptal: sıradaki iş hiç başlamaz; çalışan iş bir sonraki aşama sınırında
+  (kmeans aşamasında bir sonraki k fitinde) StageCancelled ile durur ve
+  işçiyi bırakır. Tek bir aşamanın (ör. büyük resimde histogram) içi
+  bölünmez.
+- Zaman aşımı: süre dolunca iş iptal edilir, durum "timeout"
+- Çöken işçi: havuzdaki işler "failed" olur, havuz kapatılıp yenisi kurulur
+- Geri basınç: bekleyen + çalışan iş sayısı max_pending'e ulaşınca submit
+  QueueFull yükseltir (sunucu 429 döner)
+
+Kullanım:
+    async with JobQueue(workers=4) as jobs:
+        job = jobs.submit(parse_analysis_args(["resim.png"]))
+        async for event in jobs.events(job.id):
+            print(event)
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from analysis_session import default_session
+from color_analysis import run_analysis
+from profiling import StageCancelled
+
+
+# Jobs waiting or running before submit starts refusing, per worker
+PENDING_PER_WORKER = 4
+
+# Finished jobs kept for status queries; older ones are dropped first
+KEEP_FINISHED = 1000
+
+FINAL_STATES = ("done", "failed", "cancelled", "timeout")
+
+# Workers and the manager are never forked from the threaded server:
+# a fork copies locks held by other threads and can deadlock the child
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class QueueFull(Exception):
+    """Kuyruk dolu (geri basınç); istemci daha sonra tekrar denemeli"""
+
+
+# ============================================================================
+# İŞÇİ (alt süreçte)
+# ============================================================================
+
+def _run_job(job_id, args, events, cancelled):
+    """
+    Analizi işçi sürecinde çalıştır; aşama girişleri events kuyruğuna yazılır,
+    cancelled sözlüğünde job_id görülünce bir sonraki aşamada durulur.
+    İşçi süreci yaşadıkça oturum ara durumu işler arasında korunur.
+
+    (durum, sonuç ya da mesaj) döndürür: "done" / "failed" / "cancelled".
+    """
+    try:
+        result, ok = run_analysis(
+            args,
+            on_stage=lambda name: events.put((job_id, name)),
+            should_cancel=lambda: job_id in cancelled,
+            session=default_session(),
+        )
+    except StageCancelled as e:
+        return "cancelled", str(e)
+    except Exception as e:
+        return "failed", f"{type(e).__name__}: {e}"
+
+    if not ok or "error" in result:
+        return "failed", result["error"]
+    return "done", result
+
+
+# ============================================================================
+# İŞLER
+# ============================================================================
+
+class Job:
+    """Tek bir analiz işi: durum, geçerli aşama, olay geçmişi ve sonuç"""
+
+    def __init__(self, job_id, args, timeout=None):
+        self.id = job_id
+        self.args = args
+        self.timeout = timeout
+        self.status = "queued"
+        self.stage = None
+        self.result = None
+        self.error = None
+        self.history = []
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._subscribers = set()
+        self._task = None
+
+    @property
+    def done(self):
+        return self.status in FINAL_STATES
+
+    def snapshot(self, include_result=True):
+        """İşin JSON'a yazılabilir durumu"""
+        body = {
+            "job_id": self.id,
+            "image": str(self.args.image),
+            "status": self.status,
+            "stage": self.stage,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+        if self.error is not None:
+            body["error"] = self.error
+        if include_result and self.result is not None:
+            body["result"] = self.result
+        return body
+
+
+class JobQueue:
+    """
+    Sınırlı süreç havuzu üzerinde asyncio iş kuyruğu
+
+    workers: eşzamanlı analiz sayısı (havuz boyutu)
+    max_pending: bekleyen + çalışan iş üst sınırı (geri basınç)
+    timeout: iş başına varsayılan süre sınırı (saniye, None: sınırsız)
+    Tüm yöntemler kuyruğun olay döngüsünde çağrılmalıdır.
+    """
+
+    def __init__(self, workers=None, max_pending=None, timeout=None, keep_finished=KEEP_FINISHED):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.max_pending = max_pending or self.workers * PENDING_PER_WORKER
+        self.timeout = timeout
+        self.keep_finished = keep_finished
+        self._jobs = {}
+        self._loop = None
+        self._pool = None
+        self._manager = None
+        self._pump = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._context = multiprocessing.get_context(START_METHOD)
+        # Progress and cancellation cross the process boundary through a manager
+        self._manager = self._context.Manager()
+        self._events = self._manager.Queue()
+        self._cancelled = self._manager.dict()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._context)
+        self._pump = threading.Thread(target=self._pump_events, name="job-events", daemon=True)
+        self._pump.start()
+        return self
+
+    async def close(self):
+        """Bekleyen ve çalışan işleri iptal et, havuzu kapat"""
+        for job in list(self._jobs.values()):
+            self.cancel(job.id)
+        tasks = [job._task for job in self._jobs.values() if job._task is not None]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._events.put(None)
+        self._pump.join()
+        self._manager.shutdown()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ------------------------------------------------------------------------
+
+    def active(self):
+        """Bekleyen ve çalışan iş sayısı"""
+        return sum(not job.done for job in self._jobs.values())
+
+    def submit(self, args, timeout=None):
+        """
+        Ayrıştırılmış analiz argümanlarıyla yeni iş oluştur ve kuyruğa al
+
+        Kuyruk doluysa QueueFull yükseltir.
+        """
+        if self.active() >= self.max_pending:
+            raise QueueFull(f"Kuyruk dolu ({self.max_pending} iş)")
+
+        job = Job(uuid.uuid4().hex, args, timeout if timeout is not None else self.timeout)
+        self._jobs[job.id] = job
+        self._publish(job, "queued")
+        job._task = self._loop.create_task(self._run(job))
+        self._prune()
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        İşi iptal et; bitmiş ya da bilinmeyen işte False
+
+        Sıradaki iş hemen iptal olur, çalışan iş bir sonraki aşama sınırında ya
+        da KMeans fitleri arasında durur.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        if job.status == "queued":
+            # Never reached a worker: finished right away
+            job._task.cancel()
+            self._finish(job, "cancelled", None)
+        else:
+            self._cancelled[job.id] = True
+        return True
+
+    async def wait(self, job_id):
+        """İş bitene kadar bekle, işi döndür"""
+        job = self._jobs[job_id]
+        await asyncio.wait([job._task])
+        return job
+
+    async def events(self, job_id):
+        """İşin geçmiş ve canlı olaylarını sırayla üret; iş bitince sona erer"""
+        job = self._jobs[job_id]
+        queue = asyncio.Queue()
+        job._subscribers.add(queue)
+        try:
+            for event in list(job.history):
+                yield event
+            if job.done:
+                return
+            while True:
+                event = await queue.get()
+                yield event
+                if event["event"] in FINAL_STATES:
+                    return
+        finally:
+            job._subscribers.discard(queue)
+
+    # ------------------------------------------------------------------------
+
+    async def _run(self, job):
+        try:
+            async with self._slots:
+                job.status = "running"
+                job.started = time.time()
+                self._publish(job, "running")
+                status, payload = await self._execute(job)
+        except asyncio.CancelledError:
+            if job.done:
+                return
+            status, payload = "cancelled", job.stage
+        except Exception as e:
+            status, payload = "failed", f"{type(e).__name__}: {e}"
+        self._finish(job, status, payload)
+
+    async def _execute(self, job):
+        """İşi havuzda çalıştır; zaman aşımında iptal et ama işçi boşalana kadar slotu tut"""
+        pool, future = self._submit_to_pool(job)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), job.timeout)
+        except BrokenProcessPool:
+            # Every job in flight on the crashed pool ends here; later jobs get a fresh pool
+            self._replace_pool(pool)
+            return "failed", "İşçi süreci beklenmedik şekilde sonlandı"
+        except asyncio.TimeoutError:
+            self._cancelled[job.id] = True
+            await asyncio.gather(future, return_exceptions=True)
+            return "timeout", f"{job.timeout:g} saniyede tamamlanmadı"
+        except asyncio.CancelledError:
+            self._cancelled[job.id] = True
+            await asyncio.gather(future, return_exceptions=True)
+            raise
+
+    def _submit_to_pool(self, job):
+        """(havuz, future); havuz kırıksa önce yenisi kurulur"""
+        pool = self._pool
+        try:
+            future = pool.submit(_run_job, job.id, job.args, self._events, self._cancelled)
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            pool = self._pool
+            future = pool.submit(_run_job, job.id, job.args, self._events, self._cancelled)
+        return pool, asyncio.wrap_future(future)
+
+    def _replace_pool(self, broken):
+        """
+        Çöken bir işçi tüm havuzu bozar: eskisini kapat, yenisini kur
+
+        Aynı havuzun birden çok işi ya da submit'i bunu çağırabilir; havuz
+        yalnızca bir kez değiştirilir.
+        """
+        if self._pool is not broken:
+            return
+        # Releases the executor's management thread and the dead worker handles
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._context)
+
+    def _finish(self, job, status, payload):
+        job.status = status
+        job.finished = time.time()
+        if status == "done":
+            job.result = payload
+        elif status == "failed" or status == "timeout":
+            job.error = payload
+        self._cancelled.pop(job.id, None)
+        self._publish(job, status)
+
+    def _publish(self, job, event, stage=None):
+        record = {"job_id": job.id, "event": event, "t": round(time.time() - job.created, 3)}
+        if stage is not None:
+            record["stage"] = stage
+        job.history.append(record)
+        for queue in job._subscribers:
+            queue.put_nowait(record)
+
+    def _on_stage(self, job_id, stage):
+        job = self._jobs.get(job_id)
+        # Late events from a worker that already returned are dropped
+        if job is not None and job.status == "running":
+            job.stage = stage
+            self._publish(job, "stage", stage)
+
+    def _pump_events(self):
+        """Manager kuyruğundaki işçi olaylarını olay döngüsüne aktar (thread)"""
+        while True:
+            try:
+                item = self._events.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            self._loop.call_soon_threadsafe(self._on_stage, *item)
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.done]
+        for job in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job.id]
+
+
+class BackgroundJobQueue:
+    """
+    JobQueue'yu kendi thread'indeki olay döngüsünde çalıştıran senkron sarmalayıcı
+
+    Thread tabanlı HTTP sunucusu gibi asyncio dışındaki çağıranlar için.
+    """
+
+    def __init__(self, **options):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="job-loop", daemon=True)
+        self._thread.start()
+        self.queue = self._call(JobQueue(**options).start())
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def _sync(self, fn, *args):
+        async def call():
+            return fn(*args)
+        return self._call(call())
+
+    def submit(self, args, timeout=None):
+        return self._sync(self.queue.submit, args, timeout)
+
+    def get(self, job_id):
+        return self._sync(self.queue.get, job_id)
+
+    def snapshot(self, job_id, include_result=True):
+        job = self.get(job_id)
+        return None if job is None else self._sync(job.snapshot, include_result)
+
+    def cancel(self, job_id):
+        return self._sync(self.queue.cancel, job_id)
+
+    def active(self):
+        return self._sync(self.queue.active)
+
+    def events(self, job_id):
+        """
+        İşin olaylarını senkron üret (çağıran thread bloklanır)
+
+        Erken bırakan çağıran üreteci kapatmalıdır (contextlib.closing); abone
+        kuyruğu o zaman hemen, çöp toplamayı beklemeden bırakılır.
+        """
+        stream = self.queue.events(job_id)
+        try:
+            while True:
+                try:
+                    yield self._call(stream.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._call(stream.aclose())
+
+    def close(self):
+        self._call(self.queue.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
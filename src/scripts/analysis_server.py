@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kalıcı Renk Analiz Sunucusu
+- Kütüphaneler, Pantone veritabanı ve eşleştirici bir kez yüklenir
+- Her istek color_analysis.py ile aynı argümanları alır, aynı JSON'u döndürür
+- Yalnızca yerel HTTP (varsayılan 127.0.0.1:8765)
+
+Kullanım: python color_analysis.py serve [--host 127.0.0.1] [--port 8765]
+
+İstekler:
+  GET  /health   → {"status": "ok", "pantone_count": N}
+  POST /analyze  → gövde: {"argv": ["resim.png", "--k-max", "8"], "cwd": "/..."}
+                   veya {"image": "resim.png", "k_max": 8, ...} (argüman adları)
+
+/analyze yanıtları (Content-Type: application/json; başka istemciler,
+örn. /api/analyze-colors-only arkasındaki sunucu, buna göre yazılmalı):
+  200 → color_analysis.py'nin stdout'uyla bayt bayt aynı sonuç JSON'u
+  400 → {"error": "..."}  geçersiz gövde ya da argüman (CLI çıkış kodu 2)
+  404 → {"error": "..."}  resim bulunamadı / okunamadı (CLI çıkış kodu 1)
+  413 → {"error": "..."}  gövde MAX_BODY_BYTES'tan büyük
+  500 → {"error": "..."}  analiz sırasında beklenmeyen hata
+Bağlantı hatası ya da zaman aşımında analiz yerelde çalıştırılmalıdır
+(analysis_client.py böyle yapar); yanıt gelmişse tekrar denenmez.
+
+İş kuyruğu (analysis_jobs; sınırlı süreç havuzu, iptal, zaman aşımı):
+  POST   /jobs             → /analyze gövdesi (+ "timeout": saniye) → 202 {"job_id": ...}
+                             kuyruk doluysa 429
+  GET    /jobs/<id>        → durum, geçerli aşama, bitince sonuç
+  GET    /jobs/<id>/events → satır satır JSON ilerleme olayları, iş bitince kapanır
+  DELETE /jobs/<id>        → iptal
+
+Oturum ara durumu (analysis_session): aynı resim yalnızca k aralığı ya da
+filtreler değiştirilerek yeniden gönderildiğinde histogram ve KMeans
+modelleri yeniden kullanılır; --session-memory MB ile sınırlanır (0: kapalı).
+İşçi süreçleri kendi oturum önbelleklerini tutar.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import closing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from analysis_jobs import BackgroundJobQueue, QueueFull
+from analysis_session import SESSION_MB_ENV, default_session
+from color_analysis import DATABASE_PATH, NumpyEncoder, get_pantone_matcher, parse_analysis_args, run_analysis
+from pantone_catalog import default_catalog
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Upper bound for a request body; requests only carry arguments, not images
+MAX_BODY_BYTES = 1 << 20
+
+
+class RequestError(Exception):
+    """İstek gövdesi veya argümanları geçersiz"""
+
+
+def _parse_request(payload):
+    """İstek gövdesini color_analysis argümanlarına (Namespace) çevir"""
+    if not isinstance(payload, dict):
+        raise RequestError("İstek gövdesi bir JSON nesnesi olmalı")
+
+    payload = dict(payload)
+    cwd = payload.pop("cwd", None)
+    argv = payload.pop("argv", None)
+
+    if argv is not None:
+        if payload:
+            raise RequestError("argv ile birlikte başka parametre verilemez")
+        if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+            raise RequestError("argv bir string listesi olmalı")
+    else:
+        image = payload.pop("image", None)
+        if not isinstance(image, str):
+            raise RequestError("image parametresi gerekli")
+        argv = [image]
+
+    args = parse_analysis_args(argv, payload)
+
+    # Relative image paths are resolved against the caller's directory
+    if cwd is not None and not os.path.isabs(args.image):
+        args.image = os.path.join(cwd, args.image)
+
+    return args
+
+
+class AnalysisHandler(BaseHTTPRequestHandler):
+    server_version = "ColorAnalysis/1.0"
+
+    def _send_json(self, status, body):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error_json(self, status, message):
+        self._send_json(status, json.dumps({"error": message}, ensure_ascii=False))
+
+    def _job_path(self):
+        """/jobs/<id>[/events] → (iş kimliği, alt yol); eşleşmezse (None, None)"""
+        parts = self.path.strip("/").split("/")
+        if len(parts) in (2, 3) and parts[0] == "jobs" and parts[1]:
+            return parts[1], (parts[2] if len(parts) == 3 else None)
+        return None, None
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, json.dumps({
+                "status": "ok",
+                "pantone_count": len(self.server.matcher),
+                "libraries": self.server.libraries,
+                "uptime_s": round(time.monotonic() - self.server.started, 1),
+                "jobs": {"active": self.server.jobs.active(), "workers": self.server.jobs.queue.workers,
+                         "max_pending": self.server.jobs.queue.max_pending},
+                "session": self.server.session.stats() if self.server.session is not None else None,
+            }))
+            return
+
+        job_id, sub = self._job_path()
+        if job_id is None or sub not in (None, "events"):
+            self._send_error_json(404, f"Bilinmeyen yol: {self.path}")
+            return
+
+        snapshot = self.server.jobs.snapshot(job_id)
+        if snapshot is None:
+            self._send_error_json(404, f"Bilinmeyen iş: {job_id}")
+            return
+
+        if sub is None:
+            self._send_json(200, json.dumps(snapshot, ensure_ascii=False, cls=NumpyEncoder))
+            return
+
+        # Progress stream: one JSON event per line until the job finishes
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.close_connection = True
+        # A client that disconnects closes the stream, which drops its subscriber queue
+        with closing(self.server.jobs.events(job_id)) as events:
+            try:
+                for event in events:
+                    self.wfile.write((json.dumps(event) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    def do_DELETE(self):
+        job_id, sub = self._job_path()
+        if job_id is None or sub is not None:
+            self._send_error_json(404, f"Bilinmeyen yol: {self.path}")
+            return
+        if self.server.jobs.get(job_id) is None:
+            self._send_error_json(404, f"Bilinmeyen iş: {job_id}")
+            return
+        self._send_json(200, json.dumps({"job_id": job_id, "cancelled": self.server.jobs.cancel(job_id)}))
+
+    def do_POST(self):
+        if self.path not in ("/analyze", "/jobs"):
+            self._send_error_json(404, f"Bilinmeyen yol: {self.path}")
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send_error_json(413, "İstek gövdesi çok büyük")
+            return
+
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            timeout = None
+            if self.path == "/jobs" and isinstance(payload, dict):
+                timeout = payload.pop("timeout", None)
+                if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+                    raise RequestError("timeout pozitif bir sayı olmalı")
+            args = _parse_request(payload)
+        except (ValueError, RequestError) as e:
+            self._send_error_json(400, str(e))
+            return
+
+        if self.path == "/jobs":
+            try:
+                job = self.server.jobs.submit(args, timeout)
+            except QueueFull as e:
+                self._send_error_json(429, str(e))
+                return
+            self._send_json(202, json.dumps({"job_id": job.id, "status": "queued"}))
+            return
+
+        try:
+            result, ok = run_analysis(args, session=self.server.session)
+        except Exception as e:
+            self._send_error_json(500, str(e))
+            return
+
+        if not ok:
+            self._send_json(404, json.dumps(result))
+            return
+
+        self._send_json(200, json.dumps(result, ensure_ascii=False, indent=2, cls=NumpyEncoder))
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    """Veritabanını, kütüphane eşleştiricilerini ve LUT'ları istekler arasında tutan HTTP sunucusu"""
+
+    daemon_threads = True
+
+    def __init__(self, address, quiet=False, workers=None, max_pending=None, job_timeout=None):
+        super().__init__(address, AnalysisHandler)
+        self.quiet = quiet
+        self.started = time.monotonic()
+        self.session = default_session()
+        self.jobs = BackgroundJobQueue(workers=workers, max_pending=max_pending, timeout=job_timeout)
+
+        # Build every registered library's matcher (and KD-tree for large
+        # libraries) before the first request; unions are built on first use
+        self.libraries = default_catalog().names()
+        for library in self.libraries:
+            get_pantone_matcher(library).match([[50.0, 0.0, 0.0]])
+        self.matcher = get_pantone_matcher()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kalıcı renk analiz sunucusu")
+    parser.add_argument("--host", default=os.environ.get("COLOR_ANALYSIS_HOST", DEFAULT_HOST))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("COLOR_ANALYSIS_PORT", DEFAULT_PORT)))
+    parser.add_argument("--quiet", action="store_true", help="İstek günlüğünü yazma")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="İş kuyruğu: eşzamanlı analiz süreci sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="İş kuyruğu: bekleyen + çalışan iş üst sınırı (varsayılan: işçi başına 4)")
+    parser.add_argument("--job-timeout", type=float, default=None, help="İş kuyruğu: iş başına süre sınırı (saniye)")
+    parser.add_argument("--session-memory", type=float, default=None,
+                        help="Oturum ara durumu bellek sınırı (MB, varsayılan: 512; 0: kapalı)")
+    args = parser.parse_args(argv)
+
+    if args.session_memory is not None:
+        # Pool workers inherit the environment and size their own sessions from it
+        os.environ[SESSION_MB_ENV] = f"{args.session_memory:g}"
+
+    server = AnalysisServer((args.host, args.port), quiet=args.quiet, workers=args.workers,
+                            max_pending=args.max_pending, job_timeout=args.job_timeout)
+    print(f"Renk analiz sunucusu: http://{args.host}:{server.server_address[1]} "
+          f"({len(server.matcher)} Pantone, {DATABASE_PATH.name}; kütüphaneler: {', '.join(server.libraries)})",
+          file=sys.stderr, flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.jobs.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Oturum Ara Durumu (artımlı yeniden analiz)
+- Aynı resimde yalnızca k aralığı ya da filtreler değiştiğinde decode,
+  arka plan algılama ve histogram yeniden yapılmaz
+- İki katman:
+  renkler : (renkler, sayılar, vektör alanları, yoksayılacak renkler);
+            arka planı çıkarılmış histogram, maskenin kendisi saklanmaz
+            (resim içeriği + arka plan ayarı başına)
+  örneklem: filtrelenmiş örneklem, Lab örnek kümesi ve k başına KMeans
+            modelleri (renkler + filtre ayarları başına). Her istek
+            sözlüğün ve model sözlüğünün kendi kopyasıyla çalışır ve
+            sonunda geri yazar; eşzamanlı istekler paylaşılan bir sözlüğü
+            değiştirmez
+- Yeni bir k aralığı yalnızca görülmemiş k değerlerini fit eder; filtre
+  değişikliği yalnızca histogramı yeniden filtreler
+- LRU, toplam bellek üst sınırıyla; sınırı aşan en eski girişler atılır
+
+Yalnızca uzun ömürlü süreçlerde (sunucu, iş kuyruğu işçileri) anlamlıdır.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+# Memory cap of the process-wide session state (MB)
+SESSION_MB_ENV = "COLOR_ANALYSIS_SESSION_MB"
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Rough per-entry overhead of Python objects around the arrays
+_ENTRY_OVERHEAD = 1024
+
+
+def estimate_nbytes(value):
+    """Dizilerin, KMeans modellerinin ve kapsayıcılarının yaklaşık bellek boyutu"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(v) for v in value.values()) + _ENTRY_OVERHEAD
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(v) for v in value) + 64 * len(value)
+    if hasattr(value, "cluster_centers_"):
+        # Fitted KMeans: centres and one label per sample dominate
+        return value.cluster_centers_.nbytes + value.labels_.nbytes + _ENTRY_OVERHEAD
+    return 64
+
+
+class SessionCache:
+    """Bellek üst sınırlı, iş parçacığı güvenli LRU ara durum önbelleği"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Girişi döndür ve en yeni olarak işaretle; yoksa None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """
+        Girişi ekle ya da güncelle (boyutu yeniden ölçülür) ve sınıra kadar
+        en eski girişleri at. Tek başına sınırı aşan giriş saklanmaz.
+        """
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (value, nbytes)
+            self.total_bytes += nbytes
+            while self.total_bytes > self.max_bytes:
+                _, (_, dropped) = self._entries.popitem(last=False)
+                self.total_bytes -= dropped
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "mb": round(self.total_bytes / (1024 * 1024), 1),
+                "max_mb": round(self.max_bytes / (1024 * 1024), 1),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_DEFAULT_SESSION = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_session():
+    """
+    Süreç genelinde paylaşılan oturum durumu (COLOR_ANALYSIS_SESSION_MB,
+    varsayılan 512 MB; 0 ise kapalı ve None döner)
+    """
+    global _DEFAULT_SESSION
+    with _DEFAULT_LOCK:
+        if _DEFAULT_SESSION is None:
+            try:
+                max_bytes = float(os.environ[SESSION_MB_ENV]) * 1024 * 1024
+            except (KeyError, ValueError):
+                max_bytes = DEFAULT_MAX_BYTES
+            if max_bytes <= 0:
+                return None
+            _DEFAULT_SESSION = SessionCache(max_bytes)
+        return _DEFAULT_SESSION
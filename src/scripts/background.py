@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arka Plan Maskesi (Bağlı Bileşen Etiketleme)
+- Dört köşeden, köşe rengine L1 toleransı içindeki 4-komşu bölge
+- PIL ImageDraw.floodfill ile birebir aynı bölge, piksel piksel Python
+  döngüsü yerine scipy.ndimage.label ile
+- Şerit şerit çalışır: şerit sınırları birleşim kümesiyle (union-find)
+  birleştirilir, bellek şerit boyutuyla sınırlıdır
+"""
+
+import numpy as np
+from scipy import ndimage
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+# Floodfill threshold (L1 distance over RGBA) used by the background detection
+FLOODFILL_TOLERANCE = 5
+
+
+def corner_seeds(w, h):
+    """Floodfill başlangıç noktaları (x, y), sırayla"""
+    return [(0, 0), (w - 1, 0), (0, h - 1), (w - 1, h - 1)]
+
+
+def unpack_rows(bits, top, bottom, w):
+    """Paketlenmiş maske satırlarını (rows, w) bool diziye aç"""
+    return np.unpackbits(bits[top:bottom], axis=1, count=w).astype(bool)
+
+
+def _tolerance_mask(rgba, seed, removed_rows, tolerance):
+    diff = np.abs(rgba.astype(np.int16) - seed.astype(np.int16)).sum(axis=2)
+    return (diff <= tolerance) & ~removed_rows
+
+
+def _seed_component(read_strip, size, rows_per_strip, removed, seed_xy, seed, tolerance):
+    """
+    Tohum pikselinin bağlı bileşenini removed'a ekle (iki geçiş)
+
+    1. geçiş: her şerit etiketlenir; şeridin üst/alt satırına değen
+       etiketler global kimlik alır ve komşu şeritlerle birleştirilir.
+    2. geçiş: şeritler yeniden etiketlenir, tohumun bileşenine düşen
+       pikseller işaretlenir.
+    """
+    w, h = size
+    sx, sy = seed_xy
+
+    # Whole image in one strip: a single labeling pass is enough
+    if rows_per_strip >= h:
+        mask = _tolerance_mask(read_strip(0, h), seed, unpack_rows(removed, 0, h, w), tolerance)
+        labels, _ = ndimage.label(mask)
+        removed |= np.packbits(labels == labels[sy, sx], axis=1)
+        return
+
+    strips = []
+    edges = []
+    n_global = 0
+    seed_gid = -1
+    prev_last = None
+
+    for top in range(0, h, rows_per_strip):
+        bottom = min(top + rows_per_strip, h)
+        mask = _tolerance_mask(read_strip(top, bottom), seed, unpack_rows(removed, top, bottom, w), tolerance)
+        labels, n = ndimage.label(mask)
+
+        # Only labels on the strip border (or holding the seed) can matter
+        border = [labels[0], labels[-1]]
+        if top <= sy < bottom:
+            border.append(labels[sy - top, sx:sx + 1])
+        kept = np.unique(np.concatenate(border))
+        kept = kept[kept > 0]
+
+        to_gid = np.full(n + 1, -1, dtype=np.int64)
+        to_gid[kept] = np.arange(n_global, n_global + kept.size)
+        n_global += kept.size
+        strips.append((top, bottom, kept, to_gid[kept]))
+
+        if top <= sy < bottom:
+            seed_gid = to_gid[labels[sy - top, sx]]
+
+        first = to_gid[labels[0]]
+        if prev_last is not None:
+            joined = (prev_last >= 0) & (first >= 0)
+            edges.append(np.column_stack((prev_last[joined], first[joined])))
+        prev_last = to_gid[labels[-1]]
+
+    if seed_gid < 0:
+        return
+
+    pairs = np.concatenate(edges) if edges else np.empty((0, 2), dtype=np.int64)
+    graph = coo_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])),
+                       shape=(n_global, n_global))
+    _, component = connected_components(graph, directed=False)
+    in_seed = component == component[seed_gid]
+
+    for top, bottom, kept, gids in strips:
+        if not in_seed[gids].any():
+            continue
+        mask = _tolerance_mask(read_strip(top, bottom), seed, unpack_rows(removed, top, bottom, w), tolerance)
+        labels, n = ndimage.label(mask)
+        hit = np.zeros(n + 1, dtype=bool)
+        hit[kept] = in_seed[gids]
+        removed[top:bottom] |= np.packbits(hit[labels], axis=1)
+
+
+def background_mask(read_strip, size, rows_per_strip, tolerance=FLOODFILL_TOLERANCE):
+    """
+    Köşelerden bağlı arka plan piksellerinin paketlenmiş bit maskesi (h, ceil(w/8))
+
+    read_strip(top, bottom): o satırların (rows, w, 4) uint8 RGBA dizisi.
+    Köşeler floodfill ile aynı sırada işlenir; önceki köşelerin sildiği
+    pikseller (floodfill'de (0, 0, 0, 0) olurlar) sonrakilere katılmaz.
+    """
+    w, h = size
+    removed = np.zeros((h, (w + 7) // 8), dtype=np.uint8)
+
+    for x, y in corner_seeds(w, h):
+        if unpack_rows(removed, y, y + 1, w)[0, x]:
+            continue
+
+        seed = read_strip(y, y + 1)[0, x].astype(np.int16)
+        if seed[3] == 0:
+            continue
+
+        # floodfill is a no-op when the seed already matches the fill colour
+        if np.abs(seed).sum() <= tolerance:
+            continue
+
+        _seed_component(read_strip, size, rows_per_strip, removed, (x, y), seed, tolerance)
+
+    return removed
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arka Plan Maskesi Benchmark'ı
+- Büyük sentetik görüntüde PIL ImageDraw.floodfill (4 köşe) ile
+  background_mask (tek şerit ve şeritli) karşılaştırması
+- Duvar saati süresi ve maskelerin piksel piksel aynı olduğu kontrolü
+
+Kullanım: python benchmarks/bench_background.py [--size 4000] [--rows 256]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from background import FLOODFILL_TOLERANCE, background_mask, corner_seeds, unpack_rows  # noqa: E402
+
+
+def synthetic_image(size, rng):
+    """Hafif gürültülü açık arka plan üzerinde rastgele dikdörtgenler"""
+    a = np.empty((size, size, 4), dtype=np.uint8)
+    a[..., :3] = 250
+    a[..., 3] = 255
+    a[..., :3] -= rng.integers(0, 2, (size, size, 3), dtype=np.uint8)
+    for _ in range(200):
+        y, x = rng.integers(0, size, 2)
+        hh, ww = rng.integers(size // 50, size // 8, 2)
+        a[y:y + hh, x:x + ww, :3] = rng.integers(0, 200, 3)
+    return a
+
+
+def floodfill_mask(a):
+    """Eski yöntem: köşelerden floodfill, (0, 0, 0, 0) olan pikseller"""
+    img = Image.fromarray(a, "RGBA").copy()
+    w, h = img.size
+    for xy in corner_seeds(w, h):
+        if img.getpixel(xy)[3] > 0:
+            ImageDraw.floodfill(img, xy, (0, 0, 0, 0), thresh=FLOODFILL_TOLERANCE)
+    return (np.array(img) == 0).all(axis=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arka plan maskesi benchmark'ı")
+    parser.add_argument("--size", type=int, default=4000)
+    parser.add_argument("--rows", type=int, default=256, help="şeritli mod için şerit yüksekliği")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    a = synthetic_image(args.size, np.random.default_rng(args.seed))
+    h, w = a.shape[:2]
+    print(f"{w}x{h} RGBA")
+
+    start = time.perf_counter()
+    reference = floodfill_mask(a)
+    baseline = time.perf_counter() - start
+    print(f"{'method':>12} {'wall_s':>8} {'speedup':>8} {'identical':>10}")
+    print(f"{'floodfill':>12} {baseline:>8.2f} {1.0:>8.2f} {'-':>10}")
+
+    for label, rows in (("whole", h), (f"strips/{args.rows}", args.rows)):
+        start = time.perf_counter()
+        bits = background_mask(lambda top, bottom: a[top:bottom], (w, h), rows)
+        elapsed = time.perf_counter() - start
+        same = np.array_equal(unpack_rows(bits, 0, h, w), reference)
+        print(f"{label:>12} {elapsed:>8.2f} {baseline / elapsed:>8.2f} {str(same):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pantone İndeks Benchmark'ı
+- Gerçek veritabanından türetilmiş büyüyen sentetik kütüphaneler
+- Kaba kuvvet (PantoneMatcher) ile KD-tree (PantoneIndex) sorgu süresi
+- İndeksin kaba kuvvetle aynı swatch'ı bulma oranı
+
+Kullanım: python benchmarks/bench_pantone_index.py [--sizes 2000 8000 32000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from color_analysis import PANTONE_DATABASE  # noqa: E402
+from color_convert import srgb_u8_to_lab  # noqa: E402
+from pantone_matcher import PantoneIndex, PantoneMatcher  # noqa: E402
+
+
+def synthetic_library(base_lab, size, rng):
+    """Gerçek swatch'ların etrafına gürültü ekleyerek büyük kütüphane üret"""
+    picks = base_lab[rng.integers(0, len(base_lab), size)]
+    lab = picks + rng.normal(0, 3.0, picks.shape)
+    lab[:, 0] = np.clip(lab[:, 0], 0, 100)
+    names = [f"SYN {i}" for i in range(size)]
+    return names, lab
+
+
+def query_colors(count, rng):
+    """sRGB gamutu içinde rastgele sorgu renkleri (Lab D50)"""
+    return srgb_u8_to_lab(rng.integers(0, 256, (count, 3), dtype=np.uint8))
+
+
+def time_queries(matcher, queries, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for q in queries:
+            matcher.nearest(q[None, :])
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pantone indeks benchmark'ı")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 8000, 32000, 128000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    base_lab = PANTONE_DATABASE[["L", "a", "b"]].to_numpy(dtype=float)
+    queries = query_colors(args.queries, rng)
+
+    print(f"{'size':>8} {'brute_us':>10} {'index_us':>10} {'speedup':>8} {'agree':>7} {'max_dE_gap':>10} {'build_ms':>9}")
+    for size in args.sizes:
+        names, lab = synthetic_library(base_lab, size, rng)
+        brute = PantoneMatcher(names, names, lab)
+
+        start = time.perf_counter()
+        index = PantoneIndex(names, names, lab)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        t_brute = time_queries(brute, queries, args.repeat)
+        t_index = time_queries(index, queries, args.repeat)
+
+        idx_b, de_b = brute.nearest(queries)
+        idx_i, de_i = index.nearest(queries)
+        agree = float(np.mean(idx_b == idx_i))
+        gap = float(np.max(de_i - de_b))
+
+        print(f"{size:>8} {t_brute * 1e6:>10.1f} {t_index * 1e6:>10.1f} {t_brute / t_index:>8.1f} "
+              f"{agree:>7.3f} {gap:>10.3f} {build_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
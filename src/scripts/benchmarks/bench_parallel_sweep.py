@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Paralel k Taraması Benchmark'ı
+- Sentetik bir renk kümesi üzerinde sweep motoru farklı işçi sayılarıyla
+- Duvar saati süresi ve tek iş parçacıklı seri çalışmaya göre bit düzeyinde
+  eşitlik kontrolü (cluster_centers_, labels_, inertia_ ==); paralel
+  çalışmalardan biri farklıysa çıkış kodu 1
+- Seri yol (jobs=1) varsayılan iş parçacığı sayısıyla çalışır; tek iş
+  parçacıklı referansa göre süresi ayrıca yazılır (seri yol yavaşlamamalı)
+- --threads ile çok çekirdekli bir sunucunun OpenMP varsayılanı taklit edilir
+  (OMP_NUM_THREADS, scikit-learn'ün çekirdek sayısı sınırını kaldırır)
+
+Kullanım: python benchmarks/bench_parallel_sweep.py [--jobs 1 2 4 8] [--k-max 20] [--threads 16]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from threadpoolctl import threadpool_limits  # noqa: E402
+
+from clustering import fit_sweep  # noqa: E402
+from color_convert import srgb_u8_to_lab  # noqa: E402
+
+
+def synthetic_samples(n_colors, n_blobs, rng):
+    """Birkaç ana renk etrafında dağılmış benzersiz renkler ve ağırlıkları"""
+    centers = rng.integers(0, 256, (n_blobs, 3))
+    picks = centers[rng.integers(0, n_blobs, n_colors)] + rng.normal(0, 12, (n_colors, 3))
+    rgb = np.clip(np.round(picks), 0, 255).astype(np.uint8)
+    rgb = np.unique(rgb, axis=0)
+    weights = rng.integers(1, 400, rgb.shape[0]).astype(np.float64)
+    return srgb_u8_to_lab(rgb), weights
+
+
+def same_models(a, b):
+    return all(
+        np.array_equal(x.cluster_centers_, y.cluster_centers_)
+        and np.array_equal(x.labels_, y.labels_)
+        and x.inertia_ == y.inertia_
+        for x, y in zip(a, b)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paralel k taraması benchmark'ı")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--colors", type=int, default=20000)
+    parser.add_argument("--blobs", type=int, default=12)
+    parser.add_argument("--k-min", type=int, default=2)
+    parser.add_argument("--k-max", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threads", type=int, default=None, help="OpenMP iş parçacığı sayısı (OMP_NUM_THREADS)")
+    args = parser.parse_args()
+
+    if args.threads:
+        # Read by scikit-learn when it sizes its OpenMP pool, so set before the first fit
+        os.environ["OMP_NUM_THREADS"] = str(args.threads)
+
+    rng = np.random.default_rng(args.seed)
+    X, w = synthetic_samples(args.colors, args.blobs, rng)
+    k_values = range(args.k_min, args.k_max + 1)
+
+    print(f"{X.shape[0]} benzersiz renk, k={args.k_min}..{args.k_max}")
+
+    # Reference: the serial sweep on one OpenMP thread, as every pool worker runs
+    start = time.perf_counter()
+    with threadpool_limits(1):
+        reference = fit_sweep(X, w, k_values, n_jobs=1)
+    reference_time = time.perf_counter() - start
+    print(f"seri, 1 iş parçacığı: {reference_time:.2f} s")
+
+    print(f"{'jobs':>5} {'wall_s':>8} {'speedup':>8} {'identical':>10}")
+    serial_time = None
+    mismatched = []
+    for n_jobs in args.jobs:
+        start = time.perf_counter()
+        models = fit_sweep(X, w, k_values, n_jobs=n_jobs)
+        elapsed = time.perf_counter() - start
+
+        if serial_time is None:
+            serial_time = elapsed
+
+        identical = same_models(reference, models)
+        # The serial path keeps the OpenMP default; only pool results must match bit for bit
+        if not identical and n_jobs > 1:
+            mismatched.append(n_jobs)
+        print(f"{n_jobs:>5} {elapsed:>8.2f} {serial_time / elapsed:>8.2f} {str(identical):>10}")
+
+    if args.jobs[0] == 1:
+        print(f"seri yol / tek iş parçacığı: {serial_time / reference_time:.2f}x süre")
+
+    if mismatched:
+        print(f"Tek iş parçacıklı seri çalışmadan farklı sonuç: jobs={mismatched}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analiz Hattı Benchmark'ı
+- Yerelde üretilen sentetik resimler (indirme yok): düz vektörel dolgular,
+  gradyan, gürültülü fotoğraf, şeffaf ve düz arka planlı çizimler
+- Boyutlar megapiksel olarak (varsayılan 1 ve 10; 50 için --sizes 1 10 50)
+- Her aşama ayrı ölçülür: decode, background, histogram, sampler, kmeans,
+  pantone ve uçtan uca analyze_svg
+- Her resim ayrı bir süreçte çalışır; process_peak_rss_mb o sürecin
+  şimdiye kadarki tepe RSS'idir (ru_maxrss, azalmaz). Aşama satırındaki
+  değer aşama sonundaki süreç tepesi, rss_growth_mb aşamanın tepeyi ne
+  kadar yükselttiğidir (önceki aşamalar daha çok kullandıysa 0)
+- Sonuçlar JSON olarak yazılır, kayıtlı bir temel (baseline) ile
+  karşılaştırılabilir: aşama süreleri ve süreç tepe RSS'i
+
+Kullanım:
+  python benchmarks/bench_pipeline.py --sizes 1 10 --output sonuc.json
+  python benchmarks/bench_pipeline.py --baseline sonuc.json [--threshold 1.25] [--rss-threshold 1.25]
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+FIXTURES = ("flat", "gradient", "photo", "transparent_bg", "solid_bg")
+
+STAGES = ("decode", "background", "histogram", "sampler", "kmeans", "pantone", "total")
+
+# Fixture images are regenerated only when missing
+FIXTURE_VERSION = 1
+
+
+# ============================================================================
+# SENTETİK RESİMLER
+# ============================================================================
+
+def _shape(megapixels):
+    """En-boy oranı 4:3, toplam piksel ≈ megapixels × 10^6"""
+    h = int(round((megapixels * 1e6 * 3 / 4) ** 0.5))
+    return int(round(h * 4 / 3)), h
+
+
+def _flat_art(img, rng, n_shapes, palette):
+    draw = ImageDraw.Draw(img)
+    w, h = img.size
+    for _ in range(n_shapes):
+        x0, y0 = rng.integers(0, w), rng.integers(0, h)
+        x1, y1 = x0 + rng.integers(w // 40, w // 4), y0 + rng.integers(h // 40, h // 4)
+        color = tuple(int(c) for c in palette[rng.integers(0, len(palette))]) + (255,)
+        if rng.random() < 0.5:
+            draw.rectangle((x0, y0, x1, y1), fill=color)
+        else:
+            draw.ellipse((x0, y0, x1, y1), fill=color)
+
+
+def make_fixture(kind, megapixels, seed=0):
+    """Sentetik RGBA resim üret"""
+    rng = np.random.default_rng(seed)
+    w, h = _shape(megapixels)
+    palette = rng.integers(0, 256, (8, 3))
+
+    if kind == "flat":
+        img = Image.new("RGBA", (w, h), tuple(int(c) for c in palette[0]) + (255,))
+        _flat_art(img, rng, 120, palette[1:])
+        return img
+
+    if kind == "gradient":
+        x = np.linspace(0.0, 1.0, w, dtype=np.float32)[None, :]
+        y = np.linspace(0.0, 1.0, h, dtype=np.float32)[:, None]
+        a = np.empty((h, w, 4), dtype=np.uint8)
+        a[..., 0] = (255 * x).astype(np.uint8)
+        a[..., 1] = (255 * y).astype(np.uint8)
+        a[..., 2] = (255 * (1 - x) * y).astype(np.uint8)
+        a[..., 3] = 255
+        return Image.fromarray(a, "RGBA")
+
+    if kind == "photo":
+        # Smooth low-frequency field upsampled, plus per-pixel sensor noise
+        small = rng.integers(0, 256, (max(2, h // 64), max(2, w // 64), 3), dtype=np.uint8)
+        base = np.asarray(Image.fromarray(small, "RGB").resize((w, h), Image.BICUBIC), dtype=np.int16)
+        noisy = base + rng.integers(-12, 13, base.shape, dtype=np.int16)
+        a = np.empty((h, w, 4), dtype=np.uint8)
+        a[..., :3] = np.clip(noisy, 0, 255)
+        a[..., 3] = 255
+        return Image.fromarray(a, "RGBA")
+
+    if kind == "transparent_bg":
+        img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+        _flat_art(img, rng, 60, palette)
+        return img
+
+    if kind == "solid_bg":
+        img = Image.new("RGBA", (w, h), (250, 250, 250, 255))
+        _flat_art(img, rng, 60, palette[1:])
+        return img
+
+    raise ValueError(f"Bilinmeyen fixture: {kind}")
+
+
+def fixture_path(directory, kind, megapixels, seed):
+    path = Path(directory) / f"v{FIXTURE_VERSION}_{kind}_{megapixels:g}mp_s{seed}.png"
+    if not path.exists():
+        tmp = path.with_suffix(".tmp.png")
+        make_fixture(kind, megapixels, seed).save(tmp, compress_level=1)
+        os.replace(tmp, path)
+    return path
+
+
+# ============================================================================
+# AŞAMA ÖLÇÜMÜ (alt süreçte)
+# ============================================================================
+
+def _rss_mb():
+    """Sürecin şimdiye kadarki tepe RSS değeri (MB); hiç azalmaz"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_stages(path, k_min, k_max, repeat):
+    """Aşamaları sırayla çalıştır; her aşama için en iyi süre, süreç tepe RSS'i ve aşamadaki artışı"""
+    from background import background_mask
+    from color_analysis import (analyze_pixel_colors, analyze_svg, find_closest_pantones,
+                                find_optimal_k_advanced, get_pantone_matcher, sample_colors)
+
+    matcher = get_pantone_matcher()
+    stages = {}
+    counts = {}
+
+    def timed(name, fn):
+        best = float("inf")
+        before = _rss_mb()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            value = fn()
+            best = min(best, time.perf_counter() - start)
+        peak = _rss_mb()
+        stages[name] = {"seconds": round(best, 6), "process_peak_rss_mb": round(peak, 1),
+                        "rss_growth_mb": round(peak - before, 1)}
+        return value
+
+    img_array = timed("decode", lambda: np.array(Image.open(path).convert("RGBA")))
+    h, w = img_array.shape[:2]
+
+    removed = timed("background", lambda: background_mask(lambda top, bottom: img_array[top:bottom], (w, h), h))
+    colors, hist_counts, total_pixels, _ = timed("histogram", lambda: analyze_pixel_colors(img_array, removed))
+    counts["pixels"] = int(total_pixels)
+    counts["unique_colors"] = int(colors.size)
+
+    rgb_array, sample_weight, k_lo = timed("sampler", lambda: sample_colors(colors, hist_counts, k_min, k_max))
+    counts["sampled_colors"] = int(len(rgb_array))
+
+    if len(rgb_array):
+        optimal_k, centers, _ = timed("kmeans", lambda: find_optimal_k_advanced(rgb_array, k_lo, k_max, sample_weight))
+        counts["optimal_k"] = int(optimal_k)
+        timed("pantone", lambda: find_closest_pantones(centers, matcher))
+
+    del img_array, removed
+    timed("total", lambda: analyze_svg(path, 10000, k_min=k_min, k_max=k_max, pantone_df=matcher,
+                                       ignore_background=True))
+
+    return {"stages": stages, "counts": counts, "process_peak_rss_mb": round(_rss_mb(), 1)}
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def environment():
+    import sklearn
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def _peak_rss(result):
+    # Results written before the rename used "peak_rss_mb" for the same value
+    return result.get("process_peak_rss_mb", result.get("peak_rss_mb"))
+
+
+def compare(results, baseline, threshold, rss_threshold):
+    """
+    Temel ile aşama aşama süre oranı ve süreç tepe RSS oranı; threshold /
+    rss_threshold'u aşanlar gerileme sayılır ("stage": "rss")
+    """
+    base = {(r["fixture"], r["megapixels"]): r for r in baseline["results"]}
+    regressions = []
+
+    print(f"\n{'fixture':>15} {'MP':>4} {'stage':>11} {'base_s':>9} {'now_s':>9} {'ratio':>6}")
+    for r in results:
+        ref = base.get((r["fixture"], r["megapixels"]))
+        if ref is None:
+            continue
+        for stage, now in r["stages"].items():
+            old = ref["stages"].get(stage)
+            if old is None or old["seconds"] <= 0:
+                continue
+            ratio = now["seconds"] / old["seconds"]
+            flag = " !" if ratio > threshold else ""
+            print(f"{r['fixture']:>15} {r['megapixels']:>4g} {stage:>11} {old['seconds']:>9.4f} "
+                  f"{now['seconds']:>9.4f} {ratio:>6.2f}{flag}")
+            if ratio > threshold:
+                regressions.append({"fixture": r["fixture"], "megapixels": r["megapixels"],
+                                    "stage": stage, "ratio": round(ratio, 3)})
+
+    print(f"\n{'fixture':>15} {'MP':>4} {'base_rss':>9} {'now_rss':>9} {'ratio':>6}")
+    for r in results:
+        ref = base.get((r["fixture"], r["megapixels"]))
+        old = _peak_rss(ref) if ref is not None else None
+        if not old:
+            continue
+        ratio = r["process_peak_rss_mb"] / old
+        flag = " !" if ratio > rss_threshold else ""
+        print(f"{r['fixture']:>15} {r['megapixels']:>4g} {old:>9.1f} {r['process_peak_rss_mb']:>9.1f} {ratio:>6.2f}{flag}")
+        if ratio > rss_threshold:
+            regressions.append({"fixture": r["fixture"], "megapixels": r["megapixels"],
+                                "stage": "rss", "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analiz hattı benchmark'ı")
+    parser.add_argument("--fixtures", nargs="+", choices=FIXTURES, default=list(FIXTURES))
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 10], help="megapiksel (ör. 1 10 50)")
+    parser.add_argument("--k-min", type=int, default=2)
+    parser.add_argument("--k-max", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=1, help="aşama başına tekrar (en iyisi alınır)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixtures-dir", default=str(Path(tempfile.gettempdir()) / "color_analysis_bench"))
+    parser.add_argument("--output", help="sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--baseline", help="karşılaştırılacak önceki sonuç JSON dosyası")
+    parser.add_argument("--threshold", type=float, default=1.25, help="gerileme sayılan süre oranı")
+    parser.add_argument("--rss-threshold", type=float, default=1.25, help="gerileme sayılan süreç tepe RSS oranı")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Child process: measure one fixture and print its result
+    if args.run_one:
+        print(json.dumps(run_stages(args.run_one, args.k_min, args.k_max, args.repeat)))
+        return
+
+    Path(args.fixtures_dir).mkdir(parents=True, exist_ok=True)
+
+    results = []
+    print(f"{'fixture':>15} {'MP':>4} " + " ".join(f"{s:>10}" for s in STAGES) + f" {'peak_rss':>8}")
+    for megapixels in args.sizes:
+        for kind in args.fixtures:
+            path = fixture_path(args.fixtures_dir, kind, megapixels, args.seed)
+            child = subprocess.run(
+                [sys.executable, __file__, "--run-one", str(path), "--k-min", str(args.k_min),
+                 "--k-max", str(args.k_max), "--repeat", str(args.repeat)],
+                capture_output=True, text=True)
+            if child.returncode != 0:
+                print(f"{kind:>15} {megapixels:>4g} HATA: {child.stderr.strip().splitlines()[-1:]}", file=sys.stderr)
+                continue
+
+            result = {"fixture": kind, "megapixels": megapixels, **json.loads(child.stdout)}
+            results.append(result)
+            times = " ".join(f"{result['stages'][s]['seconds']:>10.4f}" if s in result["stages"] else f"{'-':>10}"
+                             for s in STAGES)
+            print(f"{kind:>15} {megapixels:>4g} {times} {result['process_peak_rss_mb']:>8.1f}")
+
+    report = {"environment": environment(), "results": results}
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(results, json.load(f), args.threshold, args.rss_threshold)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if report.get("regressions"):
+        print(f"\n{len(report['regressions'])} gerileme (süre > x{args.threshold}, RSS > x{args.rss_threshold})",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
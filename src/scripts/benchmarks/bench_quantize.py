@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ön Niceleme Benchmark'ı
+- bench_pipeline sentetik resimleri üzerinde histogram bir kez çıkarılır,
+  kümeleme (niceleme + örnekleme + KMeans) her ızgara aralığıyla tekrarlanır
+- Ham ve nicelenmiş benzersiz renk sayısı, süre ve nicelemesiz çalışmaya göre hız
+- Son paletin değişimi (Delta E 2000, her referans merkezden paletteki en
+  yakın merkeze): nicelemesiz palete göre (dE_base) ve aynı k ile tüm ham
+  histogram üzerinde ağırlıklı KMeans'e göre (dE_ref ortalama / en büyük)
+- --k ile k sabitlenirse yalnızca nicelemenin etkisi, elbow seçimi olmadan görülür
+
+Kullanım: python benchmarks/bench_quantize.py [--fixtures photo gradient] [--sizes 1 10] [--buckets 1 2 3 5]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+from sklearn.cluster import KMeans
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_pipeline import FIXTURES, fixture_path  # noqa: E402
+from color_analysis import NoColorsError, analyze_pixel_colors, cluster_colors  # noqa: E402
+from color_convert import srgb_u8_to_lab, unpack_rgb  # noqa: E402
+from pantone_matcher import delta_e_cie2000_matrix  # noqa: E402
+
+
+def reference_palette(colors, counts, k, seed):
+    """Tüm ham histogram üzerinde ağırlıklı KMeans merkezleri (Lab)"""
+    X = srgb_u8_to_lab(unpack_rgb(colors))
+    return KMeans(n_clusters=k, n_init=1, random_state=seed).fit(X, sample_weight=counts).cluster_centers_
+
+
+def palette_shift(reference_lab, centers_rgb):
+    """Her referans merkezden en yakın palet merkezine ΔE2000: (ortalama, en büyük)"""
+    de = delta_e_cie2000_matrix(reference_lab, srgb_u8_to_lab(np.array(centers_rgb, dtype=np.uint8))).min(axis=1)
+    return float(de.mean()), float(de.max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ön niceleme benchmark'ı")
+    parser.add_argument("--fixtures", nargs="+", choices=FIXTURES, default=["photo", "gradient", "flat"])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1], help="megapiksel")
+    parser.add_argument("--buckets", type=float, nargs="+", default=[1, 2, 3, 5], help="Lab ızgarası aralıkları (ΔE76)")
+    parser.add_argument("--k", type=int, default=None, help="k'yı sabitle (varsayılan: elbow 2..10)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixtures-dir", default=str(Path(tempfile.gettempdir()) / "color_analysis_bench"))
+    args = parser.parse_args()
+
+    k_min, k_max = (args.k, args.k) if args.k else (2, 10)
+    Path(args.fixtures_dir).mkdir(parents=True, exist_ok=True)
+
+    print(f"{'fixture':>10} {'MP':>4} {'bucket':>6} {'colors':>9} {'k':>3} {'seconds':>8} {'speedup':>8} "
+          f"{'dE_base':>8} {'dE_ref':>8} {'dE_rmax':>8}")
+    for megapixels in args.sizes:
+        for kind in args.fixtures:
+            path = fixture_path(args.fixtures_dir, kind, megapixels, args.seed)
+            colors, counts, _, _ = analyze_pixel_colors(np.array(Image.open(path).convert("RGBA")))
+            print(f"{kind:>10} {megapixels:>4g} {'raw':>6} {colors.size:>9}")
+
+            references = {}
+            base = base_time = None
+            for bucket in [None] + args.buckets:
+                label = f"{bucket:g}" if bucket else "-"
+                start = time.perf_counter()
+                try:
+                    _, optimal_k, centers, _, n_colors = cluster_colors(colors, counts, k_min=k_min, k_max=k_max,
+                                                                        quantize=bucket)
+                except NoColorsError as e:
+                    print(f"{kind:>10} {megapixels:>4g} {label:>6} {'':>9} {'':>3} {'':>8} {'':>8}  {e}")
+                    continue
+                elapsed = time.perf_counter() - start
+
+                if bucket is None:
+                    base, base_time = srgb_u8_to_lab(np.array(centers, dtype=np.uint8)), elapsed
+                if optimal_k not in references:
+                    references[optimal_k] = reference_palette(colors, counts, optimal_k, args.seed)
+
+                de_base = f"{palette_shift(base, centers)[0]:>8.2f}" if base is not None else f"{'-':>8}"
+                speedup = f"{base_time / elapsed:>8.2f}" if base_time else f"{'-':>8}"
+                de_ref, de_max = palette_shift(references[optimal_k], centers)
+                print(f"{kind:>10} {megapixels:>4g} {label:>6} {n_colors:>9} {optimal_k:>3} {elapsed:>8.3f} "
+                      f"{speedup} {de_base} {de_ref:>8.2f} {de_max:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+İş Kuyruğu Dayanıklılık Kontrolü
+- Çalışan bir işin işçi süreci öldürülür (SIGKILL): iş "failed" olmalı,
+  kırık havuz kapatılmalı (yönetim thread'i durur) ve sonraki iş yeni
+  havuzda "done" ile bitmeli
+- Olay akışını erken bırakan (bağlantısı kopan) abone: akış kapatılınca
+  abone kuyruğu hemen bırakılmalı
+- Herhangi bir kontrol tutmazsa çıkış kodu 1
+
+Kullanım: python benchmarks/check_job_queue.py
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from analysis_jobs import BackgroundJobQueue, JobQueue  # noqa: E402
+from bench_pipeline import fixture_path  # noqa: E402
+from color_analysis import parse_analysis_args  # noqa: E402
+
+
+async def wait_until(condition, timeout, step=0.05):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(step)
+    return True
+
+
+async def killed_worker(fixtures_dir):
+    """(kontrol adı, geçti mi) listesi"""
+    slow = str(fixture_path(fixtures_dir, "photo", 4, 0))
+    quick = str(fixture_path(fixtures_dir, "flat", 0.25, 0))
+    checks = []
+
+    async with JobQueue(workers=1) as jobs:
+        job = jobs.submit(parse_analysis_args([slow]))
+        started = await wait_until(lambda: job.stage is not None, 120)
+        checks.append(("iş bir aşamaya ulaştı", started))
+
+        broken = jobs._pool
+        for pid in list(broken._processes):
+            os.kill(pid, signal.SIGKILL)
+        await jobs.wait(job.id)
+        checks.append((f"öldürülen işçinin işi failed ({job.status}: {job.error})", job.status == "failed"))
+        checks.append(("havuz yenilendi", jobs._pool is not broken))
+
+        manager_stopped = await wait_until(
+            lambda: broken._executor_manager_thread is None or not broken._executor_manager_thread.is_alive(), 10)
+        checks.append(("kırık havuzun yönetim thread'i durdu", manager_stopped))
+
+        job = jobs.submit(parse_analysis_args([quick]))
+        await jobs.wait(job.id)
+        checks.append((f"sonraki iş done ({job.status})", job.status == "done"))
+
+    return checks
+
+
+def dropped_subscriber(fixtures_dir):
+    """Senkron sarmalayıcıda (sunucu) erken kapatılan olay akışı"""
+    slow = str(fixture_path(fixtures_dir, "photo", 4, 0))
+    jobs = BackgroundJobQueue(workers=1)
+    try:
+        job = jobs.submit(parse_analysis_args([slow]))
+        events = jobs.events(job.id)
+        next(events)
+        subscribed = jobs._sync(len, job._subscribers)
+        events.close()
+        released = jobs._sync(len, job._subscribers)
+        jobs.cancel(job.id)
+    finally:
+        jobs.close()
+    return [(f"kapatılan akışın abonesi bırakıldı ({subscribed} → {released})", subscribed == 1 and released == 0)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İş kuyruğu dayanıklılık kontrolü")
+    parser.add_argument("--fixtures-dir", default=str(Path(tempfile.gettempdir()) / "color_analysis_bench"))
+    args = parser.parse_args()
+    Path(args.fixtures_dir).mkdir(parents=True, exist_ok=True)
+
+    checks = asyncio.run(killed_worker(args.fixtures_dir)) + dropped_subscriber(args.fixtures_dir)
+    failed = [name for name, ok in checks if not ok]
+    for name, ok in checks:
+        print(f"{'tamam' if ok else 'HATA':>6}  {name}")
+
+    if failed:
+        print(f"\n{len(failed)} kontrol başarısız", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Çıktı Regresyon Kontrolü
+- Sabit tohumlu sentetik resimler (40 renkli paletli GIF, düz çizim,
+  fotoğraf) varsayılan ayarlarla analiz edilir
+- optimal_k, merkez renkleri, yüzdeler ve Pantone kodları kayıtlı temelle
+  (outputs_baseline.json) birebir karşılaştırılır; fark varsa çıkış kodu 1
+- Çıktıyı bilerek değiştiren bir değişiklikten sonra temel --update ile
+  yeniden yazılır (değişiklik commit mesajında belirtilmeli). Çıktı
+  değiştiyse --update color_analysis.ANALYSIS_VERSION artırılmadan
+  reddedilir; sürüm sonuç önbelleği anahtarının parçasıdır.
+
+Kullanım:
+  python benchmarks/check_outputs.py
+  python benchmarks/check_outputs.py --update
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_pipeline import environment, fixture_path  # noqa: E402
+from color_analysis import ANALYSIS_VERSION, parse_analysis_args, run_analysis  # noqa: E402
+
+
+BASELINE_PATH = Path(__file__).resolve().parent / "outputs_baseline.json"
+
+CASES = ("palette", "flat", "photo")
+
+# Palette fixtures are regenerated only when missing
+PALETTE_VERSION = 1
+
+
+def palette_fixture(directory, seed=0):
+    """40 renkli paletle çizilmiş 800x600 P modlu GIF"""
+    path = Path(directory) / f"p{PALETTE_VERSION}_palette40_s{seed}.gif"
+    if path.exists():
+        return path
+
+    rng = np.random.default_rng(seed)
+    palette = rng.integers(0, 256, (40, 3))
+    img = Image.new("P", (800, 600), 0)
+    img.putpalette(palette.astype(np.uint8).ravel().tolist())
+    draw = ImageDraw.Draw(img)
+    for _ in range(400):
+        x0, y0 = int(rng.integers(0, 800)), int(rng.integers(0, 600))
+        x1, y1 = x0 + int(rng.integers(10, 200)), y0 + int(rng.integers(10, 150))
+        draw.rectangle((x0, y0, x1, y1), fill=int(rng.integers(0, 40)))
+
+    tmp = path.with_suffix(".tmp.gif")
+    img.save(tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def case_path(case, directory):
+    if case == "palette":
+        return palette_fixture(directory)
+    return fixture_path(directory, case, 0.25, 0)
+
+
+def summarize(result):
+    """Karşılaştırılan alanlar: k, renkler, yüzdeler, Pantone kodları"""
+    return {
+        "optimal_k": result["kmeans"]["optimal_k"],
+        "colors": [
+            {"rgb": list(c["rgb"]), "percentage": c["percentage"], "pantone": c["pantone"]["code"]}
+            for c in result["kmeans"]["colors"]
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çıktı regresyon kontrolü")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--fixtures-dir", default=str(Path(tempfile.gettempdir()) / "color_analysis_bench"))
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--update", action="store_true", help="temeli mevcut çıktılarla yeniden yaz")
+    args = parser.parse_args()
+
+    Path(args.fixtures_dir).mkdir(parents=True, exist_ok=True)
+
+    outputs = {}
+    for case in args.cases:
+        result, ok = run_analysis(parse_analysis_args([str(case_path(case, args.fixtures_dir))]))
+        if not ok:
+            print(f"{case}: HATA {result.get('error')}", file=sys.stderr)
+            sys.exit(1)
+        outputs[case] = summarize(result)
+
+    previous = {}
+    if Path(args.baseline).exists():
+        with open(args.baseline) as f:
+            previous = json.load(f)
+
+    if args.update:
+        changed = any(previous.get("outputs", {}).get(case) != now for case, now in outputs.items())
+        if changed and previous.get("analysis_version") == ANALYSIS_VERSION:
+            # Cached results of the old analysis would otherwise still be served
+            print(f"Çıktı değişti: önce color_analysis.ANALYSIS_VERSION ({ANALYSIS_VERSION}) artırılmalı",
+                  file=sys.stderr)
+            sys.exit(1)
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": environment(), "analysis_version": ANALYSIS_VERSION, "outputs": outputs},
+                      f, indent=2)
+            f.write("\n")
+        print(f"{args.baseline} güncellendi")
+        return
+
+    baseline = previous["outputs"]
+
+    changed = []
+    for case, now in outputs.items():
+        same = baseline.get(case) == now
+        print(f"{case:>10} {'aynı' if same else 'FARKLI'}")
+        if not same:
+            changed.append(case)
+            print(f"  temel: {json.dumps(baseline.get(case), ensure_ascii=False)}")
+            print(f"  şimdi: {json.dumps(now, ensure_ascii=False)}")
+
+    if changed:
+        print(f"\n{len(changed)} çıktı temelden farklı", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
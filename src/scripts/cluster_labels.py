@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Küme Etiket Haritası (--labels)
+- Her benzersiz renk için en yakın KMeans merkezi (Lab) bir kez hesaplanır:
+  paketlenmiş 24-bit renk → küme indeksi arama tablosu (2^24 bayt)
+- Etiketleme resim üzerinde tek bir vektörel toplama (lut[paketlenmiş]);
+  piksel başına predict yok, akış modunda şerit şerit
+- Sayılmayan pikseller (şeffaf, arka plan, yoksayılan renkler) NO_LABEL
+- Küme başına kesin piksel sayıları etiket haritasından
+- Maskeler: satır öncelikli RLE ya da 1-bit PNG (siyah = küme, beyaz = diğer;
+  /api/calculate-from-masks'e gönderilen maskelerle aynı biçim)
+"""
+
+import base64
+import io
+
+import numpy as np
+from PIL import Image
+
+from background import unpack_rows
+from color_convert import pack_rgb, srgb_to_lab, srgb_u8_to_lab, unpack_rgb
+
+
+LABEL_FORMATS = ("rle", "png")
+
+# Label of pixels that belong to no cluster
+NO_LABEL = 255
+
+# Colours converted to Lab per chunk while the lookup table is built
+LUT_CHUNK = 1 << 20
+
+
+def color_lut(colors, centers_rgb):
+    """
+    Paketlenmiş renk → en yakın merkez indeksi tablosu
+
+    colors: kümelenen (filtrelenmiş) paketlenmiş renkler; tabloda olmayan
+    renkler NO_LABEL kalır.
+    """
+    if len(centers_rgb) >= NO_LABEL:
+        raise ValueError(f"En fazla {NO_LABEL - 1} küme etiketlenebilir")
+
+    lut = np.full(1 << 24, NO_LABEL, dtype=np.uint8)
+    centers = srgb_u8_to_lab(np.array(centers_rgb, dtype=np.uint8))
+    colors = np.asarray(colors, dtype=np.uint32)
+    for start in range(0, colors.size, LUT_CHUNK):
+        chunk = colors[start:start + LUT_CHUNK]
+        lab = srgb_to_lab(unpack_rgb(chunk))
+        lut[chunk] = ((lab[:, None, :] - centers[None, :, :]) ** 2).sum(axis=-1).argmin(axis=1)
+    return lut
+
+
+def label_image(read_strip, size, rows_per_strip, lut, removed=None):
+    """
+    (h, w) uint8 etiket haritası
+
+    read_strip(top, bottom): [top, bottom) satırlarının RGBA dizisi
+    removed: background_mask bit maskesi (etiketlenmeyecek pikseller)
+    """
+    w, h = size
+    labels = np.empty((h, w), dtype=np.uint8)
+    for top in range(0, h, rows_per_strip):
+        bottom = min(top + rows_per_strip, h)
+        rgba = read_strip(top, bottom)
+        rows = lut[pack_rgb(rgba[:, :, :3])]
+        if rgba.shape[2] == 4:
+            rows[rgba[:, :, 3] < 128] = NO_LABEL
+        if removed is not None:
+            rows[unpack_rows(removed, top, bottom, w)] = NO_LABEL
+        labels[top:bottom] = rows
+    return labels
+
+
+def label_counts(labels, k):
+    """Küme başına kesin piksel sayıları"""
+    return np.bincount(labels.ravel(), minlength=NO_LABEL + 1)[:k]
+
+
+def encode_rle(mask):
+    """
+    Satır öncelikli RLE: {"size": [w, h], "counts": [...]}
+
+    Koşular boş (küme dışı) koşuyla başlar ve dönüşümlüdür; mask ilk pikselde
+    doluysa ilk sayı 0'dır.
+    """
+    h, w = mask.shape
+    flat = mask.ravel()
+    if flat.size == 0:
+        return {"size": [w, h], "counts": []}
+    bounds = np.concatenate(([0], np.flatnonzero(flat[1:] != flat[:-1]) + 1, [flat.size]))
+    runs = np.diff(bounds)
+    if flat[0]:
+        runs = np.concatenate(([0], runs))
+    return {"size": [w, h], "counts": runs.tolist()}
+
+
+def decode_rle(rle):
+    """encode_rle çıktısını (h, w) bool maskeye geri aç"""
+    w, h = rle["size"]
+    counts = np.asarray(rle["counts"], dtype=np.int64)
+    values = np.arange(counts.size) % 2 == 1
+    return np.repeat(values, counts).reshape(h, w)
+
+
+def encode_png(mask):
+    """1-bit PNG (siyah = küme) base64 metni"""
+    buf = io.BytesIO()
+    Image.fromarray(~mask).save(buf, format="PNG", optimize=True)
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def cluster_masks(labels, k, fmt="rle"):
+    """Her küme için kodlanmış maske listesi"""
+    if fmt not in LABEL_FORMATS:
+        raise ValueError(f"Bilinmeyen maske biçimi: {fmt}")
+    encode = encode_rle if fmt == "rle" else encode_png
+    return [encode(labels == i) for i in range(k)]
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+K-Means Motorları (Elbow taraması)
+- sweep: her k için bağımsız KMeans(n_init=10), isteğe bağlı süreç havuzunda
+- incremental: k+1 çözümü k çözümünden başlatılır (tek geçiş) ve dirsek
+  kesinleştiğinde tarama erken biter
+"""
+
+import os
+import warnings
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans
+from threadpoolctl import threadpool_limits
+
+
+ENGINES = ("incremental", "sweep")
+
+# Independent fits per k; output pinned by benchmarks/check_outputs.py
+DEFAULT_ENGINE = "sweep"
+
+# Worker processes for the sweep engine when none are requested explicitly
+JOBS_ENV = "COLOR_ANALYSIS_JOBS"
+
+
+def default_jobs():
+    """COLOR_ANALYSIS_JOBS ortam değişkeninden işçi sayısı (varsayılan: 1)"""
+    try:
+        return max(1, int(os.environ.get(JOBS_ENV, "1")))
+    except ValueError:
+        return 1
+
+
+# ============================================================================
+# DİRSEK KURALI
+# ============================================================================
+
+def elbow_offset(inertias):
+    """İkinci türevin en büyük olduğu yer = en keskin dirsek (k_min'e göre)"""
+    if len(inertias) < 2:
+        return 0
+
+    # İkinci türev (düşüş hızındaki değişim)
+    deltas = np.diff(inertias)  # Birinci türev
+    second_deltas = np.diff(deltas)  # İkinci türev
+
+    if len(second_deltas) > 0:
+        return int(np.argmax(second_deltas)) + 1
+    return 0
+
+
+def elbow_settled(inertias):
+    """
+    Kalan k değerleri dirseği değiştiremiyorsa True
+
+    Inertia k ile artmadığından, henüz hesaplanmamış her ikinci türev
+    max(I[j-1] - I[j], I[j]) ile sınırlıdır (j: son hesaplanan k).
+    Bulunan en büyük ikinci türev bu sınırı aşıyorsa argmax değişmez.
+    """
+    if len(inertias) < 3:
+        return False
+    second_deltas = np.diff(inertias, n=2)
+    bound = max(inertias[-2] - inertias[-1], inertias[-1])
+    return second_deltas.max() > bound
+
+
+# ============================================================================
+# MOTORLAR
+# ============================================================================
+
+def _fit_one(X, sample_weight, k):
+    kmeans = KMeans(n_clusters=k, n_init=10, random_state=42)
+    kmeans.fit(X, sample_weight=sample_weight)
+    return kmeans
+
+
+def _fit_in_worker(X, sample_weight, k):
+    # inner_max_num_threads does not override a user-set OMP_NUM_THREADS,
+    # so the pool worker caps its own OpenMP/BLAS threads
+    with threadpool_limits(1):
+        return _fit_one(X, sample_weight, k)
+
+
+def fit_sweep(X, sample_weight, k_values, n_jobs=1, check=None):
+    """
+    Her k için bağımsız KMeans
+
+    n_jobs > 1 ise k değerleri süreç havuzunda eşzamanlı, işçi başına tek
+    OpenMP iş parçacığıyla çalışır; seri yol scikit-learn'ün varsayılan iş
+    parçacığı sayısını kullanır. Lloyd adımlarındaki toplama sırası iş
+    parçacığı sayısına bağlı olduğundan sonuç tek iş parçacıklı seri
+    çalışmayla bit düzeyinde aynıdır, çok iş parçacıklı seri çalışmadan son
+    bitlerde (inertia ~1e-7) ayrılabilir.
+    check: fitler arasında çağrılır (seride her fitten önce, havuzda her
+    sonuç geldiğinde); yükselttiği istisna taramayı durdurur ve havuzdaki
+    kalan fitler iptal edilir.
+    """
+    k_values = list(k_values)
+    n_jobs = min(n_jobs, len(k_values))
+
+    if n_jobs <= 1:
+        models = []
+        for k in k_values:
+            if check is not None:
+                check()
+            models.append(_fit_one(X, sample_weight, k))
+        return models
+
+    if check is not None:
+        check()
+    # Each worker gets a single BLAS/OpenMP thread so workers don't oversubscribe cores
+    results = Parallel(n_jobs=n_jobs, backend="loky", inner_max_num_threads=1, return_as="generator_unordered")(
+        delayed(_fit_in_worker)(X, sample_weight, k) for k in k_values
+    )
+    models = {}
+    try:
+        for kmeans in results:
+            models[kmeans.n_clusters] = kmeans
+            if check is not None and len(models) < len(k_values):
+                check()
+    finally:
+        # Closing the generator early aborts the fits still queued or running
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            results.close()
+    return [models[k] for k in k_values]
+
+
+def _next_center(X, sample_weight, kmeans):
+    """Ağırlıklı kare hataya en çok katkı veren nokta (yeni merkez)"""
+    d2 = ((X - kmeans.cluster_centers_[kmeans.labels_]) ** 2).sum(axis=1)
+    return X[np.argmax(d2 * sample_weight)]
+
+
+def fit_incremental(X, sample_weight, k_values, early_exit=True, check=None):
+    """
+    Sıcak başlatmalı tek geçiş tarama
+
+    İlk k normal KMeans(n_init=10) ile, sonraki her k önceki merkezler +
+    en kötü temsil edilen nokta ile başlatılır. Bu başlangıç inertia'yı
+    artıramadığından eğri monoton kalır ve erken çıkış kesindir.
+    check: her fitten önce çağrılır (bkz. fit_sweep)
+    """
+    models = []
+    inertias = []
+    previous = None
+
+    for k in k_values:
+        if check is not None:
+            check()
+        if previous is None:
+            kmeans = KMeans(n_clusters=k, n_init=10, random_state=42)
+        else:
+            init = np.vstack((previous.cluster_centers_, _next_center(X, sample_weight, previous)))
+            kmeans = KMeans(n_clusters=k, init=init, n_init=1, random_state=42)
+
+        kmeans.fit(X, sample_weight=sample_weight)
+
+        models.append(kmeans)
+        inertias.append(kmeans.inertia_)
+        previous = kmeans
+
+        if early_exit and elbow_settled(inertias):
+            break
+
+    return models
+
+
+def fit_k_range(X, sample_weight, k_values, engine=DEFAULT_ENGINE, n_jobs=1, check=None):
+    """
+    Seçilen motorla k aralığı için KMeans modellerini döndür
+
+    check: fitler arasında çağrılan iptal kontrolü (opsiyonel)
+    """
+    if engine == "sweep":
+        return fit_sweep(X, sample_weight, k_values, n_jobs=n_jobs, check=check)
+    if engine == "incremental":
+        return fit_incremental(X, sample_weight, k_values, check=check)
+    raise ValueError(f"Bilinmeyen KMeans motoru: {engine}")
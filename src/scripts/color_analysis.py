@@ -12,7 +12,6 @@ import argparse
 import json
 import sys
 from pathlib import Path
-from collections import Counter
 import os
 
 # Suppress warnings
@@ -20,15 +19,27 @@ import warnings
 warnings.filterwarnings("ignore")
 
 import numpy as np
-import pandas as pd
-from PIL import Image, ImageDraw
+from PIL import Image
 import io
 
-from sklearn.cluster import KMeans
+from background import FLOODFILL_TOLERANCE, background_mask, unpack_rows
+from clustering import DEFAULT_ENGINE, ENGINES, default_jobs, elbow_offset, fit_k_range
+from cluster_labels import LABEL_FORMATS, LUT_CHUNK, cluster_masks, color_lut, label_counts, label_image
 
-from colormath.color_objects import sRGBColor, LabColor
-from colormath.color_conversions import convert_color
-from colormath.color_diff import delta_e_cie2000
+from colormath.color_objects import LabColor
+
+from color_convert import lab_to_srgb, pack_rgb, srgb_to_lab, srgb_u8_to_lab, unpack_rgb
+from color_quantize import lab_grid_quantize
+from pantone_catalog import DATABASE_PATH as CATALOG_DATABASE_PATH, default_catalog
+from pantone_matcher import get_matcher
+from pantone_lut import RGBLookupTable
+from profiling import NULL_PROFILER, PROFILE_LOG_ENV, StageHooks, StageProfiler, configure_profile_log
+from result_cache import CACHE_DIR_ENV, DEFAULT_MAX_BYTES, ResultCache, cache_key, file_digest
+from svg_area import SVGError, is_svg, load_drawing
+
+# Part of the result cache key: bump whenever the same inputs give a
+# different result (benchmarks/check_outputs.py --update enforces it)
+ANALYSIS_VERSION = 2
 
 # Numpy compatibility patch for colormath with newer numpy versions
 if not hasattr(np, 'asscalar'):
@@ -49,125 +60,491 @@ class NumpyEncoder(json.JSONEncoder):
 # PANTONE VERİTABANI (Genişletilebilir)
 # ============================================================================
 
-# Load Pantone Database from JSON
-try:
-    db_path = Path(__file__).parent / "pantone_database.json"
-    with open(db_path, "r") as f:
-        pantone_data = json.load(f)
-    PANTONE_DATABASE = pd.DataFrame(pantone_data)
-except Exception as e:
-    # Fallback or exit
-    # print(json.dumps({"error": f"Pantone veritabanı yüklenemedi: {e}"}))
-    # sys.exit(1)
-    # Create a dummy DB if missing for testing
-    PANTONE_DATABASE = pd.DataFrame([
-        {"code": "Black C", "name": "Black C", "L": 0, "a": 0, "b": 0},
-        {"code": "White", "name": "White", "L": 100, "a": 0, "b": 0},
-    ])
-
-# Ensure White is in the database if it wasn't loaded
-if 'name' in PANTONE_DATABASE.columns:
-    if not PANTONE_DATABASE['name'].str.contains('White', case=False).any():
-        # Add White manually
-        white_row = pd.DataFrame([{"code": "White", "name": "White", "L": 100, "a": 0, "b": 0}])
-        PANTONE_DATABASE = pd.concat([PANTONE_DATABASE, white_row], ignore_index=True)
-else:
-     # Fallback if columns are missing
-     pass
+# The default library; other libraries are registered in pantone_catalog
+DATABASE_PATH = CATALOG_DATABASE_PATH
+
+# DataFrame view of the default library, built only when PANTONE_DATABASE is accessed
+_PANTONE_DATAFRAME = None
+
+# RGB → Pantone lookup tables per library selection, opened once per process
+_PANTONE_LUTS = {}
+
+
+def load_pantone_columns(library=None):
+    """
+    Kütüphane seçiminin (names, codes, lab) sütunları (ilk kullanımda yüklenir)
+
+    İkili sütun dosyaları (pantone_store) tercih edilir, JSON yedek kaynaktır.
+    """
+    return default_catalog().union_columns(library)
+
+
+def get_pantone_matcher(library=None):
+    """
+    Kütüphane seçiminin eşleştiricisi ("coated", "coated+uncoated", None: varsayılan)
+
+    Her seçim için bir kez kurulur; tek kütüphanede Lab matrisi kopyalanmaz.
+    """
+    return default_catalog().matcher(library)
+
+
+def get_pantone_database():
+    """Varsayılan veritabanı DataFrame olarak (name, code, L, a, b)"""
+    global _PANTONE_DATAFRAME
+    if _PANTONE_DATAFRAME is None:
+        import pandas as pd
+
+        names, codes, lab = load_pantone_columns()
+        _PANTONE_DATAFRAME = pd.DataFrame({
+            "name": names, "code": codes, "L": lab[:, 0], "a": lab[:, 1], "b": lab[:, 2]
+        })
+    return _PANTONE_DATAFRAME
+
+
+def __getattr__(name):
+    # PANTONE_DATABASE stays importable but is only built when accessed
+    if name == "PANTONE_DATABASE":
+        return get_pantone_database()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ============================================================================
 # YARDIMCI FONKSİYONLAR
 # ============================================================================
 
+# Working memory per pixel of a streamed strip: RGBA strip, packed colours
+# and the sort/unique temporaries
+STREAM_BYTES_PER_PIXEL = 48
+
+# Single-band 8-bit modes whose pixels index a 256-entry colour table
+INDEXED_MODES = ("P", "L")
+
+# Pixels scanned per step while locating the first occurrence of palette indices
+PALETTE_SCAN_PIXELS = 1 << 20
+
 def rgb_to_lab(r, g, b):
     """RGB'yi LAB renk uzayına çevir"""
-    rgb = sRGBColor(r/255.0, g/255.0, b/255.0, is_upscaled=False)
-    lab = convert_color(rgb, LabColor, target_illuminant='d50')
-    return lab
+    L, a, b_ = srgb_to_lab(np.array([r, g, b], dtype=np.float64))
+    return LabColor(L, a, b_, illuminant='d50')
 
 
 def lab_to_rgb(L, a, b):
     """LAB'den RGB'ye çevir"""
-    lab = LabColor(L, a, b, illuminant='d50')
-    rgb = convert_color(lab, sRGBColor)
-    r = int(np.clip(round(rgb.clamped_rgb_r * 255), 0, 255))
-    g = int(np.clip(round(rgb.clamped_rgb_g * 255), 0, 255))
-    b = int(np.clip(round(rgb.clamped_rgb_b * 255), 0, 255))
-    return (r, g, b)
+    r, g, b = lab_to_srgb(np.array([L, a, b], dtype=np.float64))
+    return (int(r), int(g), int(b))
 
 
 def find_closest_pantone(r, g, b, pantone_df):
     """En yakın Pantone rengini bul (Delta E 2000 ile)"""
-    lab_color = rgb_to_lab(r, g, b)
+    return find_closest_pantones([(r, g, b)], pantone_df)[0]
+
+
+def find_closest_pantones(rgb_list, pantone_df, pantone_lut=None):
+    """Birden fazla RGB rengi için en yakın Pantone renklerini tek geçişte bul"""
+    if len(rgb_list) == 0:
+        return []
+
+    if pantone_lut is not None:
+        return pantone_lut.match(np.array(rgb_list, dtype=np.uint8))
+
+    lab_queries = srgb_to_lab(np.array(rgb_list, dtype=np.float64))
+    return get_matcher(pantone_df).match(lab_queries)
+
+
+def open_pantone_lut(library=None):
+    """
+    Tek bir kütüphane için RGB → Pantone arama tablosunu aç (süreç başına bir kez)
 
-    min_delta_e = float('inf')
-    best_match = None
+    Birleşimler için ya da tablo açılamazsa None döner (eşleştirici kullanılır).
+    """
+    key = default_catalog().resolve(library)
+    if key not in _PANTONE_LUTS:
+        path = default_catalog().library_path(key)
+        try:
+            _PANTONE_LUTS[key] = RGBLookupTable.for_database(path, get_pantone_matcher(key)) if path else None
+        except Exception:
+            _PANTONE_LUTS[key] = None
+    return _PANTONE_LUTS[key]
 
-    for _, row in pantone_df.iterrows():
-        pantone_lab = LabColor(row["L"], row["a"], row["b"], illuminant='d50')
-        delta_e = float(delta_e_cie2000(lab_color, pantone_lab))
 
-        if delta_e < min_delta_e:
-            min_delta_e = delta_e
-            best_match = {
-                "name": row["name"],
-                "code": row["code"],
-                "delta_e": round(delta_e, 2)
-            }
+def color_histogram(packed):
+    """
+    Paketlenmiş 24-bit renkler için histogram
 
-    return best_match
+    Renkler ilk görüldükleri sırada döner (Counter ile aynı sıra), böylece
+    eşit sayılı renklerin sıralaması değişmez.
+    """
+    if packed.size == 0:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.int64)
 
+    colors, first_index, counts = np.unique(packed, return_index=True, return_counts=True)
+    order = np.argsort(first_index, kind="stable")
+    return colors[order].astype(np.uint32), counts[order].astype(np.int64)
 
-def analyze_pixel_colors(img_array):
-    """Piksel renklerini analiz et"""
+
+def analyze_pixel_colors(img_array, removed=None):
+    """
+    Piksel renklerini analiz et (paketlenmiş renkler ve sayıları)
+
+    removed: background_mask ile üretilmiş, sayılmayacak piksellerin bit maskesi
+    """
     h, w, _ = img_array.shape
     total_pixels = h * w
 
-    color_counts = Counter()
-
-    # Flatten the array for faster processing
     # img_array is (H, W, 4) or (H, W, 3)
-    
     if img_array.shape[2] == 4:
         # Filter alpha < 128
         mask = img_array[:, :, 3] >= 128
-        valid_pixels = img_array[mask]
     else:
-        valid_pixels = img_array.reshape(-1, 3)
+        mask = np.ones((h, w), dtype=bool)
+
+    if removed is not None:
+        mask &= ~unpack_rows(removed, 0, h, w)
+
+    valid_pixels = img_array[mask]
+
+    colors, counts = color_histogram(pack_rgb(valid_pixels[:, :3]))
+
+    return colors, counts, total_pixels, (w, h)
+
+
+def palette_table(img):
+    """
+    İndeksli resmin (P / L) 256 girişlik RGBA tablosu
+
+    Palet ve saydamlık (tRNS) PIL'in kendi convert("RGBA") dönüşümüyle bir kez
+    çözülür; tablo[indeks] tam çözünürlük dönüşümle birebir aynıdır.
+    """
+    ref = img.crop((0, 0, 256, 1))
+    ref.putdata(range(256))
+    return np.asarray(ref.convert("RGBA"))[0]
+
+
+def palette_colors(indices, table, removed=None):
+    """
+    İndeksli resmin renk histogramı: 256 kutulu bincount, RGBA genişletmesi yok
+
+    indices: (H, W) uint8 palet indeksleri, table: palette_table çıktısı.
+    analyze_pixel_colors ile aynı sonucu verir (aynı renkler, sayılar, sıra).
+    """
+    h, w = indices.shape
+    counted = table[:, 3] >= 128
+
+    counts = np.bincount(indices.ravel(), minlength=256)
+    if removed is not None:
+        counts -= np.bincount(indices[unpack_rows(removed, 0, h, w)], minlength=256)
+    counts[~counted] = 0
+
+    # First counted occurrence of every present index; the scan stops once all are found
+    present = np.flatnonzero(counts)
+    first = np.full(256, -1, dtype=np.int64)
+    missing = present.size
+    rows_per_step = max(1, PALETTE_SCAN_PIXELS // max(w, 1))
+    for top in range(0, h, rows_per_step):
+        if missing == 0:
+            break
+        bottom = min(top + rows_per_step, h)
+        rows = indices[top:bottom]
+        ok = counted[rows]
+        if removed is not None:
+            ok &= ~unpack_rows(removed, top, bottom, w)
+        positions = np.flatnonzero(ok)
+        values, index = np.unique(rows.ravel()[positions], return_index=True)
+        new = first[values] < 0
+        first[values[new]] = top * w + positions[index[new]]
+        missing -= int(new.sum())
+
+    order = present[np.argsort(first[present], kind="stable")]
+    packed = pack_rgb(table[order, :3])
+
+    # Palette entries sharing an RGB value are merged at their first occurrence
+    colors, first_pos, inverse = np.unique(packed, return_index=True, return_inverse=True)
+    merged = np.bincount(inverse, weights=counts[order], minlength=colors.size).astype(np.int64)
+    by_first = np.argsort(first_pos, kind="stable")
+    return colors[by_first].astype(np.uint32), merged[by_first], h * w, (w, h)
+
+
+def merge_histograms(base, update):
+    """
+    İki (renkler, sayılar, ilk_indeks) histogramını birleştir
+
+    base içindeki renkler update'ten önce görülmüş sayılır.
+    """
+    colors = np.concatenate((base[0], update[0]))
+    counts = np.concatenate((base[1], update[1]))
+    first = np.concatenate((base[2], update[2]))
+
+    merged, first_pos, inverse = np.unique(colors, return_index=True, return_inverse=True)
+    merged_counts = np.bincount(inverse, weights=counts, minlength=merged.size).astype(np.int64)
+    return merged.astype(np.uint32), merged_counts, first[first_pos]
+
+
+def strip_rows(width, tile_size=None, strip_memory=None):
+    """Akış modunda bir şeritteki satır sayısı (tile_size veya şerit bellek bütçesinden)"""
+    if tile_size:
+        return max(1, int(tile_size))
+    budget = int(strip_memory * 1024 * 1024)
+    return max(1, budget // (max(width, 1) * STREAM_BYTES_PER_PIXEL))
+
+
+def read_rgba_strip(img, top, bottom):
+    """Resmin [top, bottom) satırlarını (rows, w, 4) RGBA dizisi olarak oku"""
+    return np.asarray(img.crop((0, top, img.size[0], bottom)).convert("RGBA"))
+
+
+def stream_pixel_colors(img, rows_per_strip, removed=None):
+    """
+    Piksel renklerini satır şeritleri halinde analiz et
+
+    Her şerit ayrı ayrı RGBA'ya çevrilir ve histogram artımlı biriktirilir;
+    sonuç analyze_pixel_colors ile aynıdır.
+    """
+    w, h = img.size
+    total_pixels = h * w
+
+    empty = (np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+    hist = empty
+    seen = 0
+
+    for top in range(0, h, rows_per_strip):
+        bottom = min(top + rows_per_strip, h)
+        strip = read_rgba_strip(img, top, bottom)
+        mask = strip[:, :, 3] >= 128
+        if removed is not None:
+            mask &= ~unpack_rows(removed, top, bottom, w)
+        valid = strip[mask]
+        if valid.size == 0:
+            continue
+
+        colors, first_index, counts = np.unique(pack_rgb(valid[:, :3]), return_index=True, return_counts=True)
+        hist = merge_histograms(hist, (colors, counts, first_index + seen))
+        seen += valid.shape[0]
+
+    colors, counts, first = hist
+    order = np.argsort(first, kind="stable")
+    return colors[order], counts[order], total_pixels, (w, h)
+
+
+def rgb_distance(colors, other):
+    """Paketlenmiş renkler ile tek bir paketlenmiş renk arasındaki RGB Öklid mesafesi"""
+    diff = unpack_rgb(colors).astype(np.int32) - unpack_rgb(other).astype(np.int32)
+    return np.sqrt((diff ** 2).sum(axis=-1))
+
+
+def raster_colors(img, ignore_background=False, tile_size=None, strip_memory=None, profiler=NULL_PROFILER):
+    """
+    Raster resmin renk histogramı ve yoksayılacak renkler
+
+    img: açılmış resim; akış modunda (tile_size / strip_memory) kendi modunda
+    yüklenmiş, aksi halde RGBA'ya çevrilmiş olmalı. Akış modu dışında
+    (H, W, 4) dizi de verilebilir. İndeksli (P / L) resimler her iki modda da
+    palet indeksleri üzerinden sayılır.
+    (renkler, sayılar, [(paketlenmiş renk, eşik), ...], arka plan bit maskesi
+    ya da None) döndürür.
+    """
+    streaming = tile_size is not None or strip_memory is not None
+    indexed = not isinstance(img, np.ndarray) and img.mode in INDEXED_MODES
+    if indexed:
+        # Palette fast path: one byte per pixel, colours resolved through the 256-entry table
+        with profiler.stage("decode"):
+            indices = np.asarray(img)
+            table = palette_table(img)
+        h, w = indices.shape
+    elif streaming:
+        w, h = img.size
+    else:
+        if isinstance(img, np.ndarray):
+            img_array = img
+        else:
+            with profiler.stage("decode"):
+                img_array = np.array(img)
+        h, w = img_array.shape[:2]
 
-    # Convert to hex for counting
-    # This might be slow for very large images, but accurate
-    for pixel in valid_pixels:
-        r, g, b = pixel[:3]
-        hex_color = f"#{r:02X}{g:02X}{b:02X}"
-        color_counts[hex_color] += 1
+    profiler.count("pixels", w * h)
+    rows_per_strip = strip_rows(w, tile_size, strip_memory) if streaming else h
 
-    return color_counts, total_pixels, (w, h)
+    def read_strip(top, bottom):
+        if indexed:
+            return table[indices[top:bottom]]
+        if streaming:
+            return read_rgba_strip(img, top, bottom)
+        return img_array[top:bottom]
+
+    # Background Filtering + Piksel analizi
+    colors_to_ignore = [] # List of (packed color, threshold)
+    removed = None
+
+    if ignore_background:
+        # Spatial background first: pixels connected to the corners within
+        # the floodfill tolerance, dropped before the histogram is built
+        try:
+            with profiler.stage("background"):
+                removed = background_mask(read_strip, (w, h), rows_per_strip)
+        except Exception:
+            removed = None
+
+    with profiler.stage("histogram"):
+        if indexed:
+            colors, counts, total_pixels, (w, h) = palette_colors(indices, table, removed)
+        elif streaming:
+            colors, counts, total_pixels, (w, h) = stream_pixel_colors(img, rows_per_strip, removed)
+        else:
+            colors, counts, total_pixels, (w, h) = analyze_pixel_colors(img_array, removed)
+    profiler.count("counted_pixels", int(total_pixels))
+    profiler.count("unique_colors", int(colors.size))
+
+    if ignore_background and removed is None:
+        # Fallback to statistical method
+        if counts.size:
+            # Most common first; ties keep first-seen order
+            by_count = np.argsort(-counts, kind="stable")
+            most_common_color = colors[by_count[0]]
+            most_common_ratio = counts[by_count[0]] / total_pixels
+            
+            if most_common_ratio > 0.20:
+                colors_to_ignore.append((most_common_color, 40))
+                
+                # Check for secondary background
+                for i in by_count[1:10]:
+                    if rgb_distance(colors[i], most_common_color) < 40:
+                        continue
+                    
+                    next_ratio = counts[i] / total_pixels
+                    
+                    if unpack_rgb(colors[i]).max() < 50 and next_ratio > 0.10:
+                        colors_to_ignore.append((colors[i], 60))
+                        break
+
+    return colors, counts, colors_to_ignore, removed
 
 
 # ============================================================================
 # K-MEANS OPTIMAL RENK SAYISI
 # ============================================================================
 
-def find_optimal_k_advanced(rgb_array, k_min=2, k_max=10):
-    """Elbow Method ile optimal k bul"""
+def sample_colors(filtered_colors, filtered_counts, k_min=2, k_max=10):
+    """
+    KMeans örneklemi: benzersiz renkler ve örnek ağırlıkları
+
+    Kotalar renk sayımıyla orantılıdır; küçük ama görünür detaylar ve
+    parlak renkler (yıldızlar) güçlendirilir. (rgb_array, sample_weight, k_min)
+    döndürür; k_min anlamlı renk sayısına göre yükseltilmiş olabilir.
+    """
+    rgb_array, sample_weight, significant_colors = quota_sample(filtered_colors, filtered_counts)
+    return rgb_array, sample_weight, adjust_k_min(significant_colors, k_min, k_max)
+
+
+def adjust_k_min(significant_colors, k_min=2, k_max=10):
+    """k_min'i anlamlı renk sayısına yükselt (k_max ile sınırlı)"""
+    # Cap significant_colors to k_max to avoid forcing k=100
+    significant_colors = min(significant_colors, k_max)
+
+    # Adjust k_min if we see more significant colors
+    if significant_colors > k_min:
+        k_min = min(significant_colors, k_max)
+    return k_min
+
+
+def quota_sample(filtered_colors, filtered_counts):
+    """
+    k aralığından bağımsız örneklem: (rgb_array, sample_weight, anlamlı renk sayısı)
+    """
+    # Improved Sampling Strategy
+    sample_limit = 50000 # Increased from 25000 to capture more detail
+    total_count = int(filtered_counts.sum())
+
+    # Sort colors by count descending (stable: ties keep first-seen order)
+    order = np.argsort(-filtered_counts, kind="stable")
+    sorted_colors = filtered_colors[order]
+    sorted_counts = filtered_counts[order]
+    
+    # Dynamic k_min adjustment
+    # Count significant distinct colors to set a better floor for k
+    # If > 1% OR (> 50 pixels and very distinct)
+    # For now, just lower the threshold to 0.1% to catch small details like stars
+    significant_colors = int(np.count_nonzero((sorted_counts / total_count > 0.001) | (sorted_counts > 50)))
+
+    # We want to ensure that even small distinct colors get represented.
+    # Strategy:
+    # 1. Base quota: Proportional to count
+    # 2. Minimum quota: At least N samples for any color that has > M pixels
+    
+    distinct_colors_count = len(sorted_colors)
+
+    # Proportional quota
+    ratio = sorted_counts / total_count
+    quota = (sample_limit * ratio).astype(np.int64)
+    
+    # BOOST SMALL DETAILS:
+    # If a color is small (e.g. < 600 pixels) but visible (> 20 pixels), 
+    # take ALL of it to ensure it's fully represented and not washed out.
+    small = (sorted_counts > 20) & (sorted_counts < 600)
+    quota[small] = sorted_counts[small]
+    # For larger colors, ensure a minimum representation
+    large = sorted_counts >= 600
+    quota[large] = np.maximum(quota[large], 200)
+    
+    # Cap to prevent domination (e.g. max 20% of samples for one color)
+    # This allows other colors to exist in the sample set
+    # But only apply cap if we have enough distinct colors
+    if distinct_colors_count > 5:
+        quota = np.minimum(quota, int(sample_limit * 0.20))
+    
+    # Final safety check: don't take more than actual pixels
+    quota = np.minimum(quota, sorted_counts)
+    quota = np.maximum(quota, 0)
+
+    # Stop after the color that pushes the sample past the limit
+    overflow = np.nonzero(np.cumsum(quota) > sample_limit * 1.2)[0]
+    if overflow.size:
+        quota[overflow[0] + 1:] = 0
+
+    # FORCE INCLUSION:
+    # If we have very distinct colors that are small (like White stars), 
+    # and they haven't been added (or added enough), force add them.
+    # Check for White specifically or high brightness colors if they exist in filtered_counts
+    # Add 100 samples of each "star" (bright) color to ensure K-Means sees it
+    sorted_rgb = unpack_rgb(sorted_colors)
+    stars = sorted_rgb.astype(np.int32).sum(axis=-1) / 3 > 200
+
+    # Quotas and boosts become KMeans sample weights of the unique colors
+    weights = quota + stars * 100
+    sampled = weights > 0
+
+    return sorted_rgb[sampled], weights[sampled], significant_colors
+
+
+def find_optimal_k_advanced(rgb_array, k_min=2, k_max=10, sample_weight=None, engine=DEFAULT_ENGINE, n_jobs=1, profiler=NULL_PROFILER, lab=None, models=None):
+    """
+    Elbow Method ile optimal k bul
+
+    sample_weight: her rgb_array satırının ağırlığı (örnek sayısı). Verilirse
+    rgb_array benzersiz renkler olabilir. Amaç fonksiyonu satırların
+    ağırlıkları kadar tekrarlandığı örnek kümesiyle aynıdır, ancak k-means++
+    başlatması ve Lloyd adımları farklı veri gördüğünden KMeans başka bir
+    yerel optimuma düşebilir (merkezler ve yüzdeler değişebilir).
+    engine: "sweep" (her k bağımsız) veya "incremental" (sıcak başlatmalı tek geçiş)
+    n_jobs: sweep motorunda eşzamanlı fit edilecek k sayısı (süreç)
+    profiler: StageProfiler (opsiyonel); KMeans fit sayısı sayaç olarak yazılır,
+        StageHooks ise iptale her fitten önce bakar
+    lab: rgb_array'in önceden çevrilmiş Lab değerleri (opsiyonel)
+    models: aynı örneklem için k → KMeans sözlüğü (oturum durumu); sweep
+        motorunda yalnızca sözlükte olmayan k değerleri fit edilir ve eklenir
+    """
     # LAB renk uzayına çevir
-    lab_array = []
-    for r, g, b in rgb_array:
-        lab = rgb_to_lab(int(r), int(g), int(b))
-        lab_array.append([lab.lab_l, lab.lab_a, lab.lab_b])
+    X = srgb_u8_to_lab(rgb_array) if lab is None else lab
 
-    X = np.array(lab_array, dtype=float)
-    n = X.shape[0]
+    if sample_weight is None:
+        sample_weight = np.ones(X.shape[0])
+    sample_weight = np.asarray(sample_weight, dtype=np.float64)
+
+    # Effective sample count (total weight)
+    n = int(round(sample_weight.sum()))
 
     if n < k_min:
         return k_min, None, None
 
     # Elbow Method: Her k için inertia hesapla
-    inertias = []
-    kmeans_models = []
-
     # If we have very few unique colors in the sample, don't try to find more clusters than unique colors
     unique_samples = len(np.unique(X, axis=0))
     effective_k_max = min(k_max, unique_samples)
@@ -175,26 +552,32 @@ def find_optimal_k_advanced(rgb_array, k_min=2, k_max=10):
     if effective_k_max < k_min:
         effective_k_max = k_min
 
-    for k in range(k_min, min(effective_k_max + 1, n + 1)):
-        kmeans = KMeans(n_clusters=k, n_init=10, random_state=42)
-        kmeans.fit(X)
-        inertias.append(kmeans.inertia_)
-        kmeans_models.append(kmeans)
+    k_range = range(k_min, min(effective_k_max + 1, n + 1))
+
+    # KMeans needs at least k rows: split the weight of repeated rows
+    if len(k_range) and X.shape[0] < k_range[-1]:
+        reps = -(-k_range[-1] // X.shape[0])
+        X = np.repeat(X, reps, axis=0)
+        sample_weight = np.repeat(sample_weight / reps, reps)
+        # The repeated set depends on k_max; its fits are not reusable
+        models = None
+
+    # Cancellation is also honoured between the k fits, not only at stage entry
+    check = lambda: profiler.check("kmeans")
+
+    if models is not None and engine == "sweep":
+        # Independent fits with a fixed seed: a stored k is the same model
+        missing = [k for k in k_range if k not in models]
+        models.update(zip(missing, fit_k_range(X, sample_weight, missing, engine, n_jobs=n_jobs, check=check)))
+        kmeans_models = [models[k] for k in k_range]
+        profiler.count("kmeans_fits", len(missing))
+    else:
+        kmeans_models = fit_k_range(X, sample_weight, k_range, engine, n_jobs=n_jobs, check=check)
+        profiler.count("kmeans_fits", len(kmeans_models))
+    inertias = [kmeans.inertia_ for kmeans in kmeans_models]
 
     # Elbow noktasını bul (inertia düşüş hızı en çok azaldığı nokta)
-    if len(inertias) < 2:
-        best_k = k_min
-    else:
-        # İkinci türev (düşüş hızındaki değişim)
-        deltas = np.diff(inertias)  # Birinci türev
-        second_deltas = np.diff(deltas)  # İkinci türev
-
-        # İkinci türevin en büyük olduğu yer = en keskin dirsek
-        if len(second_deltas) > 0:
-            elbow_idx = np.argmax(second_deltas) + 1
-            best_k = k_min + elbow_idx
-        else:
-            best_k = k_min
+    best_k = k_min + elbow_offset(inertias)
 
     # Ensure best_k is within bounds
     best_k = max(k_min, min(best_k, effective_k_max))
@@ -215,285 +598,575 @@ def find_optimal_k_advanced(rgb_array, k_min=2, k_max=10):
     centers_lab = best_kmeans.cluster_centers_
     labels = best_kmeans.labels_
 
-    centers_rgb = []
+    centers_rgb = [tuple(int(c) for c in rgb) for rgb in lab_to_srgb(centers_lab)]
     shares = []
 
+    cluster_weight = np.bincount(labels, weights=sample_weight, minlength=best_kmeans.n_clusters)
     for i in range(best_kmeans.n_clusters):
-        L, a, b = centers_lab[i]
-        rgb = lab_to_rgb(L, a, b)
-        centers_rgb.append(rgb)
-        shares.append((labels == i).sum() / len(labels))
+        shares.append(cluster_weight[i] / sample_weight.sum())
 
     return best_k, centers_rgb, shares
 
 
-# ============================================================================
-# BOYA MİKTARI HESAPLAMA
-# ============================================================================
+class NoColorsError(Exception):
+    """Filtrelemeden sonra kümelenecek renk kalmadı"""
 
-def calculate_paint(area_mm2, kat_sayisi=1.0):
-    """
-    Boya miktarını hesapla (gram cinsinden)
 
-    area_mm2: Alan (mm²)
-    kat_sayisi: Ağırlık kat sayısı
+def color_filter(colors, colors_to_ignore=(), ignore_black=False):
+    """Yoksayma listesinden ve siyah filtresinden geçen renklerin maskesi"""
+    keep = np.ones(colors.shape, dtype=bool)
+
+    # Check against ignore list with similarity
+    for ignore_color, threshold in colors_to_ignore:
+        keep &= rgb_distance(colors, ignore_color) >= threshold
+
+    # Legacy Black detection
+    if ignore_black:
+        keep &= unpack_rgb(colors).max(axis=-1) >= 60
+    return keep
+
+
+def cluster_colors(colors, counts, colors_to_ignore=(), ignore_black=False, k_min=2, k_max=10, cluster_engine=DEFAULT_ENGINE, n_jobs=1, profiler=NULL_PROFILER, quantize=None, state=None):
     """
-    if area_mm2 <= 0:
-        return {"grams": 0.0}
+    Yoksayma filtresi, örnekleme ve elbow KMeans
+
+    quantize: verilirse filtrelenen renkler örneklemeden önce bu kenarlı
+    (ΔE76) Lab ızgarasında birleştirilir (lab_grid_quantize).
+    state: aynı renkler ve filtreler için oturum durumu sözlüğü (opsiyonel);
+    örneklem, Lab örnek kümesi ve k başına modeller burada saklanır, sonraki
+    çağrılar yalnızca görülmemiş k değerlerini fit eder.
+    (keep, optimal_k, centers_rgb, shares, kümelenen renk sayısı) döndürür;
+    keep filtreden geçen renklerin maskesidir. Renk kalmazsa NoColorsError.
+    """
+    if state is not None and "sample" in state:
+        keep, rgb_array, sample_weight, significant_colors, clustered = state["sample"]
+    else:
+        keep = color_filter(colors, colors_to_ignore, ignore_black)
+        filtered_colors = colors[keep]
+        filtered_counts = counts[keep]
+        profiler.count("filtered_colors", int(filtered_colors.size))
+
+        # 5. K-Means optimal renkler
+
+        if int(filtered_counts.sum()) == 0:
+            raise NoColorsError("No colors found after filtering")
+
+        if quantize:
+            with profiler.stage("quantize"):
+                filtered_colors, filtered_counts = lab_grid_quantize(filtered_colors, filtered_counts, quantize)
+            profiler.count("quantized_colors", int(filtered_colors.size))
+
+        with profiler.stage("sampler"):
+            rgb_array, sample_weight, significant_colors = quota_sample(filtered_colors, filtered_counts)
+        clustered = int(filtered_colors.size)
+        if state is not None:
+            state["sample"] = (keep, rgb_array, sample_weight, significant_colors, clustered)
+            state["lab"] = srgb_u8_to_lab(rgb_array)
+
+    k_min = adjust_k_min(significant_colors, k_min, k_max)
+    profiler.count("samples", int(len(rgb_array)))
+    profiler.count("sample_weight", int(sample_weight.sum()))
+
+    if not len(rgb_array):
+        raise NoColorsError("No colors found")
+    
+    # Adjust k_max if we found more distinct significant colors
+    # This helps if the user asked for k=10 but we clearly see 12 distinct clusters
+    # But we stick to user limits for now
+    
+    with profiler.stage("kmeans"):
+        optimal_k, centers_rgb, shares = find_optimal_k_advanced(
+            rgb_array, k_min, k_max, sample_weight, engine=cluster_engine, n_jobs=n_jobs, profiler=profiler,
+            lab=state.get("lab") if state is not None else None,
+            models=state.setdefault("models", {}) if state is not None else None)
+    profiler.count("optimal_k", int(optimal_k))
 
-    grams = area_mm2 * kat_sayisi
+    return keep, optimal_k, centers_rgb, shares, clustered
 
-    return {
-        "grams": round(grams, 2)
-    }
+
+def nearest_centers(colors, centers_rgb):
+    """Paketlenmiş renklerin Lab'da en yakın küme merkezinin indeksi"""
+    centers = srgb_u8_to_lab(np.array(centers_rgb, dtype=np.uint8))
+    nearest = np.empty(len(colors), dtype=np.intp)
+    for start in range(0, len(colors), LUT_CHUNK):
+        lab = srgb_u8_to_lab(unpack_rgb(colors[start:start + LUT_CHUNK]))
+        nearest[start:start + LUT_CHUNK] = ((lab[:, None, :] - centers[None, :, :]) ** 2).sum(axis=-1).argmin(axis=1)
+    return nearest
+
+
+def area_shares(colors, areas, centers_rgb):
+    """
+    Her rengi Lab'da en yakın küme merkezine ata; kümelerin alan payları
+
+    colors: paketlenmiş renkler, areas: renklerin kesin alanları
+    """
+    nearest = nearest_centers(colors, centers_rgb)
+    totals = np.bincount(nearest, weights=areas, minlength=len(centers_rgb))
+    return list(totals / areas.sum())
 
 
 # ============================================================================
-# ANA ANALİZ FONKSİYONU
+# KADEMELİ (PROGRESSIVE) ANALİZ
 # ============================================================================
 
-def analyze_svg(image_path, total_area_mm2, dpi=300, k_min=2, k_max=10, pantone_df=None, kat_sayisi=1.0, ignore_background=False, ignore_black=False):
-    """Resmi tam analiz et"""
+# The coarsest pyramid level keeps at least this many pixels
+PROGRESSIVE_MIN_PIXELS = 1 << 18
 
-    if pantone_df is None:
-        pantone_df = PANTONE_DATABASE
+# Colours sampled fewer times than this are re-counted at the next finer level
+PROGRESSIVE_MIN_COLOR_SAMPLES = 100
 
-    # 2. Resmi Yükle (Rasterizasyon Node tarafında yapılmış olabilir veya doğrudan resim gelir)
-    try:
-        img = Image.open(image_path).convert("RGBA")
-        img_array = np.array(img)
-    except Exception as e:
-        return {"error": str(e)}
+# z value of the 95% confidence bound on a share estimated from sampled pixels
+_Z95 = 1.96
 
-    # 3. Piksel analizi
-    color_counts, total_pixels, (w, h) = analyze_pixel_colors(img_array)
 
-    # 4. Background Filtering
-    filtered_counts = {}
-    
-    # Helper to check if color is black-ish
-    def is_blackish(r, g, b):
-        return max(r, g, b) < 50
+def progressive_strides(w, h, min_pixels=PROGRESSIVE_MIN_PIXELS):
+    """Kaba seviyeden tam çözünürlüğe piksel adımları, ör. [8, 4, 2, 1]"""
+    stride = 1
+    while (w // (stride * 2)) * (h // (stride * 2)) >= min_pixels:
+        stride *= 2
+    strides = []
+    while stride >= 1:
+        strides.append(stride)
+        stride //= 2
+    return strides
 
-    # Helper to check similarity (Euclidean distance in RGB)
-    def is_similar(hex1, hex2, threshold=30):
-        r1, g1, b1 = int(hex1[1:3], 16), int(hex1[3:5], 16), int(hex1[5:7], 16)
-        r2, g2, b2 = int(hex2[1:3], 16), int(hex2[3:5], 16), int(hex2[5:7], 16)
-        return ((r1-r2)**2 + (g1-g2)**2 + (b1-b2)**2)**0.5 < threshold
 
-    colors_to_ignore = [] # List of (hex, threshold)
-    
-    if ignore_background:
-        # Try Spatial Floodfill first
-        try:
-            # Create a copy of the image for floodfill
-            img_flood = img.copy()
-            w, h = img.size
-            
-            # Define corners for floodfill
-            corners = [(0, 0), (w-1, 0), (0, h-1), (w-1, h-1)]
-            
-            # Tolerance for floodfill
-            tolerance = 5
-            fill_color = (0, 0, 0, 0)
-            
-            for corner in corners:
-                try:
-                    seed_color = img_flood.getpixel(corner)
-                    if seed_color[3] == 0:
-                        continue
-                    ImageDraw.floodfill(img_flood, corner, fill_color, thresh=tolerance)
-                except Exception:
-                    pass
-            
-            # Re-analyze
-            img_array_flood = np.array(img_flood)
-            color_counts, total_pixels, _ = analyze_pixel_colors(img_array_flood)
-            
-            # If successful, we don't need to ignore colors manually
-            colors_to_ignore = []
-            
-        except Exception as e:
-            # Fallback to statistical method
-            if color_counts:
-                most_common_color, most_common_count = color_counts.most_common(1)[0]
-                most_common_ratio = most_common_count / total_pixels
-                
-                if most_common_ratio > 0.20:
-                    colors_to_ignore.append((most_common_color, 40))
-                    
-                    # Check for secondary background
-                    for next_color, next_count in color_counts.most_common(10):
-                        if next_color == most_common_color:
-                            continue
-                        if is_similar(next_color, most_common_color, 40):
-                            continue
-                        
-                        next_ratio = next_count / total_pixels
-                        r, g, b = int(next_color[1:3], 16), int(next_color[3:5], 16), int(next_color[5:7], 16)
-                        
-                        if is_blackish(r, g, b) and next_ratio > 0.10:
-                            colors_to_ignore.append((next_color, 60))
-                            break
-
-    # Legacy ignore_black
-    if ignore_black:
-        # We will handle this in the loop
-        pass
-
-    for hex_color, count in color_counts.items():
-        r = int(hex_color[1:3], 16)
-        g = int(hex_color[3:5], 16)
-        b = int(hex_color[5:7], 16)
-        
-        # Check against ignore list with similarity
-        should_ignore = False
-        for ignore_hex, threshold in colors_to_ignore:
-            if is_similar(hex_color, ignore_hex, threshold):
-                should_ignore = True
-                break
-        
-        if should_ignore:
+def share_errors(counts, samples, strides, labels, k, total):
+    """
+    Küme paylarının %95 örnekleme hatası (yüzde puanı), katmanlı tahmin
+
+    Her renk sayıldığı seviyenin (strides) katmanındadır. Katmanın kütle payı
+    f, içindeki küme payı p ve örneklenen piksel sayısı n ise hata
+    z·sqrt(Σ f²·p(1−p)/n); tam çözünürlükte sayılan katmanın hatası yoktur.
+    labels: renklerin küme indeksleri (kümelenmeyenler -1), total: kümelenen
+    toplam piksel karşılığı.
+    """
+    variance = np.zeros(k)
+    for stride in np.unique(strides[strides > 1]):
+        layer = (strides == stride) & (labels >= 0)
+        n = samples[layer].sum()
+        if not n:
             continue
-            
-        # Legacy Black detection
-        if ignore_black:
-            if max(r, g, b) < 60:
-                continue
-            
-        filtered_counts[hex_color] = count
+        p = np.bincount(labels[layer], weights=counts[layer], minlength=k) / counts[layer].sum()
+        f = counts[layer].sum() / total
+        variance += f * f * p * (1 - p) / n
+    return _Z95 * np.sqrt(variance) * 100
 
-    # 5. K-Means optimal renkler
-    
-    # Improved Sampling Strategy
-    sample_limit = 50000 # Increased from 25000 to capture more detail
-    rgb_samples = []
-    total_count = sum(filtered_counts.values())
-    
-    if total_count == 0:
-         return {"error": "No colors found after filtering"}
 
-    # Sort colors by count descending
-    sorted_colors = sorted(filtered_counts.items(), key=lambda x: x[1], reverse=True)
-    
-    # Dynamic k_min adjustment
-    # Count significant distinct colors to set a better floor for k
-    significant_colors = 0
-    for hex_c, count in sorted_colors:
-        # If > 1% OR (> 50 pixels and very distinct)
-        # For now, just lower the threshold to 0.1% to catch small details like stars
-        if count / total_count > 0.001 or count > 50: 
-            significant_colors += 1
-            
-    # Cap significant_colors to k_max to avoid forcing k=100
-    significant_colors = min(significant_colors, k_max)
-    
-    # Adjust k_min if we see more significant colors
-    if significant_colors > k_min:
-        k_min = min(significant_colors, k_max)
+def level_pixels(img_array, stride, background=None, background_stride=1):
+    """
+    Seviyenin sayılan piksellerinin paketlenmiş renkleri
 
-    
-    # We want to ensure that even small distinct colors get represented.
-    # Strategy:
-    # 1. Base quota: Proportional to count
-    # 2. Minimum quota: At least N samples for any color that has > M pixels
-    
-    distinct_colors_count = len(sorted_colors)
-    
-    for hex_color, count in sorted_colors:
-        r = int(hex_color[1:3], 16)
-        g = int(hex_color[3:5], 16)
-        b = int(hex_color[5:7], 16)
-
-        ratio = count / total_count
-        
-        # Proportional quota
-        quota = int(sample_limit * ratio)
-        
-        # BOOST SMALL DETAILS:
-        # If a color is small (e.g. < 600 pixels) but visible (> 20 pixels), 
-        # take ALL of it to ensure it's fully represented and not washed out.
-        if 20 < count < 600:
-            quota = count
-        # For larger colors, ensure a minimum representation
-        elif count >= 600:
-             quota = max(quota, 200) 
-        
-        # Cap to prevent domination (e.g. max 20% of samples for one color)
-        # This allows other colors to exist in the sample set
-        # But only apply cap if we have enough distinct colors
-        if distinct_colors_count > 5:
-            quota = min(quota, int(sample_limit * 0.20))
-        
-        # Final safety check: don't take more than actual pixels
-        quota = min(quota, count)
-        
-        if quota > 0:
-            rgb_samples.extend([[r, g, b]] * quota)
-        
-        if len(rgb_samples) > sample_limit * 1.2:
+    background: background_stride adımlı seviyenin açılmış arka plan maskesi;
+    her piksel temsil ettiği background_stride × background_stride bloğu örter.
+    """
+    level = img_array[::stride, ::stride]
+    h, w = level.shape[:2]
+    mask = level[:, :, 3] >= 128 if level.shape[2] == 4 else np.ones((h, w), dtype=bool)
+    if background is not None:
+        rows = np.arange(h) * stride // background_stride
+        cols = np.arange(w) * stride // background_stride
+        mask &= ~background[np.ix_(rows, cols)]
+    return pack_rgb(level[mask][:, :3])
+
+
+def progressive_colors(img_array, tolerance, ignore_background=False, ignore_black=False, k_min=2, k_max=10, cluster_engine=DEFAULT_ENGINE, n_jobs=1, profiler=NULL_PROFILER, quantize=None):
+    """
+    Kademeli analiz: en kaba seviyede bir kez kümele, belirsiz kısmı incelt
+
+    Seviyeler her stride'ıncı pikseldir (ortalama alınmaz, yeni renk oluşmaz)
+    ve sayılar tam çözünürlük piksel karşılığına ölçeklenir. KMeans yalnızca
+    en kaba seviyede çalışır; k ve merkezler o seviyenin örnekleminden gelir.
+    Paylar, renklerin en yakın merkeze atanmasıyla tahmin edilen piksel
+    paylarıdır (labels modundaki kesin piksel paylarının tahmini; örnek
+    ağırlıkları seyreltmeyle değiştiği için kullanılmaz). Payların %95
+    örnekleme hatası (share_errors) tolerance (yüzde puanı) altındaysa seviye
+    tek başına kabul edilir. Değilse bir sonraki (iki kat) çözünürlükte
+    yalnızca PROGRESSIVE_MIN_COLOR_SAMPLES'tan az örneklenmiş ve hiç
+    görülmemiş renklerin pikselleri yeniden sayılır; iyi örneklenmiş renklerin
+    hatası tek başına toleransı aşıyorsa seviyenin tamamı sayılır. Tam
+    çözünürlükte sayılan renklerin hatası yoktur. Arka plan maskesi kaba
+    seviyede bir kez çıkarılır ve ince seviyelere blok olarak taşınır.
+
+    Renk kümesi yalnızca son seviye tam çözünürlükse tamdır; değilse
+    örneklenen piksellerde görülen renklerdir (benzersiz renk sayısının alt
+    sınırı) ve rapordaki unique_colors_exact False olur.
+
+    (renkler, sayılar, kümeleme, rapor) döndürür; kümeleme cluster_colors
+    çıktısı biçimindedir. Renk kalmazsa NoColorsError.
+    """
+    h, w = img_array.shape[:2]
+    stride = progressive_strides(w, h)[0]
+    report = {"tolerance_pct": tolerance, "levels": []}
+
+    level = img_array[::stride, ::stride]
+    colors, samples, colors_to_ignore, removed = raster_colors(level, ignore_background, profiler=profiler)
+    background = unpack_rows(removed, 0, level.shape[0], level.shape[1]) if removed is not None else None
+    background_stride = stride
+    # Level every colour was last counted at
+    strides = np.full(colors.shape, stride, dtype=np.int64)
+    counts = samples * stride * stride
+    keep, optimal_k, centers_rgb, shares, clustered = cluster_colors(
+        colors, counts, colors_to_ignore, ignore_black, k_min, k_max, cluster_engine, n_jobs, profiler, quantize)
+    counted = int(samples.sum())
+
+    while True:
+        error = 0.0
+        if centers_rgb:
+            labels = np.full(colors.shape, -1, dtype=np.intp)
+            labels[keep] = nearest_centers(colors[keep], centers_rgb)
+            mass = np.bincount(labels[keep], weights=counts[keep], minlength=len(centers_rgb))
+            total = mass.sum()
+            shares = list(mass / total)
+            error = float(share_errors(counts, samples, strides, labels, len(centers_rgb), total).max())
+        report["levels"].append({
+            "stride": stride,
+            "resolution": [-(-w // stride), -(-h // stride)],
+            "counted_pixels": counted,
+            "sampling_error_pct": round(error, 4),
+        })
+        if error <= tolerance or stride == 1:
             break
 
-    # FORCE INCLUSION:
-    # If we have very distinct colors that are small (like White stars), 
-    # and they haven't been added (or added enough), force add them.
-    # Check for White specifically or high brightness colors if they exist in filtered_counts
-    
-    for hex_c, count in sorted_colors:
-        r, g, b = int(hex_c[1:3], 16), int(hex_c[3:5], 16), int(hex_c[5:7], 16)
-        # Check if it's a "star" (bright)
-        if (r+g+b)/3 > 200:
-             # Add 100 samples of this star color to ensure K-Means sees it
-             rgb_samples.extend([[r, g, b]] * 100)
+        # Next level: only the uncertain part of the histogram is counted again
+        stride //= 2
+        settled = samples >= PROGRESSIVE_MIN_COLOR_SAMPLES
+        if share_errors(counts[settled], samples[settled], strides[settled], labels[settled],
+                        len(centers_rgb), total).max() > tolerance:
+            settled[:] = False
+        with profiler.stage("progressive_recount"):
+            table = np.zeros(1 << 24, dtype=bool)
+            table[colors[settled]] = True
+            packed = level_pixels(img_array, stride, background, background_stride)
+            packed = packed[~table[packed]]
+            new_colors, new_samples = color_histogram(packed)
+        counted = int(packed.size)
+
+        colors = np.concatenate([colors[settled], new_colors])
+        samples = np.concatenate([samples[settled], new_samples])
+        strides = np.concatenate([strides[settled], np.full(new_colors.shape, stride, dtype=np.int64)])
+        counts = samples * strides * strides
+        keep = color_filter(colors, colors_to_ignore, ignore_black)
+        if not counts[keep].sum():
+            raise NoColorsError("No colors found after filtering")
+
+    report["stride"] = stride
+    report["resolution"] = report["levels"][-1]["resolution"]
+    report["converged"] = bool(error <= tolerance)
+    # Every pixel outside the settled colours was counted at full resolution
+    report["unique_colors_exact"] = stride == 1
+    profiler.count("progressive_levels", len(report["levels"]))
+    return colors, counts, (keep, optimal_k, centers_rgb, shares, clustered), report
 
-    if not rgb_samples:
-        return {"error": "No colors found"}
 
-    rgb_array = np.array(rgb_samples, dtype=np.uint8)
-    
-    # Adjust k_max if we found more distinct significant colors
-    # This helps if the user asked for k=10 but we clearly see 12 distinct clusters
-    # But we stick to user limits for now
-    
-    optimal_k, centers_rgb, shares = find_optimal_k_advanced(rgb_array, k_min, k_max)
+# ============================================================================
+# BOYA MİKTARI HESAPLAMA
+# ============================================================================
 
-    # KMeans renkleri
+def calculate_paint(area_mm2, kat_sayisi=1.0):
+    """
+    Boya miktarını hesapla (gram cinsinden)
+
+    area_mm2: Alan (mm²)
+    kat_sayisi: Ağırlık kat sayısı
+    """
+    if area_mm2 <= 0:
+        return {"grams": 0.0}
+
+    grams = area_mm2 * kat_sayisi
+
+    return {
+        "grams": round(grams, 2)
+    }
+
+
+def build_result(summary, total_area_mm2, kat_sayisi=1.0, cache=None):
+    """
+    Ölçekten bağımsız kümeleme özetinden (merkezler, paylar, Pantone) alan ve
+    boya miktarlarını içeren sonucu oluştur
+
+    cache: sonuç önbelleği kullanıldıysa "hit" / "miss" (meta alanına yazılır)
+    """
     kmeans_colors = []
-    if centers_rgb and shares:
-        for rgb, share in zip(centers_rgb, shares):
-            r, g, b = rgb
-            pantone = find_closest_pantone(r, g, b, pantone_df)
-            area_mm2 = share * total_area_mm2
-            paint = calculate_paint(area_mm2, kat_sayisi)
-
-            kmeans_colors.append({
-                "rgb": [int(r), int(g), int(b)],
-                "hex": f"#{int(r):02X}{int(g):02X}{int(b):02X}",
-                "pantone": pantone,
-                "area_mm2": round(area_mm2, 2),
-                "percentage": round(share * 100, 2),
-                "paint": paint
-            })
+    for color in summary["colors"]:
+        r, g, b = color["rgb"]
+        share = color["share"]
+        area_mm2 = share * total_area_mm2
+        paint = calculate_paint(area_mm2, kat_sayisi)
+
+        kmeans_colors.append({
+            "rgb": [int(r), int(g), int(b)],
+            "hex": f"#{int(r):02X}{int(g):02X}{int(b):02X}",
+            "pantone": color["pantone"],
+            "area_mm2": round(area_mm2, 2),
+            "percentage": round(share * 100, 2),
+            "paint": paint
+        })
+        if "mask" in color:
+            kmeans_colors[-1].update(pixels=color["pixels"], mask=color["mask"])
 
     # Toplam boya
     total_paint = calculate_paint(total_area_mm2, kat_sayisi)
 
-    return {
+    result = {
         "total_area_mm2": round(total_area_mm2, 2),
-        "unique_colors_count": len(filtered_counts),
+        "unique_colors_count": summary["unique_colors_count"],
+        **({"quantized_colors_count": summary["quantized_colors_count"]} if "quantized_colors_count" in summary else {}),
         "kmeans": {
-            "optimal_k": optimal_k,
+            "optimal_k": summary["optimal_k"],
             "colors": kmeans_colors
         },
         "total_paint": total_paint
     }
+    for block in ("progressive", "labels"):
+        if block in summary:
+            result[block] = summary[block]
+    if cache is not None:
+        result["meta"] = {"cache": cache}
+    return result
+
+
+# ============================================================================
+# ANA ANALİZ FONKSİYONU
+# ============================================================================
+
+def analyze_svg(image_path, total_area_mm2, dpi=300, k_min=2, k_max=10, pantone_df=None, kat_sayisi=1.0, ignore_background=False, ignore_black=False, pantone_lut=None, tile_size=None, strip_memory=None, cluster_engine=DEFAULT_ENGINE, n_jobs=1, result_cache=None, profile=False, vector=None, progressive=None, labels=None, quantize=None, session=None):
+    """
+    Resmi tam analiz et
+
+    pantone_df: Pantone DataFrame'i ya da hazır PantoneMatcher/PantoneIndex
+        (kütüphane seçimi için get_pantone_matcher("coated+uncoated"))
+    pantone_lut: pantone_df ile aynı veritabanına ait RGBLookupTable (opsiyonel)
+    tile_size / strip_memory: akış modu; resim tile_size satırlık ya da
+        strip_memory MB'lık şeritler halinde işlenir. Resim yine bir kez
+        tamamen çözülür (PIL); sınır yalnızca şeritlerin RGBA kopyası ve
+        histogram geçicileri içindir, toplam belleği sınırlamaz
+    cluster_engine: elbow taraması için KMeans motoru ("sweep" / "incremental")
+    n_jobs: sweep motorunda paralel süreç sayısı
+    result_cache: ResultCache (opsiyonel); aynı resim ve kümeleme parametreleri
+        için yalnızca alan/boya ölçeklemesi yeniden hesaplanır
+    profile: True ya da StageProfiler ise sonuca aşama bazlı "timings" bloğu
+        eklenir ve kayıt profile logger'ına yazılır
+    vector: SVG'yi rasterize etmeden vektörel ölç (None: .svg/.svgz uzantısına
+        göre). Renk alanları geometriden kesin hesaplanır; dpi yalnızca
+        KMeans örnek ağırlıklarının çözünürlüğüdür.
+    progressive: kademeli mod toleransı (yüzde puanı); resim seyreltilmiş en
+        kaba seviyede kümelenir, payların örnekleme hatası bu tolerans
+        altındaysa tam çözünürlüğe çıkılmaz; paylar tahmini piksel paylarıdır
+        (progressive_colors). unique_colors_count o zaman örneklenen
+        seviyenin renk sayısıdır (progressive.unique_colors_exact False). Yalnızca bellek içi raster modunda geçerlidir.
+    labels: "rle" / "png"; her piksel renk → küme tablosuyla etiketlenir,
+        paylar etiket haritasındaki kesin piksel sayılarından hesaplanır ve
+        her renge küme maskesi eklenir. Raster modunda geçerlidir; tam
+        çözünürlük gerektirdiği için progressive'i devre dışı bırakır.
+    quantize: örnekleme öncesi Lab ızgarası aralığı (ΔE76); neredeyse aynı
+        renkler birleştirilir, sonuçta ham ve nicelenmiş renk sayıları yer alır.
+    session: SessionCache (opsiyonel); aynı resmin histogramı, örneklemi ve
+        k başına modelleri istekler arasında saklanır. k aralığı değişince
+        yalnızca yeni k değerleri, filtre değişince yalnızca filtre ve
+        örnekleme yeniden hesaplanır. labels ve progressive ile kullanılmaz.
+    """
+    if vector is None:
+        vector = is_svg(image_path)
+    streaming = tile_size is not None or strip_memory is not None
+    if vector:
+        labels = None
+    if labels is not None and labels not in LABEL_FORMATS:
+        return {"error": f"Bilinmeyen maske biçimi: {labels}"}
+    if vector or streaming or labels:
+        progressive = None
+
+    if profile is True:
+        profile = StageProfiler()
+    profiler = profile.start() if profile else NULL_PROFILER
+    try:
+        def finish(result):
+            if profiler.enabled:
+                result["timings"] = profiler.report()
+                profiler.emit(image=str(image_path))
+            return result
+
+        if pantone_df is None:
+            pantone_df = get_pantone_matcher()
+
+        # 1. Sonuç önbelleği (boyut ve kat sayısı anahtara girmez)
+        key = None
+        summary = None
+        if result_cache is not None:
+            with profiler.stage("cache_lookup"):
+                try:
+                    key = cache_key(
+                        file_digest(image_path),
+                        ANALYSIS_VERSION,
+                        k_min=k_min,
+                        k_max=k_max,
+                        ignore_background=ignore_background,
+                        ignore_black=ignore_black,
+                        cluster_engine=cluster_engine,
+                        pantone=get_matcher(pantone_df).digest(),
+                        pantone_lut=pantone_lut is not None,
+                        **({"vector": True, "dpi": dpi} if vector else {}),
+                        **({"progressive": progressive} if progressive is not None else {}),
+                        **({"labels": labels} if labels else {}),
+                        **({"quantize": quantize} if quantize else {})
+                    )
+                except (OSError, TypeError):
+                    key = None
+
+                summary = result_cache.get(key) if key else None
+            if summary is not None:
+                return finish(build_result(summary, total_area_mm2, kat_sayisi, cache="hit"))
+
+        # Session state: intermediates of the same image reused across requests
+        state_key = None
+        cached = None
+        if session is not None and progressive is None and not labels:
+            try:
+                state_key = (file_digest(image_path), bool(ignore_background), ("vector", dpi) if vector else "raster")
+            except OSError:
+                state_key = None
+            cached = session.get(("colors",) + state_key) if state_key else None
+            profiler.count("session_colors_hit", cached is not None)
+
+        clustering = None
+        progress = None
+        removed = None
+        if cached is not None:
+            colors, counts, areas, colors_to_ignore = cached
+        elif vector:
+            # 2-4. SVG: fill areas straight from the geometry, no rasterization
+            try:
+                with profiler.stage("vector"):
+                    drawing = load_drawing(image_path)
+                    colors, counts, areas = drawing.color_weights(dpi)
+            except (OSError, SVGError) as e:
+                return finish({"error": str(e)})
+            for name, value in drawing.stats.items():
+                profiler.count(f"svg_{name}", value)
+            profiler.count("unique_colors", int(colors.size))
+
+            colors_to_ignore = []
+            if ignore_background:
+                # Colours showing at the canvas corners are dropped wherever they are painted
+                colors_to_ignore = [(color, FLOODFILL_TOLERANCE) for color in drawing.background_colors()]
+        else:
+            # 2. Resmi Yükle (Rasterizasyon Node tarafında yapılmış olabilir veya doğrudan resim gelir)
+            try:
+                with profiler.stage("decode"):
+                    img = Image.open(image_path)
+                    if streaming or (img.mode in INDEXED_MODES and progressive is None):
+                        # Keep the decoded frame in its native mode; strips are expanded to
+                        # RGBA one by one and palette images are counted by index
+                        img.load()
+                    else:
+                        img = np.array(img.convert("RGBA"))
+            except Exception as e:
+                return finish({"error": str(e)})
+
+            # 3-4. Background Filtering + Piksel analizi
+            areas = None
+            if progressive is not None:
+                try:
+                    colors, counts, clustering, progress = progressive_colors(
+                        img, progressive, ignore_background, ignore_black, k_min, k_max,
+                        cluster_engine, n_jobs, profiler, quantize)
+                except NoColorsError as e:
+                    return finish({"error": str(e)})
+            else:
+                colors, counts, colors_to_ignore, removed = raster_colors(img, ignore_background, tile_size, strip_memory, profiler)
+
+        state = None
+        if state_key:
+            if cached is None:
+                session.put(("colors",) + state_key, (colors, counts, areas, colors_to_ignore))
+            sample_key = ("sample",) + state_key + (bool(ignore_black), quantize)
+            state = session.get(sample_key)
+            profiler.count("session_sample_hit", state is not None)
+            # Each request works on its own copy: concurrent server requests
+            # never mutate a dict that another one is reading
+            state = {} if state is None else dict(state, models=dict(state.get("models", {})))
+
+        try:
+            keep, optimal_k, centers_rgb, shares, clustered_count = clustering or cluster_colors(
+                colors, counts, colors_to_ignore, ignore_black, k_min, k_max, cluster_engine, n_jobs, profiler, quantize, state)
+        except NoColorsError as e:
+            return finish({"error": str(e)})
+
+        if state:
+            # The request's copy replaces the entry; newly fitted models count towards the memory cap
+            session.put(sample_key, state)
+
+        filtered_colors = colors[keep]
+        filtered_areas = areas[keep] if areas is not None else None
+
+        if filtered_areas is not None and centers_rgb:
+            # Vector input: shares from the exact areas, not from the sample weights
+            shares = area_shares(filtered_colors, filtered_areas, centers_rgb)
+
+        masks = None
+        pixel_counts = None
+        if labels and centers_rgb:
+            # Every pixel labelled through the colour → cluster table; shares from exact counts
+            with profiler.stage("labels"):
+                if isinstance(img, np.ndarray):
+                    h, w = img.shape[:2]
+                    rows_per_strip = h
+                    read_strip = lambda top, bottom: img[top:bottom]
+                else:
+                    w, h = img.size
+                    rows_per_strip = strip_rows(w, tile_size, strip_memory) if streaming else h
+                    read_strip = lambda top, bottom: read_rgba_strip(img, top, bottom)
+                label_map = label_image(read_strip, (w, h), rows_per_strip, color_lut(filtered_colors, centers_rgb), removed)
+                pixel_counts = label_counts(label_map, len(centers_rgb))
+                masks = cluster_masks(label_map, len(centers_rgb), labels)
+                del label_map
+            labelled = int(pixel_counts.sum())
+            profiler.count("labelled_pixels", labelled)
+            if labelled:
+                shares = list(pixel_counts / labelled)
+
+        # KMeans renkleri
+        colors_summary = []
+        if centers_rgb and shares:
+            with profiler.stage("pantone"):
+                pantones = find_closest_pantones(centers_rgb, pantone_df, pantone_lut)
+            for i, (rgb, share, pantone) in enumerate(zip(centers_rgb, shares, pantones)):
+                colors_summary.append({"rgb": list(rgb), "share": share, "pantone": pantone})
+                if masks is not None:
+                    colors_summary[-1].update(pixels=int(pixel_counts[i]), mask=masks[i])
+
+        summary = {
+            "unique_colors_count": len(filtered_colors),
+            "optimal_k": optimal_k,
+            "colors": colors_summary
+        }
+        if quantize:
+            summary["quantized_colors_count"] = clustered_count
+        if progress is not None:
+            summary["progressive"] = progress
+        if masks is not None:
+            summary["labels"] = {"format": labels, "size": [int(w), int(h)], "labelled_pixels": labelled}
+
+        if key:
+            try:
+                with profiler.stage("cache_store"):
+                    result_cache.put(key, summary, encoder=NumpyEncoder)
+            except OSError:
+                pass
+
+        return finish(build_result(summary, total_area_mm2, kat_sayisi,
+                                   cache="miss" if result_cache is not None else None))
+    finally:
+        # tracemalloc is released on errors and cancellation too
+        profiler.finish()
 
 
 # ============================================================================
 # MAIN
 # ============================================================================
 
-def main():
+def build_parser():
+    """Komut satırı argümanları (CLI ve analiz sunucusu aynı ayrıştırıcıyı kullanır)"""
     parser = argparse.ArgumentParser(description="SVG Renk Analiz Aracı")
     parser.add_argument("image", help="Resim dosya yolu")
     parser.add_argument("--genislik", type=float, default=100, help="Resim genişliği (mm) - varsayılan: 100")
@@ -501,29 +1174,181 @@ def main():
     parser.add_argument("--kat-sayisi", type=float, default=1.0, help="Ağırlık kat sayısı - varsayılan: 1.0")
     parser.add_argument("--k-min", type=int, default=2, help="Minimum renk sayısı (varsayılan: 2)")
     parser.add_argument("--k-max", type=int, default=10, help="Maksimum renk sayısı (varsayılan: 10)")
+    parser.add_argument("--dpi", type=float, default=300,
+                        help="SVG vektör modunda örnek ağırlıklarının çözünürlüğü (varsayılan: 300)")
     parser.add_argument("--ignore-black", action="store_true", help="Siyah arka planı yoksay (Legacy)")
     parser.add_argument("--ignore-background", action="store_true", help="Otomatik arka plan algıla ve yoksay")
+    parser.add_argument("--library", default=os.environ.get("PANTONE_LIBRARY") or None,
+                        help="Pantone kütüphanesi ya da birleşimi, ör. coated+uncoated (PANTONE_LIBRARY, varsayılan: pantone)")
+    parser.add_argument("--pantone-lut", action="store_true", default=os.environ.get("PANTONE_LUT") == "1",
+                        help="Diskteki RGB → Pantone arama tablosunu kullan (PANTONE_LUT=1)")
+    parser.add_argument("--tile-size", type=int, default=None, help="Akış modu: şerit başına satır sayısı")
+    parser.add_argument("--strip-memory", "--max-memory", type=float, default=None,
+                        help="Akış modu: şerit başına ek çalışma belleği (MB). Çözülmüş resim ayrıca "
+                             "bellekte tutulur; toplam bellek kullanımını (RSS) sınırlamaz")
+    parser.add_argument("--progressive", type=float, default=None, metavar="TOL",
+                        help="Kademeli mod: payların örnekleme hatası TOL yüzde puanı altındaysa tam çözünürlüğe çıkma (ör. 0.5)")
+    parser.add_argument("--labels", choices=LABEL_FORMATS, default=None,
+                        help="Her pikseli kümesine ata: kesin piksel sayıları ve küme başına maske (rle / png)")
+    parser.add_argument("--quantize", type=float, default=None, metavar="DELTA_E",
+                        help="Örnekleme öncesi ön niceleme: Lab ızgarası hücre kenarı (ΔE76, ör. 2)")
+    parser.add_argument("--cluster-engine", choices=ENGINES, default=DEFAULT_ENGINE,
+                        help=f"Elbow taraması KMeans motoru (varsayılan: {DEFAULT_ENGINE})")
+    parser.add_argument("--jobs", type=int, default=default_jobs(),
+                        help="k taraması için paralel süreç sayısı (COLOR_ANALYSIS_JOBS, varsayılan: 1)")
+    parser.add_argument("--cache-dir", default=os.environ.get(CACHE_DIR_ENV),
+                        help=f"Sonuç önbelleği dizini ({CACHE_DIR_ENV}, varsayılan: kapalı)")
+    parser.add_argument("--cache-size", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help="Sonuç önbelleği üst sınırı (MB, varsayılan: 256)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Sonuca aşama bazlı süre/bellek/sayaç bloğu (timings) ekle")
+    parser.add_argument("--profile-log", default=os.environ.get(PROFILE_LOG_ENV),
+                        help=f"Aşama ölçümlerini tek satır JSON olarak yaz: dosya ya da - (stderr) ({PROFILE_LOG_ENV})")
+    return parser
+
+
+def _param_value(key, value, action):
+    """
+    JSON parametre değerini argparse seçeneğinin türüne çevir
 
-    args = parser.parse_args()
+    Bayraklar yalnızca true/false, sayılar sayı ya da sayı metni, diğerleri
+    metin alır; null yalnızca varsayılanı boş olan seçeneklerde kabul edilir.
+    Uymayan değerler ("True" / "None" metnine dönüşmek yerine) ValueError.
+    """
+    if value is None:
+        if action.default is not None:
+            raise ValueError(f"{key} boş (null) olamaz")
+        return None
+
+    if action.nargs == 0:
+        if not isinstance(value, bool):
+            raise ValueError(f"{key} true ya da false olmalı, {value!r} verildi")
+        return value
+
+    if action.type in (int, float):
+        # bool is an int subclass; true must not become 1
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError(f"{key} bir sayı olmalı, {value!r} verildi")
+        try:
+            number = action.type(value) if isinstance(value, str) else value
+        except ValueError:
+            raise ValueError(f"{key} bir sayı olmalı, {value!r} verildi") from None
+        if action.type is float:
+            return float(number)
+        if isinstance(number, float):
+            if not number.is_integer():
+                raise ValueError(f"{key} bir tam sayı olmalı, {value!r} verildi")
+            number = int(number)
+        return number
+
+    if not isinstance(value, str):
+        raise ValueError(f"{key} bir metin olmalı, {value!r} verildi")
+    return action.type(value) if action.type is not None else value
+
+
+def parse_analysis_args(argv, params=None):
+    """
+    Analiz argümanlarını ayrıştır; params sözlüğündeki değerler (CLI adlarıyla,
+    "k-max" veya "k_max") türleri denetlenerek üzerine yazılır. Geçersiz
+    girişte ValueError.
+    """
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit:
+        raise ValueError(f"Geçersiz argümanlar: {argv}")
+
+    actions = {action.dest: action for action in parser._actions}
+    # Old option names stay valid as parameters too ("max_memory")
+    for action in parser._actions:
+        for option in action.option_strings:
+            actions.setdefault(option.lstrip("-").replace("-", "_"), action)
+    for key, value in (params or {}).items():
+        dest = key.replace("-", "_")
+        action = actions.get(dest)
+        if action is None or dest in ("help", "image"):
+            raise ValueError(f"Bilinmeyen parametre: {key}")
+        value = _param_value(key, value, action)
+        if action.choices is not None and value not in action.choices:
+            raise ValueError(f"Geçersiz değer: {key}={value}")
+        setattr(args, action.dest, value)
+
+    return args
+
+
+def run_analysis(args, on_stage=None, should_cancel=None, session=None):
+    """
+    Ayrıştırılmış argümanlarla analizi çalıştır
 
+    on_stage / should_cancel: aşama girişlerinde ilerleme bildirimi ve iptal
+    kontrolü (StageHooks); iptalde profiling.StageCancelled yükselir.
+    session: istekler arası ara durum (analysis_session.SessionCache)
+    (sonuç, başarılı) döndürür; dosya ya da kütüphane bulunamazsa başarılı False olur.
+    """
     image_path = Path(args.image)
     if not image_path.exists():
-        print(json.dumps({"error": f"Dosya bulunamadı: {image_path}"}))
-        sys.exit(1)
+        return {"error": f"Dosya bulunamadı: {image_path}"}, False
+
+    try:
+        matcher = get_pantone_matcher(args.library)
+    except ValueError as e:
+        return {"error": str(e)}, False
 
     # Alan hesapla
     total_area_mm2 = args.genislik * args.yukseklik
 
+    # Profile log alone measures without changing the printed result
+    configure_profile_log(args.profile_log)
+    profiler = StageProfiler() if args.profile or args.profile_log else None
+    if on_stage is not None or should_cancel is not None:
+        profiler = StageHooks(on_stage, should_cancel, profiler or NULL_PROFILER)
+
     # Analiz et
     result = analyze_svg(
         image_path, 
         total_area_mm2=total_area_mm2, 
         k_min=args.k_min, 
         k_max=args.k_max, 
+        dpi=args.dpi,
+        pantone_df=matcher,
         kat_sayisi=args.kat_sayisi, 
         ignore_black=args.ignore_black,
-        ignore_background=args.ignore_background
+        ignore_background=args.ignore_background,
+        pantone_lut=open_pantone_lut(args.library) if args.pantone_lut else None,
+        tile_size=args.tile_size,
+        strip_memory=args.strip_memory,
+        cluster_engine=args.cluster_engine,
+        n_jobs=args.jobs,
+        result_cache=ResultCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None,
+        profile=profiler,
+        progressive=args.progressive,
+        labels=args.labels,
+        quantize=args.quantize,
+        session=session
     )
+    if not args.profile:
+        result.pop("timings", None)
+    return result, True
+
+
+def main():
+    # python color_analysis.py serve [...]: kalıcı analiz sunucusu
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from analysis_server import main as serve_main
+        serve_main(sys.argv[2:])
+        return
+
+    # python color_analysis.py batch <dizin|glob|manifest.jsonl> [...]: toplu analiz
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from analysis_batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+
+    args = build_parser().parse_args()
+    result, ok = run_analysis(args)
+
+    if not ok:
+        print(json.dumps(result))
+        sys.exit(1)
 
     # JSON yazdır
     print(json.dumps(result, ensure_ascii=False, indent=2, cls=NumpyEncoder))
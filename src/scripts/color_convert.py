@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vektörel sRGB ↔ LAB (D50) Dönüşümü
+- Dizi girişli / dizi çıkışlı, renk başına Python nesnesi oluşturmaz
+- colormath ile aynı sabitler: sRGB (D65) + Bradford uyarlaması → D50
+- uint8 girişte her benzersiz renk yalnızca bir kez dönüştürülür
+"""
+
+import numpy as np
+
+
+# ============================================================================
+# SABİTLER (colormath.color_constants / color_objects.sRGBColor)
+# ============================================================================
+
+_RGB_TO_XYZ = np.array((
+    (0.412424, 0.357579, 0.180464),
+    (0.212656, 0.715158, 0.0721856),
+    (0.0193324, 0.119193, 0.950444)))
+
+_XYZ_TO_RGB = np.array((
+    (3.24071, -1.53726, -0.498571),
+    (-0.969258, 1.87599, 0.0415557),
+    (0.0556352, -0.203996, 1.05707)))
+
+_BRADFORD = np.array((
+    (0.8951, 0.2664, -0.1614),
+    (-0.7502, 1.7135, 0.0367),
+    (0.0389, -0.0685, 1.0296)))
+
+D50 = np.array((0.96422, 1.00000, 0.82521))
+D65 = np.array((0.95047, 1.00000, 1.08883))
+
+_CIE_E = 216.0 / 24389.0
+
+
+def _adaptation_matrix(wp_src, wp_dst):
+    """Bradford kromatik uyarlama matrisi"""
+    rgb_src = _BRADFORD @ wp_src
+    rgb_dst = _BRADFORD @ wp_dst
+    return np.linalg.pinv(_BRADFORD) @ np.diag(rgb_dst / rgb_src) @ _BRADFORD
+
+
+_D65_TO_D50 = _adaptation_matrix(D65, D50)
+_D50_TO_D65 = _adaptation_matrix(D50, D65)
+
+
+# ============================================================================
+# DÖNÜŞÜMLER
+# ============================================================================
+
+def srgb_to_lab(rgb):
+    """(..., 3) 0-255 RGB dizisini D50 Lab'a çevir"""
+    rgb = np.asarray(rgb)
+    v = rgb.reshape(-1, 3).astype(np.float64) / 255.0
+
+    linear = np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+    xyz = np.maximum(linear @ _RGB_TO_XYZ.T, 0.0) @ _D65_TO_D50.T
+
+    t = xyz / D50
+    f = np.where(t > _CIE_E, np.cbrt(t), 7.787 * t + 16.0 / 116.0)
+
+    lab = np.empty_like(f)
+    lab[:, 0] = 116.0 * f[:, 1] - 16.0
+    lab[:, 1] = 500.0 * (f[:, 0] - f[:, 1])
+    lab[:, 2] = 200.0 * (f[:, 1] - f[:, 2])
+    return lab.reshape(rgb.shape[:-1] + (3,))
+
+
+def lab_to_srgb_float(lab):
+    """(..., 3) D50 Lab dizisini 0.0-1.0 aralığına kırpılmış sRGB'ye çevir"""
+    lab = np.asarray(lab, dtype=np.float64)
+    flat = lab.reshape(-1, 3)
+
+    fy = (flat[:, 0] + 16.0) / 116.0
+    fx = flat[:, 1] / 500.0 + fy
+    fz = fy - flat[:, 2] / 200.0
+    f = np.column_stack((fx, fy, fz))
+
+    cubed = f ** 3
+    xyz = np.where(cubed > _CIE_E, cubed, (f - 16.0 / 116.0) / 7.787) * D50
+
+    linear = np.maximum((xyz @ _D50_TO_D65.T) @ _XYZ_TO_RGB.T, 0.0)
+    v = np.where(linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055)
+    return np.clip(v, 0.0, 1.0).reshape(lab.shape)
+
+
+def lab_to_srgb(lab):
+    """(..., 3) D50 Lab dizisini 0-255 uint8 sRGB'ye çevir"""
+    return np.clip(np.round(lab_to_srgb_float(lab) * 255), 0, 255).astype(np.uint8)
+
+
+def pack_rgb(rgb):
+    """(..., 3) uint8 RGB'yi 24-bit tamsayıya paketle"""
+    rgb = np.asarray(rgb, dtype=np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def unpack_rgb(packed):
+    """24-bit tamsayıları (..., 3) uint8 RGB'ye aç"""
+    packed = np.asarray(packed, dtype=np.uint32)
+    return np.stack(((packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF), axis=-1).astype(np.uint8)
+
+
+def srgb_u8_to_lab(rgb):
+    """
+    uint8 RGB için hızlı yol: her benzersiz renk bir kez dönüştürülür,
+    sonuç ters indeksle tüm girdiye dağıtılır
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    packed = pack_rgb(rgb).ravel()
+    unique, inverse = np.unique(packed, return_inverse=True)
+    lab = srgb_to_lab(unpack_rgb(unique))
+    return lab[inverse].reshape(rgb.shape[:-1] + (3,))
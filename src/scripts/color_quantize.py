@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ön Niceleme (--quantize)
+- Fotoğraf ve kenar yumuşatmalı çizimlerde yüz binlerce neredeyse aynı renk,
+  örnekleme ve kümelemeden önce Lab ızgarasında birleştirilir
+- Izgara hücresi kenarı bucket (ΔE76 birimi); hücre rengi üyelerin sayı
+  ağırlıklı Lab ortalaması
+- Hücre başına sayılar kesin toplanır, toplam piksel sayısı değişmez
+- Sıra korunur: hücreler ilk üyelerinin görüldüğü sırada döner
+"""
+
+import numpy as np
+
+from color_convert import lab_to_srgb, pack_rgb, srgb_to_lab, unpack_rgb
+
+
+# Default cell edge of the Lab grid (ΔE76)
+DEFAULT_BUCKET = 2.0
+
+# Colours converted to Lab per chunk
+LAB_CHUNK = 1 << 20
+
+
+def _lab(colors):
+    """Paketlenmiş renklerin float32 Lab değerleri (parça parça dönüştürülür)"""
+    lab = np.empty((colors.size, 3), dtype=np.float32)
+    for start in range(0, colors.size, LAB_CHUNK):
+        lab[start:start + LAB_CHUNK] = srgb_to_lab(unpack_rgb(colors[start:start + LAB_CHUNK]))
+    return lab
+
+
+def lab_grid_quantize(colors, counts, bucket=DEFAULT_BUCKET):
+    """
+    Renkleri bucket kenarlı Lab hücrelerinde birleştir
+
+    colors / counts: paketlenmiş renkler ve sayıları (color_histogram sırası).
+    (renkler, sayılar) döndürür; aynı sRGB değerine düşen hücreler de birleşir.
+    """
+    if bucket <= 0:
+        raise ValueError(f"Geçersiz niceleme aralığı: {bucket}")
+    colors = np.asarray(colors, dtype=np.uint32)
+    counts = np.asarray(counts, dtype=np.int64)
+    if colors.size == 0:
+        return colors, counts
+
+    lab = _lab(colors)
+    cells = np.floor(lab / np.float32(bucket)).astype(np.int64)
+    # a and b stay within ±128 for sRGB; shift them to non-negative cell indices
+    offset = int(np.ceil(128.0 / bucket)) + 1
+    span = 2 * offset + 1
+    key = (cells[:, 0] * span + (cells[:, 1] + offset)) * span + (cells[:, 2] + offset)
+
+    _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    weights = counts.astype(np.float64)
+    totals = np.bincount(inverse, weights=weights)
+    mean = np.stack([np.bincount(inverse, weights=lab[:, c] * weights) for c in range(3)], axis=1) / totals[:, None]
+
+    order = np.argsort(first, kind="stable")
+    packed = pack_rgb(lab_to_srgb(mean[order]))
+    merged, first_pos, inverse = np.unique(packed, return_index=True, return_inverse=True)
+    merged_counts = np.bincount(inverse, weights=totals[order], minlength=merged.size)
+    by_first = np.argsort(first_pos, kind="stable")
+    return merged[by_first].astype(np.uint32), np.rint(merged_counts[by_first]).astype(np.int64)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pantone Kütüphane Kataloğu
+- Birden fazla swatch kütüphanesi (extract_pantone.py çıktısı JSON'lar)
+- Varsayılan: pantone_database.json ("pantone"); libraries/ dizinindeki her
+  JSON dosya adıyla; PANTONE_LIBRARIES ile ek "ad=yol" girişleri
+- Kütüphane ya da birleşim ("coated+uncoated") başına eşleştirici bir kez
+  kurulur ve önbellekte tutulur; istek başına yükleme/filtreleme yapılmaz
+
+Kullanım: python pantone_catalog.py list
+"""
+
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from pantone_matcher import create_matcher
+from pantone_store import load_columns
+
+
+DATABASE_PATH = Path(__file__).parent / "pantone_database.json"
+
+DEFAULT_LIBRARY = "pantone"
+
+LIBRARIES_DIR = Path(__file__).parent / "libraries"
+
+# Extra libraries as "name=path" entries separated by os.pathsep
+LIBRARIES_ENV = "PANTONE_LIBRARIES"
+
+# Separators accepted between library names in a union
+_UNION_SEPARATORS = ("+", ",")
+
+
+def _with_white(names, codes, lab):
+    """Kütüphanede White yoksa ekle (boyasız alan için)"""
+    if any("white" in name.lower() for name in names):
+        return names, codes, lab
+    return names + ["White"], codes + ["White"], np.vstack((lab, [[100.0, 0.0, 0.0]]))
+
+
+class PantoneCatalog:
+    """Adlandırılmış swatch kütüphaneleri ve önbelleğe alınmış eşleştiricileri"""
+
+    def __init__(self):
+        self._paths = {}
+        self._columns = {}
+        self._matchers = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, path):
+        """Kütüphaneyi kaydet (aynı ad varsa değiştirilir, önbelleği düşürülür)"""
+        name = name.strip()
+        if not name or any(sep in name for sep in _UNION_SEPARATORS):
+            raise ValueError(f"Geçersiz kütüphane adı: {name!r}")
+
+        with self._lock:
+            self._paths[name] = Path(path)
+            self._columns.pop(name, None)
+            for key in [key for key in self._matchers if name in key]:
+                del self._matchers[key]
+
+    def register_directory(self, directory):
+        """Dizindeki her *.json dosyasını dosya adıyla kaydet"""
+        directory = Path(directory)
+        if not directory.is_dir():
+            return
+        for path in sorted(directory.glob("*.json")):
+            # Sidecar metadata of the binary columns is not a library
+            if not path.name.endswith(".columns.json"):
+                self.register(path.stem, path)
+
+    def names(self):
+        """Kayıtlı kütüphane adları"""
+        with self._lock:
+            return list(self._paths)
+
+    def path(self, name):
+        with self._lock:
+            if name not in self._paths:
+                raise ValueError(f"Bilinmeyen Pantone kütüphanesi: {name} (mevcut: {', '.join(self._paths)})")
+            return self._paths[name]
+
+    def resolve(self, spec=None):
+        """
+        Kütüphane seçimini ad demetine çevir
+
+        None → varsayılan; "coated+uncoated" / "coated,uncoated" / liste → birleşim
+        """
+        if spec is None or spec == "":
+            parts = [DEFAULT_LIBRARY]
+        elif isinstance(spec, str):
+            for sep in _UNION_SEPARATORS[1:]:
+                spec = spec.replace(sep, _UNION_SEPARATORS[0])
+            parts = spec.split(_UNION_SEPARATORS[0])
+        else:
+            parts = list(spec)
+
+        names = []
+        for part in parts:
+            part = part.strip()
+            if part and part not in names:
+                self.path(part)
+                names.append(part)
+        if not names:
+            raise ValueError(f"Geçersiz kütüphane seçimi: {spec!r}")
+        return tuple(names)
+
+    def columns(self, name):
+        """Tek bir kütüphanenin (names, codes, lab) sütunları (bir kez yüklenir)"""
+        with self._lock:
+            if name not in self._columns:
+                path = self.path(name)
+                try:
+                    self._columns[name] = load_columns(path)
+                except Exception:
+                    if name != DEFAULT_LIBRARY:
+                        raise
+                    # Create a dummy DB if missing for testing
+                    self._columns[name] = (["Black C", "White"], ["Black C", "White"],
+                                           np.array([[0.0, 0.0, 0.0], [100.0, 0.0, 0.0]]))
+            return self._columns[name]
+
+    def union_columns(self, spec=None):
+        """
+        Seçilen kütüphanelerin birleşimi; aynı ad birden fazla kütüphanede
+        varsa ilk kütüphanedeki kayıt kullanılır. Tek kütüphanede Lab kopyalanmaz.
+        """
+        names_sel = self.resolve(spec)
+        if len(names_sel) == 1:
+            return _with_white(*self.columns(names_sel[0]))
+
+        names, codes, labs = [], [], []
+        seen = set()
+        for library in names_sel:
+            lib_names, lib_codes, lib_lab = self.columns(library)
+            keep = [i for i, n in enumerate(lib_names) if n not in seen]
+            seen.update(lib_names[i] for i in keep)
+            names += [lib_names[i] for i in keep]
+            codes += [lib_codes[i] for i in keep]
+            labs.append(np.asarray(lib_lab)[keep])
+        return _with_white(names, codes, np.vstack(labs))
+
+    def matcher(self, spec=None):
+        """Seçim için önbelleğe alınmış PantoneMatcher / PantoneIndex"""
+        key = self.resolve(spec)
+        with self._lock:
+            matcher = self._matchers.get(key)
+            if matcher is None:
+                matcher = create_matcher(*self.union_columns(key))
+                self._matchers[key] = matcher
+            return matcher
+
+    def library_path(self, spec=None):
+        """Seçim tek bir kütüphaneyse dosya yolu (LUT için), birleşimse None"""
+        key = self.resolve(spec)
+        return self.path(key[0]) if len(key) == 1 else None
+
+
+_DEFAULT_CATALOG = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_catalog():
+    """Varsayılan, libraries/ dizini ve PANTONE_LIBRARIES kaydedilmiş katalog"""
+    global _DEFAULT_CATALOG
+    with _DEFAULT_LOCK:
+        if _DEFAULT_CATALOG is None:
+            catalog = PantoneCatalog()
+            catalog.register(DEFAULT_LIBRARY, DATABASE_PATH)
+            catalog.register_directory(LIBRARIES_DIR)
+            for entry in os.environ.get(LIBRARIES_ENV, "").split(os.pathsep):
+                if "=" in entry:
+                    name, path = entry.split("=", 1)
+                    catalog.register(name, path)
+            _DEFAULT_CATALOG = catalog
+        return _DEFAULT_CATALOG
+
+
+def main():
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Pantone kütüphane kataloğu")
+    parser.add_argument("command", choices=["list"], help="list: kayıtlı kütüphaneleri göster")
+    parser.parse_args()
+
+    catalog = default_catalog()
+    for name in catalog.names():
+        try:
+            count = len(catalog.columns(name)[0])
+        except Exception as e:
+            print(f"{name:<20} {catalog.path(name)}  (okunamadı: {e})", file=sys.stderr)
+            continue
+        print(f"{name:<20} {count:>6} swatch  {catalog.path(name)}")
+
+
+if __name__ == "__main__":
+    main()
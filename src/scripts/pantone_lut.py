@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RGB → Pantone Arama Tablosu (LUT)
+- 2^24 girişli uint16 tablo: her 24-bit RGB değeri için swatch indeksi
+- Veritabanı JSON'unun yanında, içerik özetiyle adlandırılmış .npy dosyası
+- Bellek eşlemeli (mmap) okunur, süreçler arasında paylaşılır
+- Veritabanı değişince yeni özetle otomatik yeniden oluşturulur
+- Girişler kaba kuvvet eşleştiriciyle birebir aynıdır: boş girişler ilk
+  kullanımda kesin eşleştiriciyle, warm ile önceden doldurulanlar kanıtlanabilir
+  aday kümesiyle hesaplanır; warm'ın kanıtlayamadığı hücreler boş kalır
+
+Kullanım: python pantone_lut.py warm [--db pantone_database.json]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from color_convert import pack_rgb, srgb_to_lab
+from pantone_matcher import PantoneIndex, delta_e_cie2000_matrix, search_radius
+from pantone_store import database_digest, make_readable
+
+
+LUT_SIZE = 1 << 24
+
+# Entry value for RGB colours that have not been matched yet
+UNSET = np.uint16(0xFFFF)
+
+# Warm-up matches a coarse RGB lattice with this spacing, then settles every
+# colour inside a lattice cell against all swatches that could be its match
+WARM_STEP = 4
+
+# Lab nearest neighbours re-ranked with CIEDE2000 to seed each lattice point
+WARM_SEEDS = 8
+
+# Cells whose candidate ball holds more swatches are left to the lazy path
+WARM_MAX_CANDIDATES = 32
+
+# Cells evaluated together during the refinement
+WARM_CELL_BATCH = 512
+
+
+# ============================================================================
+# ARAMA TABLOSU
+# ============================================================================
+
+def lut_path_for(db_path):
+    """Veritabanının yanındaki LUT dosyasının yolu"""
+    db_path = Path(db_path)
+    return db_path.with_name(f"{db_path.stem}.{database_digest(db_path)}.lut.npy")
+
+
+def _create_empty(path):
+    """UNSET ile dolu tabloyu atomik olarak oluştur, eski özetli dosyaları sil"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        table = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.uint16, shape=(LUT_SIZE,))
+        table[:] = UNSET
+        table.flush()
+        del table
+        make_readable(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    prefix = path.name.split(".")[0] + "."
+    for stale in path.parent.glob(prefix + "*.lut.npy"):
+        if stale != path:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+
+class RGBLookupTable:
+    """Bellek eşlemeli RGB → swatch indeks tablosu"""
+
+    def __init__(self, matcher, path, create=True):
+        if len(matcher) >= int(UNSET):
+            raise ValueError("LUT en fazla 65534 swatch destekler")
+
+        self.matcher = matcher
+        self.path = Path(path)
+
+        if not self.path.exists():
+            if not create:
+                raise FileNotFoundError(self.path)
+            _create_empty(self.path)
+
+        try:
+            self.table = np.load(self.path, mmap_mode="r+")
+            self.writable = True
+        except OSError:
+            self.table = np.load(self.path, mmap_mode="r")
+            self.writable = False
+
+        if self.table.shape != (LUT_SIZE,) or self.table.dtype != np.uint16:
+            raise ValueError(f"Geçersiz LUT dosyası: {self.path}")
+
+    @classmethod
+    def for_database(cls, db_path, matcher, create=True):
+        """Veritabanı dosyası için (gerekirse oluşturularak) tabloyu aç"""
+        return cls(matcher, lut_path_for(db_path), create=create)
+
+    def lookup(self, rgb):
+        """(N, 3) RGB için swatch indeksleri; eksik girişler hesaplanıp yazılır"""
+        rgb = np.atleast_2d(np.asarray(rgb, dtype=np.uint8))
+        packed = pack_rgb(rgb)
+        idx = self.table[packed].astype(np.intp)
+
+        missing = idx == int(UNSET)
+        if missing.any():
+            found, _ = self.matcher.nearest(srgb_to_lab(rgb[missing]))
+            idx[missing] = found
+            if self.writable:
+                self.table[packed[missing]] = found.astype(np.uint16)
+
+        return idx
+
+    def match(self, rgb):
+        """Her RGB için {"name", "code", "delta_e"} sözlüğü döndür"""
+        rgb = np.atleast_2d(np.asarray(rgb))
+        idx = self.lookup(rgb)
+        lab = srgb_to_lab(rgb)
+        de = delta_e_cie2000_matrix(lab, self.matcher.lab[idx][:, None, :])[:, 0]
+        return [self.matcher._entry(i, d) for i, d in zip(idx, de)]
+
+    def warm(self, progress=None):
+        """
+        Tablonun boş girişlerini kaba kuvvetle birebir aynı sonuçla doldur
+
+        Önce WARM_STEP aralıklı kaba RGB kafesi eşleştirilir. Her kafes
+        hücresindeki renklerin, hücrenin 8 köşesine düşen swatch'lara Delta E
+        2000'i ölçülür; en büyüğünden search_radius ile hücrenin tamamını
+        kapsayan bir Lab küresi çıkarılır. Hücrenin her rengi için en yakın
+        swatch bu kürededir; renkler küredeki tüm swatch'larla karşılaştırılır.
+        Küresinde WARM_MAX_CANDIDATES'ten fazla swatch olan hücreler boş
+        kalır ve lookup'ta kesin eşleştiriciyle doldurulur.
+        """
+        if not self.writable:
+            raise PermissionError(f"LUT yazılabilir değil: {self.path}")
+
+        step = WARM_STEP
+        axis = np.append(np.arange(0, 256, step), 255)
+        n_axis = len(axis)
+        n_cells = n_axis - 1
+
+        # 1. Kaba kafes; köşe swatch'ları yalnızca küre yarıçapını belirler, kesin olmaları gerekmez
+        index = PantoneIndex(self.matcher.names, self.matcher.codes, self.matcher.lab)
+        grid = srgb_to_lab(np.stack(np.meshgrid(axis, axis, axis, indexing="ij"), axis=-1).reshape(-1, 3))
+        _, seeds = index._tree.query(grid, k=min(WARM_SEEDS, len(self.matcher)))
+        seed_de = delta_e_cie2000_matrix(grid, self.matcher.lab[seeds])
+        lattice = np.take_along_axis(seeds, np.argmin(seed_de, axis=1)[:, None], axis=1)
+        lattice = lattice.reshape(n_axis, n_axis, n_axis)
+
+        # Offsets of the colours inside one cell and of the 8 cell corners
+        offsets = np.stack(np.meshgrid(*[np.arange(step)] * 3, indexing="ij"), axis=-1).reshape(-1, 3)
+        corners = np.stack(np.meshgrid(*[np.arange(2)] * 3, indexing="ij"), axis=-1).reshape(-1, 3)
+
+        gi, gb = np.meshgrid(np.arange(n_cells), np.arange(n_cells), indexing="ij")
+        gi, gb = gi.ravel(), gb.ravel()
+
+        # 2. Hücre içi kesin eşleştirme, her seferinde bir R dilimi
+        for ri in range(n_cells):
+            cells = np.column_stack((np.full_like(gi, ri), gi, gb))
+            cand = np.stack([lattice[cells[:, 0] + dr, cells[:, 1] + dg, cells[:, 2] + db]
+                             for dr, dg, db in corners], axis=1)
+
+            rgb = np.minimum(cells[:, None, :] * step + offsets[None, :, :], 255)
+            lab = srgb_to_lab(rgb)
+
+            # Ball around the cell holding every swatch that can win for one of its colours
+            corner_de = delta_e_cie2000_matrix(lab.reshape(-1, 3), self.matcher.lab[np.repeat(cand, len(offsets), axis=0)])
+            worst = corner_de.min(axis=1).reshape(len(cells), -1).max(axis=1)
+            centre = lab.mean(axis=1)
+            spread = np.linalg.norm(lab - centre[:, None, :], axis=2).max(axis=1)
+            radius = search_radius(worst, centre, index.max_chroma, slack=spread)
+            balls = index._tree.query_radius(centre, r=radius)
+
+            sizes = np.fromiter((len(ball) for ball in balls), dtype=np.intp, count=len(balls))
+            settled = np.nonzero(sizes <= WARM_MAX_CANDIDATES)[0]
+            for start in range(0, len(settled), WARM_CELL_BATCH):
+                batch = settled[start:start + WARM_CELL_BATCH]
+                width = int(sizes[batch].max())
+                # Pad with each cell's first swatch; ascending indices keep argmin's tie-break
+                ball = np.stack([np.pad(np.sort(balls[c]), (0, width - sizes[c]), mode="edge") for c in batch])
+                de = delta_e_cie2000_matrix(lab[batch].reshape(-1, 3),
+                                            self.matcher.lab[np.repeat(ball, len(offsets), axis=0)])
+                best = np.take_along_axis(np.repeat(ball, len(offsets), axis=0),
+                                          np.argmin(de, axis=1)[:, None], axis=1)[:, 0]
+
+                packed = pack_rgb(rgb[batch]).ravel()
+                unset = self.table[packed] == UNSET
+                self.table[packed[unset]] = best[unset].astype(np.uint16)
+
+            if progress:
+                progress(ri + 1, n_cells)
+
+        self.table.flush()
+
+    def coverage(self):
+        """Doldurulmuş giriş oranı"""
+        return float(np.count_nonzero(self.table != UNSET)) / LUT_SIZE
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    from pantone_catalog import DATABASE_PATH, PantoneCatalog, default_catalog
+
+    parser = argparse.ArgumentParser(description="RGB → Pantone arama tablosu")
+    parser.add_argument("command", choices=["warm", "status"], help="warm: tabloyu önceden doldur, status: doluluk oranı")
+    parser.add_argument("--db", default=str(DATABASE_PATH), help="Pantone veritabanı JSON dosyası")
+    args = parser.parse_args()
+
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"Dosya bulunamadı: {db_path}", file=sys.stderr)
+        sys.exit(1)
+
+    # Same matcher (swatch order, White fix-up) as analyses that use this library
+    catalog = default_catalog()
+    library = next((name for name in catalog.names() if catalog.path(name).resolve() == db_path.resolve()), None)
+    if library is None:
+        catalog, library = PantoneCatalog(), "db"
+        catalog.register(library, db_path)
+    matcher = catalog.matcher(library)
+
+    lut = RGBLookupTable.for_database(db_path, matcher)
+
+    if args.command == "status":
+        print(f"{lut.path}: %{lut.coverage() * 100:.2f} dolu")
+        return
+
+    start = time.perf_counter()
+
+    def progress(done, total):
+        print(f"\r{done / total * 100:6.2f}%", end="", file=sys.stderr, flush=True)
+
+    lut.warm(progress=progress)
+    print(file=sys.stderr)
+    print(f"{lut.path} hazır ({time.perf_counter() - start:.1f} sn, %{lut.coverage() * 100:.2f} dolu; "
+          f"kalan girişler ilk kullanımda doldurulur)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pantone Eşleştirici
+- Veritabanı bir kez (N, 3) float64 Lab matrisine yüklenir
+- CIEDE2000 tüm swatch'lara karşı tek NumPy geçişinde hesaplanır
+- Birden fazla sorgu rengi tek çağrıda eşleştirilir
+- Büyük kütüphaneler için KD-tree ön seçimi + kesin Delta E 2000 yeniden sıralama
+"""
+
+import hashlib
+import weakref
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+
+# Keep the (Q, N) working matrices around this many elements per chunk
+_CHUNK_ELEMENTS = 2_000_000
+
+# Databases at least this large get a PantoneIndex instead of a brute-force scan
+INDEX_MIN_SIZE = 5000
+
+# Lab nearest neighbours that set the CIEDE2000 search radius per query
+INDEX_CANDIDATES = 32
+
+
+# ============================================================================
+# DELTA E 2000 (VEKTÖREL)
+# ============================================================================
+
+def delta_e_cie2000_matrix(lab_queries, lab_matrix, Kl=1, Kc=1, Kh=1):
+    """
+    (Q, 3) sorgu ve (N, 3) referans Lab dizileri için (Q, N) Delta E 2000
+
+    colormath.color_diff_matrix.delta_e_cie2000 ile birebir aynı formül,
+    yalnızca sorgu ekseni boyunca yayınlanmış (broadcast) halde.
+    Referans (Q, M, 3) ise her sorgu kendi M adayıyla karşılaştırılır.
+    """
+    q = np.atleast_2d(np.asarray(lab_queries, dtype=np.float64))
+    m = np.asarray(lab_matrix, dtype=np.float64)
+
+    L1, a1, b1 = q[:, 0:1], q[:, 1:2], q[:, 2:3]
+    L2, a2, b2 = m[..., 0], m[..., 1], m[..., 2]
+
+    avg_Lp = (L1 + L2) / 2.0
+
+    C1 = np.sqrt(a1 ** 2 + b1 ** 2)
+    C2 = np.sqrt(a2 ** 2 + b2 ** 2)
+
+    avg_C1_C2 = (C1 + C2) / 2.0
+
+    G = 0.5 * (1 - np.sqrt(np.power(avg_C1_C2, 7.0) / (np.power(avg_C1_C2, 7.0) + np.power(25.0, 7.0))))
+
+    a1p = (1.0 + G) * a1
+    a2p = (1.0 + G) * a2
+
+    C1p = np.sqrt(np.power(a1p, 2) + np.power(b1, 2))
+    C2p = np.sqrt(np.power(a2p, 2) + np.power(b2, 2))
+
+    avg_C1p_C2p = (C1p + C2p) / 2.0
+
+    h1p = np.degrees(np.arctan2(b1, a1p))
+    h1p += (h1p < 0) * 360
+
+    h2p = np.degrees(np.arctan2(b2, a2p))
+    h2p += (h2p < 0) * 360
+
+    avg_Hp = (((np.fabs(h1p - h2p) > 180) * 360) + h1p + h2p) / 2.0
+
+    T = 1 - 0.17 * np.cos(np.radians(avg_Hp - 30)) + \
+        0.24 * np.cos(np.radians(2 * avg_Hp)) + \
+        0.32 * np.cos(np.radians(3 * avg_Hp + 6)) - \
+        0.2 * np.cos(np.radians(4 * avg_Hp - 63))
+
+    diff_h2p_h1p = h2p - h1p
+    delta_hp = diff_h2p_h1p + (np.fabs(diff_h2p_h1p) > 180) * 360
+    delta_hp -= (h2p > h1p) * 720
+
+    delta_Lp = L2 - L1
+    delta_Cp = C2p - C1p
+    delta_Hp = 2 * np.sqrt(C2p * C1p) * np.sin(np.radians(delta_hp) / 2.0)
+
+    S_L = 1 + ((0.015 * np.power(avg_Lp - 50, 2)) / np.sqrt(20 + np.power(avg_Lp - 50, 2.0)))
+    S_C = 1 + 0.045 * avg_C1p_C2p
+    S_H = 1 + 0.015 * avg_C1p_C2p * T
+
+    delta_ro = 30 * np.exp(-(np.power(((avg_Hp - 275) / 25), 2.0)))
+    R_C = np.sqrt((np.power(avg_C1p_C2p, 7.0)) / (np.power(avg_C1p_C2p, 7.0) + np.power(25.0, 7.0)))
+    R_T = -2 * R_C * np.sin(2 * np.radians(delta_ro))
+
+    return np.sqrt(
+        np.power(delta_Lp / (S_L * Kl), 2) +
+        np.power(delta_Cp / (S_C * Kc), 2) +
+        np.power(delta_Hp / (S_H * Kh), 2) +
+        R_T * (delta_Cp / (S_C * Kc)) * (delta_Hp / (S_H * Kh)))
+
+
+# ============================================================================
+# EŞLEŞTİRİCİ
+# ============================================================================
+
+class PantoneMatcher:
+    """Pantone veritabanı için toplu en yakın renk eşleştirici"""
+
+    def __init__(self, names, codes, lab):
+        self.names = list(names)
+        self.codes = list(codes)
+        self.lab = np.ascontiguousarray(lab, dtype=np.float64).reshape(-1, 3)
+        self._digest = None
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """name/code/L/a/b sütunlu DataFrame'den eşleştirici oluştur"""
+        lab = df[["L", "a", "b"]].to_numpy(dtype=np.float64)
+        return cls(df["name"].tolist(), df["code"].tolist(), lab)
+
+    def __len__(self):
+        return self.lab.shape[0]
+
+    def digest(self):
+        """Swatch içeriğinin (ad, kod, Lab) özeti; sonuç önbelleği anahtarında kullanılır"""
+        if self._digest is None:
+            h = hashlib.sha256()
+            h.update(self.lab.tobytes())
+            h.update("\x00".join(map(str, self.names + self.codes)).encode("utf-8"))
+            self._digest = h.hexdigest()[:16]
+        return self._digest
+
+    def delta_e(self, lab_queries):
+        """(Q, 3) Lab sorguları için tüm swatch'lara (Q, N) Delta E 2000"""
+        return delta_e_cie2000_matrix(lab_queries, self.lab)
+
+    def top_k(self, lab_queries, k=1):
+        """Her sorgu için en yakın k swatch indeksi ve Delta E değerleri (Q, k)"""
+        q = np.atleast_2d(np.asarray(lab_queries, dtype=np.float64))
+        k = min(k, len(self))
+        idx = np.empty((q.shape[0], k), dtype=np.intp)
+        dist = np.empty((q.shape[0], k), dtype=np.float64)
+
+        step = max(1, _CHUNK_ELEMENTS // max(len(self), 1))
+        for start in range(0, q.shape[0], step):
+            de = self.delta_e(q[start:start + step])
+            if k == 1:
+                best = np.argmin(de, axis=1)[:, None]
+            else:
+                best = np.argpartition(de, k - 1, axis=1)[:, :k]
+                order = np.argsort(np.take_along_axis(de, best, axis=1), axis=1, kind="stable")
+                best = np.take_along_axis(best, order, axis=1)
+            idx[start:start + step] = best
+            dist[start:start + step] = np.take_along_axis(de, best, axis=1)
+
+        return idx, dist
+
+    def nearest(self, lab_queries):
+        """Her sorgu için en yakın swatch indeksi ve Delta E değeri"""
+        idx, dist = self.top_k(lab_queries, k=1)
+        return idx[:, 0], dist[:, 0]
+
+    def _entry(self, i, d):
+        return {
+            "name": self.names[i],
+            "code": self.codes[i],
+            "delta_e": round(float(d), 2)
+        }
+
+    def match_top_k(self, lab_queries, k=3):
+        """Her sorgu için en yakın k eşleşmenin listesini döndür"""
+        idx, dist = self.top_k(lab_queries, k=k)
+        return [
+            [self._entry(i, d) for i, d in zip(row_idx, row_dist)]
+            for row_idx, row_dist in zip(idx, dist)
+        ]
+
+    def match(self, lab_queries):
+        """Her sorgu için {"name", "code", "delta_e"} sözlüğü döndür"""
+        idx, dist = self.nearest(lab_queries)
+        return [self._entry(i, d) for i, d in zip(idx, dist)]
+
+
+# ============================================================================
+# UZAMSAL İNDEKS
+# ============================================================================
+
+# Lab distances at which the CIEDE2000 lower bound is evaluated; Lab values
+# stay within ±500, so no two colours are farther apart than the last one
+_RADIUS_GRID = np.geomspace(1e-3, 1e3, 121)
+
+
+def delta_e_floor(lab_queries, distances, max_chroma=np.inf):
+    """
+    (Q, 3) sorgu ve (G,) ya da (Q, G) Lab mesafesi için (Q, G) alt sınır: sorgudan en
+    fazla D uzaklıktaki her renk için ΔE00 >= Lab mesafesi * sınır
+
+    CIEDE2000'in terimleri D içindeki en kötü duruma göre sınırlanır:
+    - S_L, |L̄ - 50| <= |L - 50| + D/2 ile
+    - G, ortalama kroma >= C - D/2 ile; C' <= (1 + G) C ve karşı rengin
+      kroması en fazla min(C + D, max_chroma), S_C buradan
+    - S_H <= S_C (T < 2) ve a'b' farkı Lab a, b farkından küçük değil
+    - R_T çapraz terimi: R_C ortalama kromadan, döndürme açısı ortalama tonun
+      275°'ye uzaklığından; ton farkı en fazla asin((1 + G) D / C)
+    Sınır D ile azalır.
+    """
+    q = np.atleast_2d(np.asarray(lab_queries, dtype=np.float64))
+    L, a, b = q[:, 0:1], q[:, 1:2], q[:, 2:3]
+    D = np.atleast_2d(np.asarray(distances, dtype=np.float64))
+    C = np.hypot(a, b)
+
+    dl = np.abs(L - 50) + D / 2
+    s_l = 1 + 0.015 * dl ** 2 / np.sqrt(20 + dl ** 2)
+
+    c7 = np.power(np.maximum(C - D / 2, 0), 7.0)
+    g = 0.5 * (1 - np.sqrt(c7 / (c7 + 25.0 ** 7)))
+    c_mean = (1 + g) * (C + np.minimum(C + D, max_chroma)) / 2
+    s_c = 1 + 0.045 * c_mean
+
+    # Hue of a' = (1 + G) a for every G up to g, widened by half the largest hue gap
+    h = np.degrees(np.arctan2(b, a))
+    span = (np.degrees(np.arctan2(b, (1 + g) * a)) - h + 180) % 360 - 180
+    reach = (1 + g) * D
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gap = np.where(reach < C, np.degrees(np.arcsin(np.minimum(reach / C, 1.0))), 360.0)
+    off = np.abs((h + span / 2 - 275 + 180) % 360 - 180) - np.abs(span) / 2 - gap / 2
+    d_ro = 30 * np.exp(-np.square(np.maximum(off, 0) / 25))
+
+    m7 = np.power(c_mean, 7.0)
+    r_c = np.sqrt(m7 / (m7 + 25.0 ** 7))
+    rotation = 1 - r_c * np.sin(np.radians(2 * d_ro))
+    return np.minimum(1 / s_l, np.sqrt(rotation) / s_c)
+
+
+def search_radius(delta_e, lab_queries, max_chroma=np.inf, slack=0.0):
+    """
+    Her sorgu için Delta E 2000'i delta_e'yi aşmayan tüm renkleri kapsayan
+    Lab (ΔE76) yarıçapı; max_chroma: aranan renklerin en büyük kroması
+
+    [D_j, D_j+1] aralığındaki her renk için ΔE00 >= D_j * delta_e_floor(D_j+1);
+    yarıçap, sınırın delta_e'yi aşmadığı son aralığın üst ucudur. Sınır
+    hiç tutmazsa yarıçap sonsuzdur (tam tarama).
+
+    slack: yarıçap, sorgudan en fazla slack uzaklıktaki her renk için geçerli
+    olacak şekilde büyütülür (bir renk hücresinin tamamı için tek küre). Böyle
+    bir rengin sınırı, sorgunun D + 2 slack mesafesindeki ve max_chroma + slack
+    kromasındaki sınırından küçük değildir.
+    """
+    delta_e = np.atleast_1d(np.asarray(delta_e, dtype=np.float64))
+    slack = np.broadcast_to(np.asarray(slack, dtype=np.float64), delta_e.shape)[:, None]
+    bound = _RADIUS_GRID[:-1] * delta_e_floor(lab_queries, _RADIUS_GRID[1:] + 2 * slack, max_chroma + slack)
+    # Headroom for rounding; ties at the bound must stay inside
+    fails = bound <= delta_e[:, None] * (1 + 1e-9) + 1e-12
+    last = np.where(fails.any(axis=1), fails.shape[1] - 1 - np.argmax(fails[:, ::-1], axis=1), -1)
+    radius = _RADIUS_GRID[np.minimum(last + 1, len(_RADIUS_GRID) - 1)]
+    return np.where(last == fails.shape[1] - 1, np.inf, radius + slack[:, 0])
+
+
+class PantoneIndex(PantoneMatcher):
+    """
+    Büyük swatch kütüphaneleri için KD-tree tabanlı, kaba kuvvetle birebir
+    aynı sonucu veren eşleştirici
+
+    Lab KD-tree'sinden en yakın `candidates` swatch Delta E 2000 ile
+    ölçülür; k'ıncı en iyi değerden search_radius ile bir Lab yarıçapı
+    çıkarılır ve o küredeki tüm swatch'lar yeniden sıralanır. Küre dışındaki
+    hiçbir swatch daha yakın olamaz. Eşit Delta E'de düşük indeks kazanır
+    (kaba kuvvetteki argmin gibi).
+    """
+
+    def __init__(self, names, codes, lab, candidates=INDEX_CANDIDATES, leaf_size=40):
+        super().__init__(names, codes, lab)
+        self.candidates = max(1, min(candidates, len(self)))
+        self._tree = KDTree(self.lab, leaf_size=leaf_size)
+        self.max_chroma = float(np.hypot(self.lab[:, 1], self.lab[:, 2]).max(initial=0.0))
+
+    @classmethod
+    def from_dataframe(cls, df, candidates=INDEX_CANDIDATES):
+        """name/code/L/a/b sütunlu DataFrame'den indeks oluştur"""
+        lab = df[["L", "a", "b"]].to_numpy(dtype=np.float64)
+        return cls(df["name"].tolist(), df["code"].tolist(), lab, candidates=candidates)
+
+    def top_k(self, lab_queries, k=1):
+        """Her sorgu için en yakın k swatch indeksi ve Delta E değerleri (Q, k)"""
+        q = np.atleast_2d(np.asarray(lab_queries, dtype=np.float64))
+        k = min(k, len(self))
+        idx = np.empty((q.shape[0], k), dtype=np.intp)
+        dist = np.empty((q.shape[0], k), dtype=np.float64)
+
+        # A radius can cover the whole library, so chunk like the brute-force scan
+        step = max(1, _CHUNK_ELEMENTS // max(len(self), 1))
+        for start in range(0, q.shape[0], step):
+            idx[start:start + step], dist[start:start + step] = self._top_k_chunk(q[start:start + step], k)
+        return idx, dist
+
+    def _top_k_chunk(self, q, k):
+        n_candidates = min(max(self.candidates, k), len(self))
+        _, cand = self._tree.query(q, k=n_candidates)
+        de = delta_e_cie2000_matrix(q, self.lab[cand])
+        bound = np.partition(de, k - 1, axis=1)[:, k - 1]
+
+        # Every swatch at least as close as the k-th candidate lies in the ball
+        neighbours = self._tree.query_radius(q, r=search_radius(bound, q, self.max_chroma))
+        lengths = np.fromiter((len(n) for n in neighbours), dtype=np.intp, count=len(neighbours))
+        flat = np.concatenate(neighbours)
+        owner = np.repeat(np.arange(q.shape[0]), lengths)
+        flat_de = delta_e_cie2000_matrix(q[owner], self.lab[flat][:, None, :])[:, 0]
+
+        order = np.lexsort((flat, flat_de, owner))
+        take = (np.cumsum(lengths) - lengths)[:, None] + np.arange(k)
+        best = order[take]
+        return flat[best], flat_de[best]
+
+
+def create_matcher(names, codes, lab):
+    """Kütüphane boyutuna göre PantoneMatcher ya da PantoneIndex oluştur"""
+    if len(lab) >= INDEX_MIN_SIZE:
+        return PantoneIndex(names, codes, lab)
+    return PantoneMatcher(names, codes, lab)
+
+
+# One matcher per DataFrame object, dropped when the DataFrame is collected
+_MATCHERS = {}
+
+
+def get_matcher(pantone_df):
+    """
+    DataFrame için önbelleğe alınmış eşleştiriciyi döndür
+
+    Hazır bir PantoneMatcher/PantoneIndex verilirse olduğu gibi kullanılır.
+    """
+    if isinstance(pantone_df, PantoneMatcher):
+        return pantone_df
+
+    key = id(pantone_df)
+    entry = _MATCHERS.get(key)
+    if entry is not None:
+        ref, matcher = entry
+        if ref() is pantone_df:
+            return matcher
+
+    matcher = create_matcher(pantone_df["name"].tolist(), pantone_df["code"].tolist(),
+                             pantone_df[["L", "a", "b"]].to_numpy(dtype=np.float64))
+    _MATCHERS[key] = (weakref.ref(pantone_df, lambda _, k=key: _MATCHERS.pop(k, None)), matcher)
+    return matcher
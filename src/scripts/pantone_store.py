@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+İkili Pantone Veritabanı (Sütun Dosyaları)
+- pantone_database.json'un yanında sütun başına bir .npy dosyası:
+  <ad>.names.npy, <ad>.codes.npy (UTF-8 bayt), <ad>.lab.npy (N, 3) float64
+- Lab matrisi bellek eşlemeli (mmap) açılır, kopyalanmaz
+- <ad>.columns.json kaynak JSON'un özetini tutar; JSON değişince sütunlar
+  JSON'dan yeniden üretilir. JSON yoksa sütunlar tek başına kullanılır.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+
+COLUMNS = ("names", "codes", "lab")
+
+
+def database_digest(db_path):
+    """Veritabanı dosyasının içerik özeti (LUT dosya adında kullanılır)"""
+    h = hashlib.sha256()
+    with open(db_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def column_paths(db_path):
+    """Sütun dosyalarının ve meta dosyasının yolları"""
+    db_path = Path(db_path)
+    paths = {name: db_path.with_name(f"{db_path.stem}.{name}.npy") for name in COLUMNS}
+    paths["meta"] = db_path.with_name(f"{db_path.stem}.columns.json")
+    return paths
+
+
+def _encode(strings):
+    return np.array([s.encode("utf-8") for s in strings], dtype=np.bytes_)
+
+
+def _decode(array):
+    return [s.decode("utf-8") for s in array.tolist()]
+
+
+def records_to_columns(records):
+    """[{"name", "code", "L", "a", "b"}, ...] listesini (names, codes, lab) olarak döndür"""
+    names = [str(r["name"]) for r in records]
+    codes = [str(r["code"]) for r in records]
+    lab = np.array([(r["L"], r["a"], r["b"]) for r in records], dtype=np.float64).reshape(-1, 3)
+    return names, codes, lab
+
+
+def make_readable(path):
+    """
+    mkstemp dosyası 0600 açar; süreçler ve kullanıcılar arasında paylaşılan
+    dosyalar umask'e göre 0644 yapılır
+    """
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(path, 0o644 & ~umask)
+
+
+def _save_atomic(path, array):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        with open(tmp, "wb") as f:
+            np.save(f, array, allow_pickle=False)
+        make_readable(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def write_columns(records, db_path, digest=None):
+    """
+    Kayıtları db_path'in yanına sütun dosyaları olarak yaz
+
+    digest: kaynak JSON'un özeti (verilmezse db_path'ten hesaplanır).
+    Meta dosyası en son yazılır; yarım kalan yazım eski sütunlarla karışmaz.
+    """
+    paths = column_paths(db_path)
+    if digest is None:
+        digest = database_digest(db_path)
+
+    names, codes, lab = records_to_columns(records)
+    _save_atomic(paths["names"], _encode(names))
+    _save_atomic(paths["codes"], _encode(codes))
+    _save_atomic(paths["lab"], lab)
+
+    meta = json.dumps({"source_digest": digest, "count": len(records)})
+    fd, tmp = tempfile.mkstemp(dir=paths["meta"].parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(meta)
+        make_readable(tmp)
+        os.replace(tmp, paths["meta"])
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    return paths
+
+
+def _columns_current(paths, db_path):
+    try:
+        with open(paths["meta"], "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if not all(paths[name].exists() for name in COLUMNS):
+        return False
+
+    # Without the JSON source the columns are the database
+    if not Path(db_path).exists():
+        return True
+    return meta.get("source_digest") == database_digest(db_path)
+
+
+def load_columns(db_path):
+    """
+    (names, codes, lab) döndür; names/codes str listesi, lab (N, 3)
+    float64 salt okunur mmap
+
+    Sütunlar yoksa ya da JSON'dan eskiyse JSON okunur ve sütunlar
+    (yazılabiliyorsa) bir sonraki açılış için yeniden üretilir.
+    """
+    paths = column_paths(db_path)
+
+    if _columns_current(paths, db_path):
+        names = _decode(np.load(paths["names"], allow_pickle=False))
+        codes = _decode(np.load(paths["codes"], allow_pickle=False))
+        lab = np.load(paths["lab"], mmap_mode="r", allow_pickle=False)
+        if lab.ndim == 2 and lab.shape[1] == 3 and len(names) == len(codes) == len(lab):
+            return names, codes, lab
+
+    with open(db_path, "r") as f:
+        records = json.load(f)
+
+    try:
+        write_columns(records, db_path)
+    except OSError:
+        pass
+
+    return records_to_columns(records)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Aşama Bazlı Ölçüm (--profile)
+- Her aşama için duvar saati, CPU süresi ve tepe ayrılan bellek (tracemalloc)
+- Sayaçlar: piksel, benzersiz renk, örnek, KMeans fit sayısı, ...
+- Sonuç JSON'una "timings" bloğu; isteğe bağlı olarak metrik hattı için
+  "color_analysis.profile" logger'ına tek satır JSON kayıt
+- Kapalıyken NULL_PROFILER kullanılır: aşama başına yalnızca boş bir bağlam
+- StageHooks: aşama girişlerinde ilerleme bildirimi ve iptal kontrolü (iş
+  kuyruğu); KMeans aşamasında iptale fitler arasında da bakılır
+
+Not: tracemalloc süreç geneli çalışır; aynı süreçte eşzamanlı analizlerde
+(sunucu) bellek tepeleri birbirine karışabilir, süreler etkilenmez.
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+LOGGER_NAME = "color_analysis.profile"
+
+PROFILE_LOG_ENV = "COLOR_ANALYSIS_PROFILE_LOG"
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# tracemalloc is shared by every profiler in the process; the last one out stops it
+_TRACE_LOCK = threading.Lock()
+_TRACE_USERS = 0
+_TRACE_OWNED = False
+
+
+def _trace_start():
+    global _TRACE_USERS, _TRACE_OWNED
+    with _TRACE_LOCK:
+        if _TRACE_USERS == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _TRACE_OWNED = True
+        _TRACE_USERS += 1
+
+
+def _trace_stop():
+    global _TRACE_USERS, _TRACE_OWNED
+    with _TRACE_LOCK:
+        _TRACE_USERS -= 1
+        if _TRACE_USERS == 0 and _TRACE_OWNED:
+            tracemalloc.stop()
+            _TRACE_OWNED = False
+
+
+class StageProfiler:
+    """Aşama süreleri, bellek tepeleri ve sayaçlar"""
+
+    enabled = True
+
+    def __init__(self, trace_memory=True):
+        self.stages = {}
+        self.counts = {}
+        self.trace_memory = trace_memory
+        self._started = False
+        self._finished = False
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            if self.trace_memory:
+                _trace_start()
+            self._wall0 = time.perf_counter()
+            self._cpu0 = time.process_time()
+        return self
+
+    @contextmanager
+    def stage(self, name):
+        """Bir aşamayı ölç; aynı ad tekrar ölçülürse değerler toplanır"""
+        self.start()
+        if self.trace_memory:
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wall0 = time.perf_counter()
+        cpu0 = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall0
+            cpu = time.process_time() - cpu0
+            entry = self.stages.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0})
+            entry["wall_s"] += wall
+            entry["cpu_s"] += cpu
+            if self.trace_memory:
+                peak = max(0, tracemalloc.get_traced_memory()[1] - current)
+                entry["peak_alloc_mb"] = max(entry.get("peak_alloc_mb", 0.0), peak / (1024 * 1024))
+
+    def count(self, name, value):
+        self.counts[name] = value
+
+    def check(self, name):
+        pass
+
+    def finish(self):
+        """Toplam süreleri kaydet ve tracemalloc kullanımını bırak"""
+        if self._started and not self._finished:
+            self._finished = True
+            self._wall = time.perf_counter() - self._wall0
+            self._cpu = time.process_time() - self._cpu0
+            if self.trace_memory:
+                _trace_stop()
+        return self
+
+    def report(self):
+        """Sonuca eklenecek "timings" bloğu"""
+        self.finish()
+        stages = {}
+        for name, entry in self.stages.items():
+            stages[name] = {key: round(value, 6 if key.endswith("_s") else 3) for key, value in entry.items()}
+        report = {"stages": stages, "counts": dict(self.counts)}
+        if self._started:
+            report["total"] = {"wall_s": round(self._wall, 6), "cpu_s": round(self._cpu, 6)}
+        return report
+
+    def emit(self, **fields):
+        """Raporu profile logger'ına tek satır JSON olarak yaz (handler varsa)"""
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({"event": "analysis_profile", **fields, **self.report()},
+                                   ensure_ascii=False, default=str))
+
+
+class _NullProfiler:
+    """Ölçüm kapalıyken kullanılan, hiçbir şey yapmayan profiler"""
+
+    enabled = False
+
+    def start(self):
+        return self
+
+    def stage(self, name):
+        return nullcontext()
+
+    def count(self, name, value):
+        pass
+
+    def check(self, name):
+        pass
+
+    def finish(self):
+        return self
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+class StageCancelled(BaseException):
+    """
+    İş aşama sınırında iptal edildi
+
+    BaseException'dan türer: analiz içindeki "except Exception" blokları iptali
+    hata sanıp yutmaz (asyncio.CancelledError ile aynı gerekçe).
+    """
+
+
+class StageHooks:
+    """
+    Her aşama girişinde ilerleme bildiren ve iptali kontrol eden profiler sarmalı
+
+    on_stage(ad): aşama başlarken çağrılır
+    should_cancel(): True dönerse aşama başlamadan StageCancelled yükseltilir;
+        aşama içinde yalnızca check() çağrılan yerlerde (KMeans fitleri arası)
+        bakılır, diğer aşamalar sonuna kadar çalışır
+    profiler: asıl ölçümler (StageProfiler ya da NULL_PROFILER) buna iletilir
+    """
+
+    def __init__(self, on_stage=None, should_cancel=None, profiler=NULL_PROFILER):
+        self.on_stage = on_stage
+        self.should_cancel = should_cancel
+        self.profiler = profiler
+
+    @property
+    def enabled(self):
+        return self.profiler.enabled
+
+    def start(self):
+        self.profiler.start()
+        return self
+
+    def check(self, name):
+        """İptal istendiyse StageCancelled yükselt (uzun aşamaların içinden)"""
+        if self.should_cancel is not None and self.should_cancel():
+            raise StageCancelled(name)
+
+    @contextmanager
+    def stage(self, name):
+        self.check(name)
+        if self.on_stage is not None:
+            self.on_stage(name)
+        with self.profiler.stage(name):
+            yield
+
+    def count(self, name, value):
+        self.profiler.count(name, value)
+
+    def finish(self):
+        self.profiler.finish()
+        return self
+
+    def report(self):
+        return self.profiler.report()
+
+    def emit(self, **fields):
+        self.profiler.emit(**fields)
+
+
+_LOG_HANDLERS = {}
+
+
+def configure_profile_log(target):
+    """
+    Profile kayıtlarını hedefe yönlendir ("-" → stderr, aksi halde dosyaya ekle)
+
+    Aynı hedef için handler bir kez kurulur.
+    """
+    if not target or target in _LOG_HANDLERS:
+        return
+    handler = logging.StreamHandler(sys.stderr) if target == "-" else logging.FileHandler(target, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    _LOG_HANDLERS[target] = handler
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+İçerik Adresli Analiz Sonuç Önbelleği
+- Anahtar: resim baytları + analiz sürümü + k aralığı + yoksayma
+  bayrakları + motor + Pantone veritabanı özeti
+- Değer: ölçekten bağımsız kümeleme sonucu (merkezler, paylar, Pantone)
+- Alan ve boya miktarı her seferinde yeniden hesaplanır (ucuz)
+- Diskte, toplam boyutla sınırlı LRU (en eski erişilen dosya silinir);
+  toplam boyut süreç içinde tutulur, dizin yalnızca ilk yazmada ve sınır
+  aşıldığında taranır (diğer süreçlerin yazdıkları o taramada sayılır)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from pantone_store import make_readable
+
+
+# Bump when the cached summary format changes; changes to the analysis
+# itself are keyed by the caller's analysis version (see cache_key)
+CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CACHE_DIR_ENV = "COLOR_ANALYSIS_CACHE"
+
+# Eviction frees down to this share of max_bytes, so a full cache is
+# rescanned once per ~10% of the budget written, not on every put
+EVICT_TARGET = 0.9
+
+
+def file_digest(path):
+    """Dosya içeriğinin SHA-256 özeti"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(image_digest, analysis_version, **params):
+    """
+    Resim özeti, analiz sürümü ve analiz parametrelerinden önbellek anahtarı
+
+    analysis_version: aynı girdinin sonucunu değiştiren her değişiklikte
+    artırılan sürüm (color_analysis.ANALYSIS_VERSION); eski kayıtlar
+    böylece okunmaz ve LRU ile silinir.
+    """
+    payload = json.dumps({"version": CACHE_VERSION, "analysis": analysis_version, "image": image_digest, **params},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Anahtar başına bir JSON dosyası; erişim zamanı (mtime) LRU sırasıdır"""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = int(max_bytes)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Running total of the directory size; None until the first scan
+        self._size = None
+
+    def _path(self, key):
+        return self.directory / f"{key}.json"
+
+    def get(self, key):
+        """Kayıtlı sonucu döndür (yoksa ya da okunamıyorsa None)"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Truncated or foreign file: drop it and recompute
+            self._discard(path)
+            return None
+
+        # Mark as most recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value, encoder=None):
+        """Sonucu atomik olarak yaz; tutulan toplam sınırı aşarsa eski kayıtları sil"""
+        if self._size is None:
+            self.evict()
+
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False, cls=encoder)
+                written = f.tell()
+            # mkstemp creates 0600; the cache is shared by the server and CLI users
+            make_readable(tmp)
+            try:
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        self._size += written - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """
+        Dizini tara; toplam boyut max_bytes'ı aşıyorsa en uzun süredir
+        erişilmeyenleri max_bytes * EVICT_TARGET'e inene kadar sil ve
+        tutulan toplamı güncelle
+        """
+        entries = []
+        total = 0
+        for path in self.directory.glob("*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        if total > self.max_bytes:
+            target = self.max_bytes * EVICT_TARGET
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                self._discard(path)
+                total -= size
+        self._size = total
+
+    @staticmethod
+    def _discard(path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
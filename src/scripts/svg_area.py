@@ -0,0 +1,885 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SVG Vektör Alan Hesabı
+- Dolgu geometrisi doğrudan SVG'den okunur: path, rect, circle, ellipse,
+  polygon, polyline, use; g/svg grupları, transform ve stil kalıtımı
+- Bezier eğrileri ve yaylar tolerans içinde doğru parçalarına bölünür
+- Üst üste binen şekiller ressam algoritmasıyla çözülür: hiçbir kenarın
+  kesişmediği yatay şeritlerde her x aralığı en üstteki şeklin rengine
+  yazılır; şerit içindeki her parça bir yamuk olduğundan alan kesindir
+- Piksel sayımı yok; süre kenar sayısına bağlıdır, tuval boyutuna değil
+
+Desteklenmeyenler: stroke (yalnızca dolgu alanı), CSS <style> sayfaları,
+mask/clipPath/filter, metin. Gradyan dolgular durak renklerinin ortalaması
+sayılır; toplam opaklığı 0.5'in altındaki dolgular boyanmamış sayılır
+(raster moddaki alpha >= 128 kuralı).
+"""
+
+import gzip
+import math
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+from PIL import ImageColor
+
+from color_convert import pack_rgb
+
+
+SVG_SUFFIXES = (".svg", ".svgz")
+
+# Curve flattening tolerance as a fraction of the canvas' longer side
+FLATTEN_TOLERANCE = 1e-4
+
+MAX_CURVE_SEGMENTS = 1024
+
+# SVG user units are CSS pixels unless the root maps them to physical units
+CSS_DPI = 96.0
+
+_UNIT_PX = {"": 1.0, "px": 1.0, "pt": 96 / 72, "pc": 16.0, "mm": 96 / 25.4, "cm": 96 / 2.54, "in": 96.0}
+
+# Nested <use> references deeper than this are treated as cycles
+MAX_USE_DEPTH = 16
+
+# Rounds of splitting slabs at edge crossings before giving up
+MAX_SPLIT_ROUNDS = 64
+
+# (slab, edge) pairs swept at once; bounds the sweep's memory
+SWEEP_CHUNK = 1 << 21
+
+# Crossings multiply slabs; refuse drawings needing more pairs than this
+MAX_SWEEP_ENTRIES = 1 << 24
+
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_LENGTH = re.compile(r"\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([a-z%]*)\s*$")
+_TRANSFORM = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+
+_PATH_COMMANDS = frozenset("MmZzLlHhVvCcSsQqTtAa")
+_PATH_ARGC = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7}
+
+_INHERITED = ("fill", "fill-rule", "fill-opacity", "color", "visibility")
+
+_CONTAINERS = frozenset(("svg", "g", "a", "switch"))
+_SHAPES = frozenset(("path", "rect", "circle", "ellipse", "polygon", "polyline"))
+
+_IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+class SVGError(ValueError):
+    """SVG okunamadı ya da ölçülebilir dolgu içermiyor"""
+
+
+def is_svg(path):
+    return Path(path).suffix.lower() in SVG_SUFFIXES
+
+
+# ============================================================================
+# ÖZNİTELİKLER
+# ============================================================================
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _length(text, reference=None, default=0.0):
+    """SVG uzunluğu (px); yüzde reference'a göre"""
+    if text is None:
+        return default
+    m = _LENGTH.match(text)
+    if not m:
+        return default
+    value, unit = float(m.group(1)), m.group(2)
+    if unit == "%":
+        return value / 100 * reference if reference is not None else default
+    return value * _UNIT_PX.get(unit, 1.0)
+
+
+def _float(text, default):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return default
+
+
+def _properties(elem):
+    """Sunum öznitelikleri + style (style önceliklidir)"""
+    props = {}
+    for name in ("fill", "fill-rule", "fill-opacity", "opacity", "color", "visibility", "display"):
+        value = elem.get(name)
+        if value is not None:
+            props[name] = value.strip()
+    for decl in (elem.get("style") or "").split(";"):
+        if ":" in decl:
+            name, value = decl.split(":", 1)
+            props[name.strip()] = value.replace("!important", "").strip()
+    return props
+
+
+def _opacity(text):
+    text = (text or "1").strip()
+    value = _float(text[:-1], 100.0) / 100 if text.endswith("%") else _float(text, 1.0)
+    return min(1.0, max(0.0, value))
+
+
+def _paint(value, context, ids):
+    """Dolgu değerini (r, g, b, a) olarak çöz; boyasızsa None"""
+    value = (value or "black").strip()
+    if value == "none" or value == "transparent":
+        return None
+    if value == "currentColor":
+        value = context.get("color", "black")
+
+    if value.startswith("url("):
+        ref = value[4:value.find(")")].strip().strip("'\"").lstrip("#")
+        stops = [_stop_color(stop) for stop in _gradient_stops(ids.get(ref), ids)]
+        stops = [s for s in stops if s is not None]
+        if not stops:
+            # Fallback colour after the reference, e.g. url(#g) red
+            fallback = value[value.find(")") + 1:].strip()
+            return _paint(fallback, context, ids) if fallback else None
+        return tuple(int(round(c)) for c in np.mean(stops, axis=0))
+
+    try:
+        rgba = ImageColor.getrgb(value)
+    except ValueError:
+        return None
+    return rgba if len(rgba) == 4 else rgba + (255,)
+
+
+def _gradient_stops(gradient, ids, depth=0):
+    if gradient is None or depth > MAX_USE_DEPTH:
+        return []
+    stops = [child for child in gradient if _local(child.tag) == "stop"]
+    if stops:
+        return stops
+    # Gradients may inherit their stops through href
+    href = gradient.get("href") or gradient.get("{http://www.w3.org/1999/xlink}href") or ""
+    return _gradient_stops(ids.get(href.lstrip("#")), ids, depth + 1)
+
+
+def _stop_color(stop):
+    props = _properties(stop)
+    color = stop.get("stop-color", props.get("stop-color", "black"))
+    try:
+        rgba = ImageColor.getrgb(color)
+    except ValueError:
+        return None
+    alpha = (rgba[3] if len(rgba) == 4 else 255) * _opacity(stop.get("stop-opacity", props.get("stop-opacity")))
+    return rgba[:3] + (alpha,)
+
+
+# ============================================================================
+# DÖNÜŞÜMLER
+# ============================================================================
+
+def _compose(m, n):
+    """Önce n, sonra m uygulayan matris"""
+    a, b, c, d, e, f = m
+    A, B, C, D, E, F = n
+    return (a * A + c * B, b * A + d * B, a * C + c * D, b * C + d * D, a * E + c * F + e, b * E + d * F + f)
+
+
+def _translate(x, y):
+    return (1.0, 0.0, 0.0, 1.0, x, y)
+
+
+def parse_transform(text):
+    """transform özniteliğini (a, b, c, d, e, f) matrisine çevir"""
+    m = _IDENTITY
+    for name, args in _TRANSFORM.findall(text or ""):
+        v = [float(x) for x in _NUMBER.findall(args)]
+        if name == "matrix" and len(v) == 6:
+            t = tuple(v)
+        elif name == "translate" and v:
+            t = _translate(v[0], v[1] if len(v) > 1 else 0.0)
+        elif name == "scale" and v:
+            t = (v[0], 0.0, 0.0, v[1] if len(v) > 1 else v[0], 0.0, 0.0)
+        elif name == "rotate" and v:
+            r = math.radians(v[0])
+            t = (math.cos(r), math.sin(r), -math.sin(r), math.cos(r), 0.0, 0.0)
+            if len(v) >= 3:
+                t = _compose(_compose(_translate(v[1], v[2]), t), _translate(-v[1], -v[2]))
+        elif name == "skewX" and v:
+            t = (1.0, 0.0, math.tan(math.radians(v[0])), 1.0, 0.0, 0.0)
+        elif name == "skewY" and v:
+            t = (1.0, math.tan(math.radians(v[0])), 0.0, 1.0, 0.0, 0.0)
+        else:
+            raise SVGError(f"Geçersiz transform: {name}({args})")
+        m = _compose(m, t)
+    return m
+
+
+def _apply(m, points):
+    a, b, c, d, e, f = m
+    x, y = points[:, 0], points[:, 1]
+    return np.column_stack((a * x + c * y + e, b * x + d * y + f))
+
+
+def _scale(m):
+    """Matrisin ortalama uzunluk ölçeği (düzleştirme toleransı için)"""
+    return math.sqrt(abs(m[0] * m[3] - m[1] * m[2])) or 1.0
+
+
+# ============================================================================
+# EĞRİ DÜZLEŞTİRME
+# ============================================================================
+
+def _segments(second_difference, factor, tolerance):
+    """Wang formülü: kiriş hatası tolerance altında kalan parça sayısı"""
+    if second_difference <= 0:
+        return 1
+    return max(1, min(MAX_CURVE_SEGMENTS, math.ceil(math.sqrt(factor * second_difference / tolerance))))
+
+
+def _quadratic(p0, p1, p2, tolerance):
+    n = _segments(math.hypot(p0[0] - 2 * p1[0] + p2[0], p0[1] - 2 * p1[1] + p2[1]), 0.25, tolerance)
+    t = np.arange(1, n + 1)[:, None] / n
+    s = 1 - t
+    return s * s * np.asarray(p0) + 2 * s * t * np.asarray(p1) + t * t * np.asarray(p2)
+
+
+def _cubic(p0, p1, p2, p3, tolerance):
+    m = max(math.hypot(p0[0] - 2 * p1[0] + p2[0], p0[1] - 2 * p1[1] + p2[1]),
+            math.hypot(p1[0] - 2 * p2[0] + p3[0], p1[1] - 2 * p2[1] + p3[1]))
+    n = _segments(m, 0.75, tolerance)
+    t = np.arange(1, n + 1)[:, None] / n
+    s = 1 - t
+    return (s ** 3 * np.asarray(p0) + 3 * s * s * t * np.asarray(p1)
+            + 3 * s * t * t * np.asarray(p2) + t ** 3 * np.asarray(p3))
+
+
+def _arc(p0, rx, ry, rotation, large, sweep, p1, tolerance):
+    """SVG yayı (uç nokta parametreleri, SVG 1.1 F.6.5) → noktalar"""
+    if p0 == p1:
+        return np.empty((0, 2))
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0:
+        return np.array([p1], dtype=float)
+
+    phi = math.radians(rotation)
+    cos, sin = math.cos(phi), math.sin(phi)
+    dx, dy = (p0[0] - p1[0]) / 2, (p0[1] - p1[1]) / 2
+    x1 = cos * dx + sin * dy
+    y1 = -sin * dx + cos * dy
+
+    # Radii too small for the endpoints are scaled up
+    lam = (x1 / rx) ** 2 + (y1 / ry) ** 2
+    if lam > 1:
+        rx, ry = rx * math.sqrt(lam), ry * math.sqrt(lam)
+
+    num = (rx * ry) ** 2 - (rx * y1) ** 2 - (ry * x1) ** 2
+    den = (rx * y1) ** 2 + (ry * x1) ** 2
+    coef = math.sqrt(max(0.0, num / den)) if den else 0.0
+    if bool(large) == bool(sweep):
+        coef = -coef
+    cx1 = coef * rx * y1 / ry
+    cy1 = -coef * ry * x1 / rx
+    cx = cos * cx1 - sin * cy1 + (p0[0] + p1[0]) / 2
+    cy = sin * cx1 + cos * cy1 + (p0[1] + p1[1]) / 2
+
+    theta1 = math.atan2((y1 - cy1) / ry, (x1 - cx1) / rx)
+    theta2 = math.atan2((-y1 - cy1) / ry, (-x1 - cx1) / rx)
+    delta = theta2 - theta1
+    if sweep and delta < 0:
+        delta += 2 * math.pi
+    elif not sweep and delta > 0:
+        delta -= 2 * math.pi
+
+    r = max(rx, ry)
+    step = 2 * math.acos(1 - tolerance / r) if tolerance < r else math.pi / 2
+    n = max(1, min(MAX_CURVE_SEGMENTS, math.ceil(abs(delta) / step)))
+    theta = theta1 + delta * np.arange(1, n + 1) / n
+    x, y = rx * np.cos(theta), ry * np.sin(theta)
+    points = np.column_stack((cos * x - sin * y + cx, sin * x + cos * y + cy))
+    points[-1] = p1
+    return points
+
+
+# ============================================================================
+# PATH
+# ============================================================================
+
+def _tokenize_path(d):
+    """Komut harfleri ve sayılar; yay bayrakları ayraçsız ("011") yazılabilir"""
+    tokens = []
+    i, n = 0, len(d)
+    command, argi = None, 0
+    while i < n:
+        ch = d[i]
+        if ch in _PATH_COMMANDS:
+            tokens.append(ch)
+            command, argi = ch.upper(), 0
+            i += 1
+        elif ch.isspace() or ch == ",":
+            i += 1
+        elif command == "A" and argi % 7 in (3, 4) and ch in "01":
+            tokens.append(float(ch))
+            argi += 1
+            i += 1
+        else:
+            m = _NUMBER.match(d, i)
+            if not m:
+                raise SVGError(f"Geçersiz path verisi: {d[i:i + 20]!r}")
+            tokens.append(float(m.group()))
+            argi += 1
+            i = m.end()
+    return tokens
+
+
+def path_rings(d, tolerance):
+    """
+    Path verisini kapalı halkalar (alt yollar) listesine çevir
+
+    Dolgu için her alt yol kapalı sayılır (SVG kuralı).
+    """
+    tokens = _tokenize_path(d or "")
+    rings = []
+    ring = []
+    current = start = (0.0, 0.0)
+    last_cubic = last_quad = None
+    command = None
+    i = 0
+
+    def flush():
+        if len(ring) >= 3:
+            rings.append(np.array(ring, dtype=float))
+
+    while i < len(tokens):
+        token = tokens[i]
+        if isinstance(token, str):
+            command = token
+            i += 1
+            if command in "Zz":
+                flush()
+                ring = []
+                current = start
+                last_cubic = last_quad = None
+                continue
+        elif command is None or command in "Zz":
+            raise SVGError("Path verisi bir komutla başlamalı")
+
+        op, relative = command.upper(), command.islower()
+        argc = _PATH_ARGC[op]
+        args = tokens[i:i + argc]
+        if len(args) < argc or any(isinstance(a, str) for a in args):
+            raise SVGError(f"Eksik path argümanı: {command}")
+        i += argc
+
+        ox, oy = current if relative else (0.0, 0.0)
+        if op == "M":
+            flush()
+            current = start = (ox + args[0], oy + args[1])
+            ring = [current]
+            # Further coordinate pairs after a moveto are linetos
+            command = "l" if relative else "L"
+            last_cubic = last_quad = None
+            continue
+
+        if not ring:
+            ring = [current]
+
+        if op == "L":
+            end = (ox + args[0], oy + args[1])
+            points = [end]
+        elif op == "H":
+            end = ((current[0] if relative else 0.0) + args[0], current[1])
+            points = [end]
+        elif op == "V":
+            end = (current[0], (current[1] if relative else 0.0) + args[0])
+            points = [end]
+        elif op in "CS":
+            if op == "C":
+                c1 = (ox + args[0], oy + args[1])
+                rest = args[2:]
+            else:
+                # Reflection of the previous cubic control point
+                c1 = (2 * current[0] - last_cubic[0], 2 * current[1] - last_cubic[1]) if last_cubic else current
+                rest = args
+            c2 = (ox + rest[0], oy + rest[1])
+            end = (ox + rest[2], oy + rest[3])
+            points = _cubic(current, c1, c2, end, tolerance)
+        elif op in "QT":
+            if op == "Q":
+                c1 = (ox + args[0], oy + args[1])
+                end = (ox + args[2], oy + args[3])
+            else:
+                c1 = (2 * current[0] - last_quad[0], 2 * current[1] - last_quad[1]) if last_quad else current
+                end = (ox + args[0], oy + args[1])
+            points = _quadratic(current, c1, end, tolerance)
+        else:
+            end = (ox + args[5], oy + args[6])
+            points = _arc(current, args[0], args[1], args[2], args[3], args[4], end, tolerance)
+
+        last_cubic = c2 if op in "CS" else None
+        last_quad = c1 if op in "QT" else None
+        ring.extend(tuple(p) for p in np.asarray(points, dtype=float).reshape(-1, 2))
+        current = end
+
+    flush()
+    return rings
+
+
+def _ellipse_path(cx, cy, rx, ry):
+    return (f"M{cx - rx},{cy} A{rx},{ry} 0 1 0 {cx + rx},{cy} "
+            f"A{rx},{ry} 0 1 0 {cx - rx},{cy} Z")
+
+
+def shape_rings(elem, tolerance, viewport):
+    """Şekil öğesinin (path, rect, circle, ...) halkaları, öğe koordinatlarında"""
+    tag = _local(elem.tag)
+    vw, vh = viewport
+    diagonal = math.hypot(vw, vh) / math.sqrt(2)
+
+    if tag == "path":
+        return path_rings(elem.get("d"), tolerance)
+
+    if tag == "rect":
+        x, y = _length(elem.get("x"), vw), _length(elem.get("y"), vh)
+        w, h = _length(elem.get("width"), vw), _length(elem.get("height"), vh)
+        if w <= 0 or h <= 0:
+            return []
+        rx, ry = elem.get("rx"), elem.get("ry")
+        rx = _length(rx, vw) if rx is not None else None
+        ry = _length(ry, vh) if ry is not None else None
+        rx, ry = (rx if rx is not None else ry) or 0.0, (ry if ry is not None else rx) or 0.0
+        rx, ry = min(rx, w / 2), min(ry, h / 2)
+        if rx <= 0 or ry <= 0:
+            return [np.array([(x, y), (x + w, y), (x + w, y + h), (x, y + h)], dtype=float)]
+        d = (f"M{x + rx},{y} H{x + w - rx} A{rx},{ry} 0 0 1 {x + w},{y + ry} V{y + h - ry} "
+             f"A{rx},{ry} 0 0 1 {x + w - rx},{y + h} H{x + rx} A{rx},{ry} 0 0 1 {x},{y + h - ry} "
+             f"V{y + ry} A{rx},{ry} 0 0 1 {x + rx},{y} Z")
+        return path_rings(d, tolerance)
+
+    if tag in ("circle", "ellipse"):
+        cx, cy = _length(elem.get("cx"), vw), _length(elem.get("cy"), vh)
+        if tag == "circle":
+            rx = ry = _length(elem.get("r"), diagonal)
+        else:
+            rx, ry = _length(elem.get("rx"), vw), _length(elem.get("ry"), vh)
+        if rx <= 0 or ry <= 0:
+            return []
+        return path_rings(_ellipse_path(cx, cy, rx, ry), tolerance)
+
+    if tag in ("polygon", "polyline"):
+        values = [float(v) for v in _NUMBER.findall(elem.get("points") or "")]
+        points = np.array(values[:len(values) // 2 * 2], dtype=float).reshape(-1, 2)
+        return [points] if len(points) >= 3 else []
+
+    return []
+
+
+# ============================================================================
+# TARAMA
+# ============================================================================
+
+def _slab_entries(ys, ylo, yhi):
+    """Her kenarın kapladığı şeritler: (kenar indeksleri, şerit indeksleri)"""
+    first = np.searchsorted(ys, ylo, side="left")
+    last = np.minimum(np.searchsorted(ys, yhi, side="left"), len(ys) - 1)
+    counts = np.maximum(last - first, 0)
+    total = int(counts.sum())
+    edge = np.repeat(np.arange(len(ylo)), counts)
+    offsets = np.cumsum(counts) - counts
+    slab = np.repeat(first - offsets, counts) + np.arange(total)
+    return edge, slab
+
+
+def _range_max(lo, hi, values, n):
+    """Her i < n için lo <= i < hi aralıklarının en büyük değeri (yoksa -1)"""
+    levels = []
+    level = 0
+    while True:
+        tree = np.full((n >> level) + 1, -1, dtype=np.int64)
+        levels.append(tree)
+        # Bottom-up segment tree: odd ends are whole nodes on this level
+        left = (lo & 1).astype(bool) & (lo < hi)
+        np.maximum.at(tree, lo[left], values[left])
+        lo = lo + left
+        right = (hi & 1).astype(bool) & (lo < hi)
+        np.maximum.at(tree, hi[right] - 1, values[right])
+        hi = hi - right
+        keep = lo < hi
+        lo, hi, values = lo[keep] >> 1, hi[keep] >> 1, values[keep]
+        if not lo.size:
+            break
+        level += 1
+
+    top = np.full(n, -1, dtype=np.int64)
+    index = np.arange(n)
+    for level, tree in enumerate(levels):
+        np.maximum(top, tree[index >> level], out=top)
+    return top
+
+
+def _integrate(edge, slab, xa, xb, heights, edges, nonzero, x_min, x_max, areas):
+    """
+    Kesişmesiz şeritlerde görünen alanları şekil başına areas'a ekle
+
+    Girişler (şerit, orta x) sırasındadır. Her şeritte orta çizgi boyunca
+    her aralık, içinde kalınan en üstteki (z sırası en büyük) şekle yazılır.
+    """
+    n = len(edge)
+    if n < 2:
+        return
+
+    shape = edges[edge, 4].astype(np.int64)
+    direction = edges[edge, 5].astype(np.int64)
+
+    # Winding of each shape right of each of its edges, within the slab
+    group = np.lexsort((np.arange(n), shape, slab))
+    g_slab, g_shape, g_dir = slab[group], shape[group], direction[group]
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = (g_slab[1:] != g_slab[:-1]) | (g_shape[1:] != g_shape[:-1])
+    running = np.cumsum(g_dir)
+    start_index = np.flatnonzero(starts)
+    base = (running - g_dir)[start_index]
+    winding = running - np.repeat(base, np.diff(np.append(start_index, n)))
+    inside = np.where(nonzero[g_shape], winding != 0, (winding & 1) == 1)
+
+    # Each inside run covers the gaps up to the shape's next edge
+    run = inside[:-1] & ~starts[1:]
+    top = _range_max(group[:-1][run], group[1:][run], g_shape[:-1][run], n)
+
+    xm = (xa + xb) / 2
+    width = np.minimum(xm[1:], x_max) - np.maximum(xm[:-1], x_min)
+    visible = (slab[1:] == slab[:-1]) & (top[:-1] >= 0) & (width > 0)
+    weights = (width * heights[slab[:-1]])[visible]
+    areas += np.bincount(top[:-1][visible], weights=weights, minlength=len(areas))
+
+
+def _sweep(ys, edges, nonzero, x_min, x_max, eps, areas):
+    """
+    ys şeritlerindeki görünen alanları areas'a (şekil başına) ekle
+
+    Şerit içinde sırası değişen kenar çiftleri kesişir: yalnızca bu şeritler
+    kesişim noktalarında bölünüp yeniden denenir. İşlenen şerit sayısını
+    döndürür.
+    """
+    ylo, xlo, slope = edges[:, 0], edges[:, 2], edges[:, 3]
+    edge, slab = _slab_entries(ys, ylo, edges[:, 1])
+    y0, y1 = ys[:-1], ys[1:]
+    done = 0
+
+    for round_ in range(MAX_SPLIT_ROUNDS + 1):
+        if len(edge) > MAX_SWEEP_ENTRIES:
+            raise SVGError("SVG'de çok fazla kesişen kenar var")
+
+        xa = xlo[edge] + (y0[slab] - ylo[edge]) * slope[edge]
+        xb = xlo[edge] + (y1[slab] - ylo[edge]) * slope[edge]
+        order = np.lexsort((xa + xb, slab))
+        edge, slab, xa, xb = edge[order], slab[order], xa[order], xb[order]
+
+        # Neighbours swapping order between the slab's top and bottom cross
+        da, db = np.diff(xa), np.diff(xb)
+        bad = (slab[1:] == slab[:-1]) & ((da < -eps) | (db < -eps))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(bad, da / (da - db), 0.0)
+        bad &= (t > 1e-12) & (t < 1 - 1e-12)
+        if round_ == MAX_SPLIT_ROUNDS:
+            bad[:] = False
+
+        split = np.zeros(len(y0), dtype=bool)
+        split[slab[:-1][bad]] = True
+        keep = ~split[slab]
+        _integrate(edge[keep], slab[keep], xa[keep], xb[keep], y1 - y0, edges, nonzero, x_min, x_max, areas)
+        done += int(np.count_nonzero(~split & (np.bincount(slab, minlength=len(y0)) > 0)))
+        if not split.any():
+            break
+
+        # New slab boundaries: each split slab's top plus its crossings
+        crossing = slab[:-1][bad]
+        cut_slab = np.concatenate((np.flatnonzero(split), crossing))
+        cut_y = np.concatenate((y0[split], y0[crossing] + t[bad] * (y1 - y0)[crossing]))
+        order = np.lexsort((cut_y, cut_slab))
+        cut_slab, cut_y = cut_slab[order], cut_y[order]
+        fresh = np.ones(len(cut_y), dtype=bool)
+        fresh[1:] = (cut_slab[1:] != cut_slab[:-1]) | (cut_y[1:] > cut_y[:-1])
+        cut_slab, cut_y = cut_slab[fresh], cut_y[fresh]
+
+        last = np.ones(len(cut_y), dtype=bool)
+        last[:-1] = cut_slab[1:] != cut_slab[:-1]
+        new_y0 = cut_y
+        new_y1 = np.where(last, y1[cut_slab], np.append(cut_y[1:], 0.0))
+
+        # Entries of split slabs are repeated once per sub-slab
+        pieces = np.bincount(cut_slab, minlength=len(y0))
+        first_piece = np.cumsum(pieces) - pieces
+        moved = ~keep
+        edge, slab = edge[moved], slab[moved]
+        count = pieces[slab]
+        offsets = np.cumsum(count) - count
+        edge = np.repeat(edge, count)
+        slab = np.repeat(first_piece[slab] - offsets, count) + np.arange(int(count.sum()))
+        y0, y1 = new_y0, new_y1
+
+    return done
+
+
+# ============================================================================
+# BELGE
+# ============================================================================
+
+class Drawing:
+    """
+    Boyanmış şekiller (z sırasıyla) ve tuval
+
+    shapes: [(rgb, nonzero, [halka, ...]), ...] tuval koordinatlarında
+    canvas: (x, y, w, h) viewBox; px_per_unit: kullanıcı birimi başına CSS px
+    """
+
+    def __init__(self, shapes, canvas, px_per_unit=1.0, stats=None):
+        self.shapes = shapes
+        self.canvas = canvas
+        self.px_per_unit = px_per_unit
+        self.stats = dict(stats or {})
+        self._edges = None
+        self._areas = None
+
+    # ------------------------------------------------------------------
+    # Kenarlar
+    # ------------------------------------------------------------------
+    def edges(self):
+        """Yatay olmayan kenarlar: (ylo, yhi, x@ylo, eğim dx/dy, şekil, yön)"""
+        if self._edges is None:
+            parts = []
+            for index, (_, _, rings) in enumerate(self.shapes):
+                for ring in rings:
+                    p0 = ring
+                    p1 = np.roll(ring, -1, axis=0)
+                    dy = p1[:, 1] - p0[:, 1]
+                    keep = dy != 0
+                    if not keep.any():
+                        continue
+                    p0, p1, dy = p0[keep], p1[keep], dy[keep]
+                    up = dy > 0
+                    ylo = np.where(up, p0[:, 1], p1[:, 1])
+                    yhi = np.where(up, p1[:, 1], p0[:, 1])
+                    xlo = np.where(up, p0[:, 0], p1[:, 0])
+                    slope = (p1[:, 0] - p0[:, 0]) / dy
+                    parts.append(np.column_stack((ylo, yhi, xlo, slope,
+                                                  np.full(len(dy), index), np.where(up, 1.0, -1.0))))
+            self._edges = np.vstack(parts) if parts else np.empty((0, 6))
+            self.stats["edges"] = len(self._edges)
+        return self._edges
+
+    # ------------------------------------------------------------------
+    # Alanlar
+    # ------------------------------------------------------------------
+    def shape_areas(self):
+        """Her şeklin görünen (üstü örtülmemiş) alanı, kullanıcı birimi²"""
+        edges = self.edges()
+        areas = np.zeros(len(self.shapes))
+        if not len(edges):
+            return areas
+
+        x_min, y_min, cw, ch = self.canvas
+        x_max, y_max = x_min + cw, y_min + ch
+        ylo, yhi, xlo, slope = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+
+        # Slab boundaries: every vertex and every crossing with the canvas'
+        # vertical sides, so clipping inside a slab is a straight cut
+        events = [ylo, yhi, [y_min, y_max]]
+        for x_clip in (x_min, x_max):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                y_cross = ylo + (x_clip - xlo) / slope
+            events.append(y_cross[np.isfinite(y_cross) & (y_cross > ylo) & (y_cross < yhi)])
+        ys = np.unique(np.concatenate(events))
+        ys = ys[(ys >= y_min) & (ys <= y_max)]
+        if len(ys) < 2:
+            return areas
+
+        # Slabs are swept in chunks of about SWEEP_CHUNK (slab, edge) pairs
+        first = np.searchsorted(ys, ylo, side="left")
+        last = np.minimum(np.searchsorted(ys, yhi, side="left"), len(ys) - 1)
+        delta = np.zeros(len(ys) + 1, dtype=np.int64)
+        np.add.at(delta, first, 1)
+        np.add.at(delta, np.maximum(last, first), -1)
+        load = np.cumsum(np.cumsum(delta)[:len(ys) - 1])
+        bounds = np.searchsorted(load, np.arange(SWEEP_CHUNK, load[-1], SWEEP_CHUNK))
+        bounds = np.unique(np.concatenate(([0], bounds, [len(ys) - 1])))
+
+        nonzero = np.array([rule for _, rule, _ in self.shapes], dtype=bool)
+        eps = 1e-9 * max(cw, ch)
+        slabs = 0
+        for s0, s1 in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            active = (first < s1) & (last > s0)
+            if active.any():
+                slabs += _sweep(ys[s0:s1 + 1], edges[active], nonzero, x_min, x_max, eps, areas)
+
+        self.stats["slabs"] = slabs
+        return areas
+
+    def color_areas(self):
+        """(paketlenmiş renkler, alanlar) belge sırasıyla, kullanıcı birimi²"""
+        if self._areas is None:
+            shape_areas = self.shape_areas()
+            totals = {}
+            for (rgb, _, _), area in zip(self.shapes, shape_areas.tolist()):
+                if area > 0:
+                    totals[rgb] = totals.get(rgb, 0.0) + area
+            rgb = np.array(list(totals), dtype=np.uint8).reshape(-1, 3)
+            self._areas = pack_rgb(rgb).astype(np.uint32), np.array(list(totals.values()), dtype=np.float64)
+        return self._areas
+
+    def color_weights(self, dpi=300):
+        """
+        (renkler, piksel eşdeğeri sayılar, kesin alanlar)
+
+        Sayılar alanın dpi çözünürlükteki piksel karşılığıdır; örnekleme
+        kotaları raster moddaki piksel sayılarıyla aynı ölçekte kalır.
+        """
+        colors, areas = self.color_areas()
+        px = self.px_per_unit * dpi / CSS_DPI
+        # Every painted colour counts as at least one pixel, as in a raster
+        counts = np.maximum(np.rint(areas * px * px), 1).astype(np.int64)
+        return colors, counts, areas
+
+    def canvas_area(self):
+        return self.canvas[2] * self.canvas[3]
+
+    # ------------------------------------------------------------------
+    # Nokta sorgusu
+    # ------------------------------------------------------------------
+    def color_at(self, x, y):
+        """Noktadaki en üstteki dolgunun rengi (boyanmamışsa None)"""
+        edges = self.edges()
+        if not len(edges):
+            return None
+        ylo, yhi, xlo, slope = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+        span = (ylo <= y) & (yhi > y)
+        right = span & (xlo + (y - ylo) * slope > x)
+        winding = np.bincount(edges[right, 4].astype(np.int64), weights=edges[right, 5],
+                              minlength=len(self.shapes)).astype(np.int64)
+        for index in range(len(self.shapes) - 1, -1, -1):
+            rgb, nonzero, _ = self.shapes[index]
+            w = winding[index]
+            if (w != 0) if nonzero else (w & 1):
+                return rgb
+        return None
+
+    def background_colors(self):
+        """Tuvalin dört köşesindeki dolgu renkleri (paketlenmiş)"""
+        cx, cy, cw, ch = self.canvas
+        inset = 1e-6 * max(cw, ch)
+        corners = [(cx + inset, cy + inset), (cx + cw - inset, cy + inset),
+                   (cx + inset, cy + ch - inset), (cx + cw - inset, cy + ch - inset)]
+        found = []
+        for x, y in corners:
+            rgb = self.color_at(x, y)
+            if rgb is not None and rgb not in found:
+                found.append(rgb)
+        return [int(c) for c in pack_rgb(np.array(found, dtype=np.uint8).reshape(-1, 3))]
+
+
+def _read_svg(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    try:
+        return ET.fromstring(data)
+    except ET.ParseError as e:
+        raise SVGError(f"SVG okunamadı: {e}") from None
+
+
+def _root_canvas(root):
+    """(viewBox ya da None, viewport genişlik/yükseklik px, px_per_unit)"""
+    width = _length(root.get("width"), None, None)
+    height = _length(root.get("height"), None, None)
+
+    view_box = None
+    values = [float(v) for v in _NUMBER.findall(root.get("viewBox") or "")]
+    if len(values) == 4 and values[2] > 0 and values[3] > 0:
+        view_box = tuple(values)
+
+    if view_box is not None:
+        px_per_unit = width / view_box[2] if width else (height / view_box[3] if height else 1.0)
+        return view_box, px_per_unit
+    if width and height:
+        return (0.0, 0.0, width, height), 1.0
+    return None, 1.0
+
+
+def load_drawing(path, tolerance=FLATTEN_TOLERANCE):
+    """
+    SVG dosyasını oku ve boyanmış şekilleri topla
+
+    tolerance: eğri düzleştirme hatası, tuvalin uzun kenarına oranla.
+    Tuval viewBox'tan, yoksa width/height'tan, o da yoksa şekillerin
+    sınır kutusundan alınır.
+    """
+    root = _read_svg(path)
+    if _local(root.tag) != "svg":
+        raise SVGError("Kök öğe <svg> değil")
+
+    canvas, px_per_unit = _root_canvas(root)
+    viewport = (canvas[2], canvas[3]) if canvas else (100.0, 100.0)
+    flatten = tolerance * max(viewport) if canvas else 0.05
+
+    ids = {elem.get("id"): elem for elem in root.iter() if elem.get("id")}
+    shapes = []
+    stats = {"elements": 0, "shapes": 0, "unpainted": 0, "unsupported": 0}
+
+    def walk(elem, context, matrix, opacity, depth):
+        tag = _local(elem.tag)
+        props = _properties(elem)
+        if props.get("display") == "none":
+            return
+
+        context = dict(context)
+        for name in _INHERITED:
+            if name in props and props[name] != "inherit":
+                context[name] = props[name]
+        matrix = _compose(matrix, parse_transform(elem.get("transform")))
+        opacity *= _opacity(props.get("opacity"))
+
+        if tag in _CONTAINERS or tag == "symbol":
+            if tag == "svg" and elem is not root:
+                # Nested viewports are placed at x, y without rescaling
+                matrix = _compose(matrix, _translate(_length(elem.get("x")), _length(elem.get("y"))))
+            for child in elem:
+                if _local(child.tag) != "symbol":
+                    walk(child, context, matrix, opacity, depth)
+            return
+
+        if tag == "use":
+            href = elem.get("href") or elem.get("{http://www.w3.org/1999/xlink}href") or ""
+            target = ids.get(href.lstrip("#"))
+            if target is None or depth >= MAX_USE_DEPTH:
+                stats["unsupported"] += 1
+                return
+            matrix = _compose(matrix, _translate(_length(elem.get("x")), _length(elem.get("y"))))
+            walk(target, context, matrix, opacity, depth + 1)
+            return
+
+        if tag not in _SHAPES:
+            if tag in ("text", "image", "foreignObject"):
+                stats["unsupported"] += 1
+            return
+
+        stats["elements"] += 1
+        paint = _paint(context.get("fill"), context, ids)
+        alpha = (paint[3] / 255 if paint else 0.0) * opacity * _opacity(context.get("fill-opacity"))
+        if paint is None or alpha < 0.5 or context.get("visibility") in ("hidden", "collapse"):
+            stats["unpainted"] += 1
+            return
+
+        rings = shape_rings(elem, flatten / _scale(matrix), viewport)
+        rings = [_apply(matrix, ring) for ring in rings]
+        if rings:
+            nonzero = context.get("fill-rule", "nonzero") != "evenodd"
+            shapes.append((tuple(int(c) for c in paint[:3]), nonzero, rings))
+            stats["shapes"] += 1
+
+    walk(root, {}, _IDENTITY, 1.0, 0)
+
+    if canvas is None:
+        if not shapes:
+            raise SVGError("SVG'de boyanmış şekil yok")
+        points = np.vstack([ring for _, _, rings in shapes for ring in rings])
+        lo, hi = points.min(axis=0), points.max(axis=0)
+        canvas = (lo[0], lo[1], max(hi[0] - lo[0], 1e-9), max(hi[1] - lo[1], 1e-9))
+
+    return Drawing(shapes, canvas, px_per_unit, stats)